@@ -0,0 +1,106 @@
+"""Micro-benchmark: bold markup conversion on a 10k-bullet corpus
+
+Compares the original character-by-character loop against the precompiled
+tokenizer in resume_compiler, with the memo cold and warm.
+
+Usage:
+    python benchmarks/bench_bold_markup.py [--bullets 10000] [--repeat 5] [--seed 0]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_compiler import parse_bullet_text_html, split_bold_markup, _bold_markup_to_html
+
+WORDS = (
+    "designed implemented reduced latency pipeline distributed service python "
+    "kubernetes throughput users revenue migrated legacy platform team led "
+    "automated testing deployment analytics dashboard realtime model accuracy"
+).split()
+
+
+def legacy_parse_bullet_text_html(text):
+    """The original character-by-character implementation, kept as the baseline"""
+    if not isinstance(text, str):
+        return str(text)
+    if '**' not in text:
+        return text
+    parts = []
+    is_bold = False
+    current_part = ""
+    i = 0
+    while i < len(text):
+        if i + 1 < len(text) and text[i:i+2] == '**':
+            if current_part:
+                parts.append(f"<strong>{current_part}</strong>" if is_bold else current_part)
+                current_part = ""
+            is_bold = not is_bold
+            i += 2
+        else:
+            current_part += text[i]
+            i += 1
+    if current_part:
+        parts.append(f"<strong>{current_part}</strong>" if is_bold else current_part)
+    return "".join(parts)
+
+
+def make_bullet(rng, bold_spans):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(12, 28))]
+    for _ in range(bold_spans):
+        i = rng.randrange(len(words))
+        words[i] = f"**{words[i]}**"
+    return " ".join(words)
+
+
+def make_corpus(rng, count, unique_fraction=0.3):
+    """Build bullets where only unique_fraction are distinct, like variants of one resume"""
+    unique = [make_bullet(rng, rng.randint(0, 3)) for _ in range(max(1, int(count * unique_fraction)))]
+    return [rng.choice(unique) for _ in range(count)]
+
+
+def clear_memo():
+    split_bold_markup.cache_clear()
+    _bold_markup_to_html.cache_clear()
+
+
+def time_run(fn, corpus, repeat, before=None):
+    best = float("inf")
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        for bullet in corpus:
+            fn(bullet)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bullets", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = make_corpus(random.Random(args.seed), args.bullets)
+    for bullet in corpus:
+        clear_memo()
+        assert parse_bullet_text_html(bullet) == legacy_parse_bullet_text_html(bullet)
+
+    results = {
+        "legacy loop": time_run(legacy_parse_bullet_text_html, corpus, args.repeat),
+        "tokenizer (cold memo)": time_run(parse_bullet_text_html, corpus, args.repeat, before=clear_memo),
+        "tokenizer (warm memo)": time_run(parse_bullet_text_html, corpus, args.repeat),
+    }
+    baseline = results["legacy loop"]
+    print(f"{len(corpus)} bullets, best of {args.repeat}")
+    for name, seconds in results.items():
+        print(f"  {name:<24} {seconds * 1000:8.2f} ms  {baseline / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
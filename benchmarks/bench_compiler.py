@@ -0,0 +1,267 @@
+"""Benchmark suite: validation, bullet markup, HTML generation and end-to-end compile
+
+Synthetic resumes are generated at preset sizes (tiny to huge) or a custom shape, and
+each stage is timed with every cache cleared first ("cold") and again with caches
+populated ("warm"). Results include latency percentiles, throughput and tracemalloc
+allocation figures, and can be written as JSON and compared against an earlier run.
+
+Usage:
+    python benchmarks/bench_compiler.py [--sizes tiny,small,medium,large,huge]
+        [--iterations 50] [--seed 0] [--output results.json]
+        [--compare baseline.json] [--threshold 1.25]
+    python benchmarks/bench_compiler.py --sizes custom --experience 40 --bullets 10 --bold-spans 2
+
+Exits with status 1 if --compare finds a benchmark whose p50 grew by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resume_compiler
+from resume_compiler import (
+    clear_compile_cache, compile_resume, generate_resume_html, parse_bullet_text_html,
+    validate_resume_json,
+)
+
+WORDS = (
+    "designed implemented reduced latency pipeline distributed service python "
+    "kubernetes throughput users revenue migrated legacy platform team led "
+    "automated testing deployment analytics dashboard realtime model accuracy"
+).split()
+
+# (education, skill groups, experience, projects, publications, bullets per item, bold spans per bullet)
+SIZES = {
+    "tiny": (1, 1, 1, 0, 0, 2, 0),
+    "small": (1, 3, 3, 2, 0, 4, 1),
+    "medium": (2, 4, 6, 4, 2, 6, 1),
+    "large": (3, 8, 20, 15, 10, 8, 2),
+    "huge": (5, 20, 100, 60, 40, 12, 2),
+}
+
+
+def make_text(rng, words, bold_spans=0):
+    tokens = [rng.choice(WORDS) for _ in range(words)]
+    for _ in range(bold_spans):
+        i = rng.randrange(len(tokens))
+        tokens[i] = f"**{tokens[i]}**"
+    return " ".join(tokens)
+
+
+def make_bullets(rng, count, bold_spans):
+    return [make_text(rng, rng.randint(12, 28), bold_spans) for _ in range(count)]
+
+
+def make_resume(rng, education=1, skills=3, experience=3, projects=2, publications=0, bullets=4, bold_spans=1):
+    """Generate a valid resume with the given number of items in each section"""
+    return {
+        "name": "Synthetic Candidate",
+        "location": "New York, NY",
+        "phone": "555-555-0100",
+        "email": "candidate@example.com",
+        "website": "https://example.com",
+        "education": [
+            {
+                "institution": f"University {i}",
+                "location": "Ithaca, NY",
+                "graduationDate": "May 2020",
+                "degree": "B.S. Computer Science",
+                "coursework": [make_text(rng, 3).title() for _ in range(6)],
+            }
+            for i in range(education)
+        ],
+        "technicalSkills": [
+            f"Group {i}: " + ", ".join(make_text(rng, 1) for _ in range(6)) for i in range(skills)
+        ],
+        "experience": [
+            {
+                "title": "Software Engineer",
+                "company": f"**Company {i}**",
+                "location": "Remote",
+                "dateRange": "Jan 2020 - Present",
+                "bullets": make_bullets(rng, bullets, bold_spans),
+            }
+            for i in range(experience)
+        ],
+        "projects": [
+            {
+                "name": f"**Project {i}** (Python, SQL)",
+                "dateRange": "2021",
+                "bullets": make_bullets(rng, bullets, bold_spans),
+            }
+            for i in range(projects)
+        ],
+        "publications": [
+            {
+                "title": f"**Paper {i}**",
+                "citation": make_text(rng, 12),
+                "bullets": make_bullets(rng, max(1, bullets // 2), bold_spans),
+            }
+            for i in range(publications)
+        ],
+    }
+
+
+def all_bullets(resume):
+    return [
+        bullet
+        for field in ("experience", "projects", "publications")
+        for item in resume.get(field, [])
+        for bullet in item.get("bullets", [])
+    ]
+
+
+def clear_caches():
+    """Empty every memo the compiler keeps, so the next call does all of its work"""
+    clear_compile_cache()
+    resume_compiler._validation_cache.clear()
+    resume_compiler._parsed_documents.clear()
+    resume_compiler._fragment_cache.clear()
+    resume_compiler.split_bold_markup.cache_clear()
+    resume_compiler._bold_markup_to_html.cache_clear()
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn, iterations, cold, items=1):
+    """Time fn() and record the allocations of one extra call under tracemalloc"""
+    samples = []
+    if not cold:
+        fn()
+    for _ in range(iterations):
+        if cold:
+            clear_caches()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    if cold:
+        clear_caches()
+    tracemalloc.start()
+    fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        "iterations": iterations,
+        "items": items,
+        "mean_ms": mean * 1000,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "min_ms": samples[0] * 1000,
+        "max_ms": samples[-1] * 1000,
+        "ops_per_sec": 1 / mean if mean else None,
+        "items_per_sec": items / mean if mean else None,
+        "alloc_peak_kb": peak / 1024,
+        "alloc_retained_kb": current / 1024,
+    }
+
+
+def run_size(name, shape, iterations, seed):
+    resume = make_resume(random.Random(seed), *shape)
+    resume_json = json.dumps(resume)
+    bullets = all_bullets(resume)
+    html_bytes = len(generate_resume_html(resume).encode("utf-8"))
+
+    def parse_bullets():
+        for bullet in bullets:
+            parse_bullet_text_html(bullet)
+
+    benchmarks = [
+        ("validate_resume_json", lambda: validate_resume_json(resume), 1),
+        ("parse_bullet_text_html", parse_bullets, len(bullets)),
+        ("generate_resume_html", lambda: generate_resume_html(resume), 1),
+        ("compile_resume", lambda: compile_resume(resume_json), 1),
+    ]
+    results = []
+    for benchmark, fn, items in benchmarks:
+        for cold in (True, False):
+            result = measure(fn, iterations, cold, items)
+            result.update(size=name, benchmark=benchmark, cache="cold" if cold else "warm",
+                          bullets=len(bullets), html_bytes=html_bytes)
+            results.append(result)
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print p50 ratios against a baseline run and return the regressions"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {
+            (r["size"], r["benchmark"], r["cache"]): r for r in json.load(f)["results"]
+        }
+    regressions = []
+    print(f"\ncompared with {baseline_path} (p50, threshold {threshold:.2f}x)")
+    for result in results:
+        key = (result["size"], result["benchmark"], result["cache"])
+        if key not in baseline or not baseline[key]["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / baseline[key]["p50_ms"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"  {'/'.join(key):<44} {ratio:6.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="tiny,small,medium,large,huge",
+                        help="comma-separated presets, or 'custom' to use the shape options")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--education", type=int, default=1)
+    parser.add_argument("--skills", type=int, default=3)
+    parser.add_argument("--experience", type=int, default=3)
+    parser.add_argument("--projects", type=int, default=2)
+    parser.add_argument("--publications", type=int, default=0)
+    parser.add_argument("--bullets", type=int, default=4, help="bullets per item")
+    parser.add_argument("--bold-spans", type=int, default=1, help="bold spans per bullet")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    sizes = dict(SIZES, custom=(
+        args.education, args.skills, args.experience, args.projects,
+        args.publications, args.bullets, args.bold_spans,
+    ))
+    results = []
+    for name in args.sizes.split(","):
+        results.extend(run_size(name, sizes[name], args.iterations, args.seed))
+
+    print(f"{'size':<8} {'benchmark':<24} {'cache':<5} {'p50 ms':>9} {'p95 ms':>9} {'items/s':>11} {'peak KB':>9}")
+    for r in results:
+        print(f"{r['size']:<8} {r['benchmark']:<24} {r['cache']:<5} {r['p50_ms']:9.3f} "
+              f"{r['p95_ms']:9.3f} {r['items_per_sec']:11.0f} {r['alloc_peak_kb']:9.1f}")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
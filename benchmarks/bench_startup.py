@@ -0,0 +1,81 @@
+"""Startup benchmark: how long a freshly spawned MCP server process takes to import
+
+Each run imports the server module in a new interpreter under `python -X importtime`,
+the way an MCP client spawns a stdio server, and reports the wall time of the process
+and the cumulative import time of the module. The slowest imports of the last run are
+listed so regressions (e.g. a heavy dependency imported at module level) stand out.
+
+Runs happen in a scratch directory, so nothing is created in the repository.
+
+Usage:
+    python benchmarks/bench_startup.py [--module resume] [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    """Return (module, self_us, cumulative_us) rows from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run_once(module, cwd):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - start
+    rows = parse_importtime(proc.stderr)
+    cumulative = next((us for name, _, us in rows if name == module), 0)
+    return wall, cumulative, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="resume")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    walls, imports = [], []
+    with tempfile.TemporaryDirectory() as cwd:
+        # One untimed run warms the filesystem and bytecode caches
+        run_once(args.module, cwd)
+        for _ in range(args.runs):
+            wall, cumulative, rows = run_once(args.module, cwd)
+            walls.append(wall)
+            imports.append(cumulative / 1e6)
+        created = sorted(os.listdir(cwd))
+
+    print(f"import {args.module}, {args.runs} fresh processes")
+    print(f"  process wall time   median {statistics.median(walls) * 1000:8.1f} ms   min {min(walls) * 1000:8.1f} ms")
+    print(f"  module import time  median {statistics.median(imports) * 1000:8.1f} ms   min {min(imports) * 1000:8.1f} ms")
+    print(f"  files created at import: {', '.join(created) if created else 'none'}")
+
+    # Top-level packages only, so each dependency is counted once
+    top_level = {}
+    for name, _, cumulative in rows:
+        root = name.split(".")[0]
+        top_level[root] = max(top_level.get(root, 0), cumulative)
+    print(f"  slowest top-level imports (cumulative, last run):")
+    for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"    {name:<28} {cumulative / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
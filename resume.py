@@ -1,105 +1,115 @@
+import asyncio
+import base64
+import hashlib
 import os
 import json
-import io
-import PyPDF2
-from docx import Document
-from mcp.server.fastmcp import FastMCP
-from resume_compiler import validate_resume_json, compile_resume
+import sys
+import threading
+from mcp.server.fastmcp import Context, FastMCP
+from resume_compiler import (
+    load_resume_document, compile_resume, compile_resumes_batch, compile_cache_stats,
+    configure_compile_cache, fragment_cache_stats, parsed_document_stats
+)
+from resume_pdf import compile_resume_pdf, pdf_render_pool_stats
+from resume_artifacts import artifact_result, fetch_artifact
+from resume_context_index import ContextCorpus
+from resume_text_extraction import (
+    decode_text, extract_text_from_file, extraction_cache_stats, ingest_documents
+)
+from resume_state import (
+    DEFAULT_RESUME_ID, get_working_resume, patch_working_resume, set_working_resume
+)
+from resume_store import ResumeStore
+from resume_metrics import (
+    configure_profiling, count, profile_report, prometheus_text, register_collector, snapshot,
+    span, traced
+)
 
 # Define directories
 RESUME_DIR = "resumes"
 USER_CONTEXT_DIR = "user_context"  # Directory for user context files
 
-# Ensure directories exist
-for directory in [RESUME_DIR, USER_CONTEXT_DIR]:
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-
 # Initialize FastMCP
 mcp = FastMCP("Resume-MCP-Server")
 
-# Text extraction constants
-MAX_FILE_SIZE_BYTES = 2_000_000  # ~2 MB
-TEXT_EXTENSIONS = {
-    ".txt", ".py", ".js", ".ts", ".jsx", ".tsx", ".html", ".htm", ".css",
-    ".scss", ".c", ".cpp", ".h", ".hpp", ".java", ".cs", ".json", ".xml",
-    ".yaml", ".yml", ".md", ".sh", ".rb", ".go", ".rs", ".php"
-}
-
-# Text extraction functions
-def read_text_file(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read().strip()
-    except UnicodeDecodeError:
-        try:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                return f.read().strip()
-        except:
-            return None
-
-def extract_docx_text(file_path):
-    document = Document(file_path)
-    full_text = []
-    for para in document.paragraphs:
-        full_text.append(para.text)
-    return "\n".join(full_text)
-
-def extract_pdf_text(file_path):
-    text = []
-    with open(file_path, 'rb') as pdf_file:
-        reader = PyPDF2.PdfReader(pdf_file)
-        for page_num in range(len(reader.pages)):
-            page_text = reader.pages[page_num].extract_text()
-            if page_text:
-                text.append(page_text)
-    return "\n".join(text)
-
-def extract_text_from_file(file_path):
-    """Extract text from various file types"""
-    if os.path.getsize(file_path) > MAX_FILE_SIZE_BYTES:
-        return f"File too large: {file_path}"
-    
-    _, file_extension = os.path.splitext(file_path)
-    file_extension = file_extension.lower()
+# Saved resumes and their versions, so tools can take a resume id instead of the JSON.
+# RESUME_STORE_BACKEND=sqlite keeps them in a SQLite database instead of flat files,
+# with sections and bullets shared between variants, indexed search (find_resumes),
+# and compiled results cached in the same database.
+RESUME_STORE_BACKEND = os.environ.get("RESUME_STORE_BACKEND", "files")
+RESUME_SQLITE_PATH = os.environ.get("RESUME_SQLITE_PATH", os.path.join(RESUME_DIR, "resumes.db"))
+
+if RESUME_STORE_BACKEND == "sqlite":
+    from resume_sqlite import SQLiteResumeStore
+    resume_store = SQLiteResumeStore(RESUME_SQLITE_PATH)
+    configure_compile_cache(disk_cache=resume_store.compile_cache())
+elif RESUME_STORE_BACKEND == "files":
+    resume_store = ResumeStore(RESUME_DIR)
+else:
+    raise ValueError(f"Unknown RESUME_STORE_BACKEND '{RESUME_STORE_BACKEND}', expected 'files' or 'sqlite'")
+
+# The decoded context.txt, reread only when its stat signature changes
+_user_context_lock = threading.Lock()
+_user_context_cache = {"signature": None, "context": "", "encoding": None}
+
+def load_user_context():
+    """Return (context, encoding) for context.txt, reading the file only when it changed
     
-    try:
-        if file_extension in TEXT_EXTENSIONS:
-            return read_text_file(file_path)
-        elif file_extension == ".pdf":
-            return extract_pdf_text(file_path)
-        elif file_extension == ".docx":
-            return extract_docx_text(file_path)
-        else:
-            return None
-    except Exception as e:
-        return f"Error extracting text: {str(e)}"
-
-def build_user_context():
-    """Read user context directly from context.txt file"""
+    The cached text is keyed on the file's modification time, size and inode, so a
+    repeated call costs one stat() instead of an open and read. (The standard library
+    has no inotify binding, and a stat is cheap enough not to need one.)
+    
+    Returns:
+        tuple: (context text, detected encoding or None if there is no context file)
+    """
+    ensure_directories()
     context_file_path = os.path.join(USER_CONTEXT_DIR, "context.txt")
     
-    # If the file doesn't exist, return empty context
-    if not os.path.exists(context_file_path):
-        return ""
+    try:
+        st = os.stat(context_file_path)
+    except OSError:
+        # If the file doesn't exist, return empty context
+        return "", None
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    with _user_context_lock:
+        if _user_context_cache["signature"] == signature:
+            return _user_context_cache["context"], _user_context_cache["encoding"]
     
-    # Read the file content directly
+    # Read the bytes once and decode them in memory
     try:
-        with open(context_file_path, 'r', encoding='utf-8') as f:
-            context = f.read().strip()
-    except UnicodeDecodeError:
-        try:
-            with open(context_file_path, 'r', encoding='latin-1') as f:
-                context = f.read().strip()
-        except Exception as e:
-            print(f"Error reading context file: {str(e)}")
-            context = ""
+        with span("user_context.read"):
+            with open(context_file_path, 'rb') as f:
+                context, encoding = decode_text(f.read())
+            context = context.strip()
     except Exception as e:
-        print(f"Error reading context file: {str(e)}")
-        context = ""
+        # stdout carries the MCP stdio protocol, so report on stderr
+        print(f"Error reading context file: {str(e)}", file=sys.stderr)
+        return "", None
     
+    with _user_context_lock:
+        _user_context_cache.update(signature=signature, context=context, encoding=encoding)
+    return context, encoding
+
+def build_user_context():
+    """Read user context from the context.txt file (cached until the file changes)"""
+    context, _ = load_user_context()
     return context
 
+# Context larger than this is not pasted into resume_edit_prompt; the model retrieves
+# the passages it needs with search_user_context instead
+CONTEXT_PROMPT_MAX_CHARS = 12_000
+
+def _extract_context_file(file_path):
+    text = extract_text_from_file(file_path)
+    # extract_text_from_file reports failures as text; keep them out of the index
+    if text is None or text.startswith(("File too large:", "Error extracting text:")):
+        return None
+    return text
+
+# Every file in USER_CONTEXT_DIR, indexed for search_user_context
+context_corpus = ContextCorpus(USER_CONTEXT_DIR, _extract_context_file)
+
 # Initialize sample context files if directory is empty
 def initialize_sample_context():
     if not os.listdir(USER_CONTEXT_DIR):
@@ -109,54 +119,104 @@ def initialize_sample_context():
         with open(os.path.join(USER_CONTEXT_DIR, "context.txt"), "w") as f:
             f.write(sample_context.strip())
 
-initialize_sample_context()
+_directories_ready = False
+
+def ensure_directories():
+    """Create the resume and user context directories and sample context on first use
+    
+    This runs lazily instead of at import, so spawning the server does no filesystem
+    work before it starts answering requests.
+    """
+    global _directories_ready
+    if _directories_ready:
+        return
+    # Ensure directories exist
+    for directory in [RESUME_DIR, USER_CONTEXT_DIR]:
+        os.makedirs(directory, exist_ok=True)
+    initialize_sample_context()
+    _directories_ready = True
 
 # --- Tool Implementations ---
+#
+# Tools are async so one slow compile or file read doesn't hold up other requests from
+# the same client: blocking and CPU-bound work runs in worker threads via
+# asyncio.to_thread (PDF and batch compiles additionally fan out to process pools).
 
-@mcp.tool()
-def validate_json(json_input):
-    """Validate if a JSON string or dictionary is properly formatted and meets resume requirements"""
+def _validate_json(json_input):
     try:
         # Handle input as either a string or dictionary
-        if isinstance(json_input, str):
-            # Parse string into dictionary if it's a string
-            resume_data = json.loads(json_input)
-        elif isinstance(json_input, dict):
-            # Use the dictionary directly
-            resume_data = json_input
-        else:
+        if not isinstance(json_input, (str, dict)):
             return {
                 "valid": False,
                 "message": f"Input must be a JSON string or dictionary, got {type(json_input)}"
             }
         
-        # Then check if it meets resume requirements
-        is_valid, error_message = validate_resume_json(resume_data)
+        # Parse and validate, collecting every error at once; the parsed document is kept
+        # briefly so a following compile_resume_tool call on the same input can reuse it
+        with span("validate.load_document"):
+            document, reused = load_resume_document(json_input)
         
-        if is_valid:
+        if not document.errors:
             return {
                 "valid": True,
-                "message": "JSON is properly formatted and meets resume requirements."
+                "message": "JSON is properly formatted and meets resume requirements.",
+                "reused": reused
             }
         else:
             return {
                 "valid": False,
-                "message": f"JSON fails resume validation: {error_message}"
+                "message": f"JSON fails resume validation: {'; '.join(document.errors)}",
+                "errors": list(document.errors),
+                "reused": reused
             }
             
     except json.JSONDecodeError as e:
+        count("errors", span="validate", type="JSONDecodeError")
         return {
             "valid": False,
             "message": f"Invalid JSON format: {str(e)}"
         }
     except Exception as e:
+        count("errors", span="validate", type=type(e).__name__)
         return {
             "valid": False,
             "message": f"Error validating JSON: {str(e)}"
         }
 
 @mcp.tool()
-def compile_resume_tool(json_input):
+@traced("tool.validate_json")
+async def validate_json(json_input):
+    """Validate if a JSON string or dictionary is properly formatted and meets resume requirements"""
+    return await asyncio.to_thread(_validate_json, json_input)
+
+def _stored_resume_input(json_input, resume_id):
+    """Return (input to compile, None), reading it from the store if resume_id is given"""
+    if resume_id is None:
+        if json_input is None:
+            return None, {"valid": False, "message": "Pass either json_input or resume_id"}
+        return json_input, None
+    if json_input is not None:
+        return None, {"valid": False, "message": "Pass either json_input or resume_id, not both"}
+    try:
+        _, _, text = resume_store.load_text(resume_id)
+    except (KeyError, ValueError) as e:
+        return None, {"valid": False, "message": e.args[0]}
+    return text, None
+
+def _compile_resume_html(json_input, assets, output_mode, delivery, resume_id=None):
+    json_input, error = _stored_resume_input(json_input, resume_id)
+    if error is not None:
+        return dict(error, html=None)
+    # Use the imported compile_resume function from resume_compiler.py
+    result = compile_resume(json_input, assets=assets, output_mode=output_mode)
+    if delivery == "artifact" and result["valid"]:
+        result = artifact_result(result, "html", result["html"], ".html")
+    return result
+
+@mcp.tool()
+@traced("tool.compile_resume_tool")
+async def compile_resume_tool(json_input=None, assets="cdn", output_mode="pretty", delivery="inline",
+                              resume_id=None):
     """Validate a JSON resume and compile it into a single HTML file if valid
     
     This tool first validates if the JSON resume meets all requirements, then
@@ -164,32 +224,446 @@ def compile_resume_tool(json_input):
     
     Args:
         json_input: A resume in JSON format (string or dictionary)
+        assets: How the stylesheet and html2pdf.js are included: "cdn" (default),
+            "inline" (embedded, works offline) or "linked" (shared files in output/)
+        output_mode: "pretty" (default), "compact" (whitespace stripped, stylesheet
+            minified) or "body-only" (just the resume fragment). Use "compact" or
+            "body-only" for previews to keep tool results small.
+        delivery: "inline" (default) returns the HTML in the result; "artifact" stores
+            it server-side and returns a handle to read with fetch_artifact
+        resume_id: Compile a saved resume instead of json_input: "resume_id" for its
+            latest version or "resume_id@version" (see save_resume)
         
     Returns:
         A dictionary containing:
         - valid (bool): Whether the JSON is valid
         - message (str): Validation message if invalid
-        - html (str): The compiled HTML if valid
+        - html (str): The compiled HTML if valid and delivered inline
+        - artifact (dict): artifact_id, media_type, bytes, gzip_bytes and sha256, if
+          delivered as an artifact
+        - bytes (int): Size of the HTML in bytes
+        - bytes_saved (int): Bytes saved compared with the pretty output
+        - reused (bool): Whether an earlier parse of the same input was reused
     """
-    # Use the imported compile_resume function from resume_compiler.py
-    return compile_resume(json_input)
+    if delivery not in ("inline", "artifact"):
+        return {"valid": False, "message": f"Unknown delivery '{delivery}', expected 'inline' or 'artifact'", "html": None}
+    return await asyncio.to_thread(_compile_resume_html, json_input, assets, output_mode, delivery, resume_id)
 
 @mcp.tool()
-def get_user_context():
+@traced("tool.compile_resumes_batch_tool")
+async def compile_resumes_batch_tool(resumes: list, base: dict | str | None = None):
+    """Validate and compile many resume variants in a single call
+    
+    Args:
+        resumes: A list of resumes in JSON format (strings or dictionaries). If base is
+            given, each item is a JSON merge patch (RFC 7386) applied to base instead.
+        base: Optional base resume in JSON format that the items patch
+        
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the batch request was well formed
+        - message (str): Summary of how many resumes compiled
+        - results (list): Per-item results (valid, message, html, index, seconds)
+        - seconds (float): Total time for the batch
+    """
+    return await asyncio.to_thread(compile_resumes_batch, resumes, base=base)
+
+def _compile_resume_pdf(json_input, delivery, resume_id=None):
+    json_input, error = _stored_resume_input(json_input, resume_id)
+    if error is not None:
+        return dict(error, pdf=None)
+    result = compile_resume_pdf(json_input)
+    if delivery == "artifact" and result["valid"]:
+        result = artifact_result(result, "pdf", base64.b64decode(result["pdf"]), ".pdf")
+    return result
+
+@mcp.tool(name="compile_resume_pdf")
+@traced("tool.compile_resume_pdf")
+async def compile_resume_pdf_tool(json_input=None, delivery="inline", resume_id=None):
+    """Validate a JSON resume and render it to a PDF on the server
+    
+    The PDF is laid out in-process with vector text, so it needs no browser and no
+    network access, and it is much smaller than the rasterized browser export.
+    
+    Args:
+        json_input: A resume in JSON format (string or dictionary)
+        delivery: "inline" (default) returns the PDF in the result; "artifact" stores
+            it server-side and returns a handle to read with fetch_artifact
+        resume_id: Render a saved resume ("resume_id" or "resume_id@version") instead
+            of json_input
+        
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the JSON is valid
+        - message (str): Validation message if invalid
+        - pdf (str): The PDF document, base64-encoded, if valid and delivered inline
+        - artifact (dict): artifact_id, media_type, bytes, gzip_bytes and sha256, if
+          delivered as an artifact
+        - bytes (int): Size of the PDF in bytes
+        - warnings (list): Present if some characters (outside the WinAnsi font
+          encoding) were drawn as "?"
+    """
+    if delivery not in ("inline", "artifact"):
+        return {"valid": False, "message": f"Unknown delivery '{delivery}', expected 'inline' or 'artifact'", "pdf": None}
+    return await asyncio.to_thread(_compile_resume_pdf, json_input, delivery, resume_id)
+
+@mcp.tool(name="fetch_artifact")
+@traced("tool.fetch_artifact")
+async def fetch_artifact_tool(artifact_id, offset: int = 0, length: int | None = None, encoding="base64"):
+    """Read a compiled artifact in chunks
+    
+    Call repeatedly, passing next_offset back as offset, until complete is true. Then
+    base64-decode and concatenate the chunks; with encoding "gzip" also gunzip the result.
+    
+    Args:
+        artifact_id: The artifact_id from a compile result delivered as an artifact
+        offset: Byte offset to start reading from
+        length: Maximum number of bytes to return in this chunk
+        encoding: "base64" (raw bytes) or "gzip" (compressed bytes, smaller to transfer)
+        
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the chunk could be read
+        - message (str): Error message if not
+        - data (str): The chunk, base64-encoded
+        - total (int): Size of the whole stream in this encoding
+        - next_offset (int): Offset of the next chunk, or None when complete
+        - complete (bool): Whether this was the last chunk
+    """
+    return await asyncio.to_thread(
+        fetch_artifact, artifact_id, offset=offset, length=length, encoding=encoding
+    )
+
+@mcp.tool()
+@traced("tool.get_user_context")
+async def get_user_context():
     """Retrieve context information for the user from context.txt file"""
-    context = build_user_context()
+    context, encoding = await asyncio.to_thread(load_user_context)
     
     if not context:
         return {"error": "No user context found. Please create a context.txt file in the user_context directory."}
     
-    return {"context": context}
+    return {"context": context, "encoding": encoding}
+
+@mcp.tool(name="ingest_documents")
+@traced("tool.ingest_documents")
+async def ingest_documents_tool(source, ctx: Context, include_text: bool = True,
+                                max_workers: int | None = None):
+    """Extract text from a folder or glob of documents (PDF, DOCX and text files) in parallel
+    
+    Files are extracted across a pool of worker processes. Each finished file is reported
+    as a progress notification while the rest are still running.
+    
+    Args:
+        source: A directory, a single file or a glob pattern such as "~/resumes/**/*.pdf"
+        include_text: Return the extracted pages/paragraphs (False returns only counts
+            and timings)
+        max_workers: Maximum number of worker processes (defaults to the CPU count)
+        
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether any documents matched
+        - message (str): Summary of how many files were extracted
+        - files (list): Per-file results: path, units (page or paragraph texts), chars
+          and seconds
+        - seconds (float): Total time for the ingest
+    """
+    loop = asyncio.get_running_loop()
+    finished = asyncio.Queue()
+    
+    def run():
+        try:
+            return ingest_documents(
+                os.path.expanduser(source), max_workers=max_workers, include_text=include_text,
+                on_result=lambda result: loop.call_soon_threadsafe(finished.put_nowait, result)
+            )
+        finally:
+            loop.call_soon_threadsafe(finished.put_nowait, None)
+    
+    task = asyncio.create_task(asyncio.to_thread(run))
+    done = 0
+    while (result := await finished.get()) is not None:
+        done += 1
+        await ctx.report_progress(done, None)
+        await ctx.info(f"Extracted {result['path']} ({result['chars']} chars) in {result['seconds']:.2f}s")
+    return await task
+
+@mcp.tool()
+@traced("tool.search_user_context")
+async def search_user_context(query, top_k: int = 5):
+    """Search every file in the user context directory for passages relevant to a query
+    
+    Text, PDF and DOCX files are indexed (BM25) and the index is refreshed when files
+    change, so only the best matching passages are returned instead of the whole corpus.
+    
+    Args:
+        query: What to look for, e.g. "machine learning projects" or "Acme Corp role"
+        top_k: Maximum number of passages to return
+        
+    Returns:
+        A dictionary containing:
+        - results (list): Passages with their source file and relevance score
+        - stats (dict): Number of files, passages and terms in the index
+    """
+    def search():
+        ensure_directories()
+        return {"results": context_corpus.search(query, top_k), "stats": context_corpus.stats()}
+    return await asyncio.to_thread(search)
+
+@mcp.tool(name="set_working_resume")
+@traced("tool.set_working_resume")
+async def set_working_resume_tool(json_input, resume_id=DEFAULT_RESUME_ID):
+    """Load a resume into server-side state so later edits can be sent as patches
+    
+    Args:
+        json_input: The resume in JSON format (string or dictionary)
+        resume_id: Name of the working copy (use different names to edit several resumes)
+        
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the resume passes validation
+        - message (str): Validation message
+        - version (str): Version of the working copy, for apply_resume_patch
+    """
+    return await asyncio.to_thread(set_working_resume, json_input, resume_id)
+
+@mcp.tool(name="get_working_resume")
+@traced("tool.get_working_resume")
+async def get_working_resume_tool(resume_id=DEFAULT_RESUME_ID):
+    """Return the current server-side copy of a resume being edited with patches"""
+    working = get_working_resume(resume_id)
+    if working is None:
+        return {"valid": False, "message": f"No working resume '{resume_id}'; set one first"}
+    return {"valid": True, "message": "Working resume found", "resume_id": resume_id,
+            "version": working.version, "resume": working.resume}
+
+def _apply_resume_patch(patch, resume_id, expected_version, compile, output_mode):
+    result, working = patch_working_resume(patch, resume_id, expected_version)
+    if compile and working is not None:
+        # Unchanged sections and items come from the fragment memo, so only the parts
+        # the patch touched are rendered again
+        compiled = compile_resume(working.resume, output_mode=output_mode)
+        result.update(html=compiled["html"], bytes=compiled.get("bytes"))
+    return result
+
+@mcp.tool()
+@traced("tool.apply_resume_patch")
+async def apply_resume_patch(patch: list | dict | str, resume_id=DEFAULT_RESUME_ID,
+                             expected_version: str | None = None,
+                             compile: bool = False, output_mode="compact"):
+    """Edit the server-side working resume with a small patch instead of resending it
+    
+    Args:
+        patch: Either a JSON Patch (RFC 6902) list of operations, e.g.
+            [{"op": "replace", "path": "/experience/0/bullets/1", "value": "New text"}],
+            or a JSON merge patch (RFC 7386) object, e.g. {"phone": "555-0100"}
+        resume_id: Name of the working copy (see set_working_resume)
+        expected_version: Optional version the working copy must still be at
+        compile: Also return the re-rendered HTML
+        output_mode: HTML output mode when compiling ("pretty", "compact", "body-only")
+        
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the patch was applied
+        - message (str): Why the patch was rejected, if it was
+        - version (str): Version of the working copy after the call
+        - touched (list): Top-level fields the patch changed (only these are revalidated)
+        - html (str): The compiled HTML, if requested
+    """
+    return await asyncio.to_thread(
+        _apply_resume_patch, patch, resume_id, expected_version, compile, output_mode
+    )
+
+def _save_resume(resume_id, json_input, message):
+    if json_input is None:
+        working = get_working_resume(resume_id)
+        if working is None:
+            return {"valid": False, "message": f"No working resume '{resume_id}'; pass json_input to save"}
+        json_input = working.resume
+    return resume_store.save(resume_id, json_input, message)
+
+@mcp.tool()
+@traced("tool.save_resume")
+async def save_resume(resume_id, json_input=None, message=None):
+    """Save a resume under an id as a new version, so later calls can refer to it by id
+    
+    Versions are content-addressed: saving unchanged content adds no version.
+    
+    Args:
+        resume_id: Name of the resume, e.g. "acme-backend" (letters, digits, ".", "_", "-")
+        json_input: The resume in JSON format. If omitted, the working resume with the
+            same id (see load_resume and apply_resume_patch) is saved.
+        message: Optional note for the version, e.g. "Tailored for Acme backend role"
+        
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the resume was saved (invalid resumes are not)
+        - message (str): Result or validation message
+        - version (str): Version hash of the saved resume
+        - created (bool): Whether a new version was added
+    """
+    return await asyncio.to_thread(_save_resume, resume_id, json_input, message)
+
+def _load_resume(resume_id, working):
+    try:
+        stored_id, version, resume = resume_store.load(resume_id)
+    except (KeyError, ValueError) as e:
+        return {"valid": False, "message": e.args[0]}
+    result = {"valid": True, "message": "Resume loaded", "resume_id": stored_id,
+              "version": version, "resume": resume}
+    if working:
+        # Patches from apply_resume_patch(resume_id=...) then edit this version
+        state = set_working_resume(resume, stored_id)
+        result["working_version"] = state.get("version")
+    return result
+
+@mcp.tool()
+@traced("tool.load_resume")
+async def load_resume(resume_id, working: bool = True):
+    """Load a saved resume
+    
+    Args:
+        resume_id: "resume_id" for the latest version or "resume_id@version" for an
+            earlier one (a unique prefix of at least 7 characters of the version works)
+        working: Also make it the working resume with the same id, for apply_resume_patch
+        
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the resume was found
+        - message (str): Error message if not
+        - version (str): The full version hash
+        - resume (dict): The resume JSON
+    """
+    return await asyncio.to_thread(_load_resume, resume_id, working)
+
+def _list_resumes(prefix, limit, offset, resume_id):
+    if resume_id is not None:
+        try:
+            versions = resume_store.versions(resume_id)
+        except (KeyError, ValueError) as e:
+            return {"valid": False, "message": e.args[0]}
+        return {"valid": True, "message": f"{len(versions)} versions", "resume_id": resume_id,
+                "versions": versions[::-1][offset:offset + limit], "total": len(versions)}
+    total, resumes = resume_store.list(prefix, limit, offset)
+    return {"valid": True, "message": f"{total} saved resumes", "resumes": resumes, "total": total}
+
+@mcp.tool()
+@traced("tool.list_resumes")
+async def list_resumes(prefix="", limit: int = 50, offset: int = 0, resume_id=None):
+    """List saved resumes, or the versions of one resume, without loading any of them
+    
+    Args:
+        prefix: Only list resume ids starting with this
+        limit: Maximum number of entries to return
+        offset: Number of entries to skip, for paging
+        resume_id: List this resume's versions (newest first) instead of the resumes
+        
+    Returns:
+        A dictionary containing:
+        - resumes (list): resume_id, name, head version, updated time and version count,
+          most recently updated first
+        - versions (list): version, saved time, bytes and message, if resume_id is given
+        - total (int): Number of matching entries before paging
+    """
+    return await asyncio.to_thread(_list_resumes, prefix, limit, offset, resume_id)
+
+def _diff_resumes(from_id, to_id):
+    try:
+        result = resume_store.diff(from_id, to_id)
+    except (KeyError, ValueError) as e:
+        return {"valid": False, "message": e.args[0]}
+    return dict(result, valid=True, message=f"{len(result['patch'])} changes")
+
+@mcp.tool()
+@traced("tool.diff_resumes")
+async def diff_resumes(from_id, to_id):
+    """Compare two saved resumes or versions
+    
+    Args:
+        from_id: "resume_id" or "resume_id@version" to compare from
+        to_id: "resume_id" or "resume_id@version" to compare to
+        
+    Returns:
+        A dictionary containing:
+        - patch (list): JSON Patch (RFC 6902) operations turning from_id into to_id
+        - changed (list): Top-level fields that differ
+    """
+    return await asyncio.to_thread(_diff_resumes, from_id, to_id)
+
+def _find_resumes(company, title, bullet, all_versions, limit):
+    if resume_store.backend != "sqlite":
+        return {"valid": False, "message": "find_resumes needs the SQLite store (set RESUME_STORE_BACKEND=sqlite)"}
+    try:
+        matches = resume_store.search(company, title, bullet, all_versions, limit)
+    except ValueError as e:
+        return {"valid": False, "message": str(e)}
+    return {"valid": True, "message": f"{len(matches)} matching resumes", "matches": matches}
+
+@mcp.tool()
+@traced("tool.find_resumes")
+async def find_resumes(company=None, title=None, bullet=None, all_versions: bool = False,
+                       limit: int = 50):
+    """Find saved resumes by company, title or bullet text without loading them
+    
+    Args:
+        company: Company or institution name (prefix, case-insensitive), e.g. "acme"
+        title: Job title, project name or degree (prefix, case-insensitive)
+        bullet: Text contained in any bullet, e.g. "kubernetes"
+        all_versions: Search every saved version, not just the latest of each resume
+        limit: Maximum number of matches to return
+        
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the search ran
+        - message (str): Error message if not
+        - matches (list): resume_id, name, version and time of each match
+    """
+    return await asyncio.to_thread(_find_resumes, company, title, bullet, all_versions, limit)
+
+# Cache and pool statistics included in server_metrics
+register_collector("compile_cache", compile_cache_stats)
+register_collector("fragment_cache", fragment_cache_stats)
+register_collector("parsed_documents", parsed_document_stats)
+register_collector("pdf_render_pool", pdf_render_pool_stats)
+register_collector("extraction_cache", extraction_cache_stats)
+register_collector("resume_store", resume_store.stats)
+
+@mcp.tool()
+async def server_metrics(format="json", profile=None, profile_limit: int = 25):
+    """Report server timings, counters and cache statistics for diagnosing slow requests
+    
+    Args:
+        format: "json" (default) or "prometheus" for the Prometheus text format
+        profile: Optionally switch request profiling: "cprofile", "tracemalloc" or ""
+            to turn it off
+        profile_limit: Number of functions to include in the cProfile report
+        
+    Returns:
+        A dictionary containing:
+        - spans (dict): Per-stage call counts, errors and latency percentiles
+        - counters (list): Result and error counters by tool and exception type
+        - slow_requests (list): Recent slow tool calls with their stage timings
+        - collectors (dict): Cache and render pool statistics
+        - profile (str): Top functions by cumulative time, when cProfile is on
+        - text (str): The metrics in Prometheus format, if requested
+    """
+    if profile is not None:
+        try:
+            configure_profiling(profile)
+        except ValueError as e:
+            return {"error": str(e)}
+    data = await asyncio.to_thread(snapshot)
+    if format == "prometheus":
+        return {"text": prometheus_text(data)}
+    if data["profile_mode"] == "cprofile":
+        data["profile"] = profile_report(profile_limit)
+    return data
 
 # --- Prompt Implementation ---
 
-@mcp.prompt()
-def resume_edit_prompt():
-    """Create a prompt for editing a resume"""
-    system_instructions = """
+# The instructions and tool list never change while the server runs, so they are
+# joined once here; only the user context part of the prompt is rebuilt, when it changes
+RESUME_EDIT_INSTRUCTIONS = """
 You are an AI assistant specifically designed to help users improve their résumés. 
 Your task is to analyze the user's resume (provided as JSON) and respond to their questions or requests to modify the resume.
 
@@ -301,30 +775,99 @@ ADDITIONAL FEATURES:
 You can also compile the resume to HTML format using the compile_resume_tool tool. This will generate a formatted HTML preview of how the resume will look when printed. ONLY use this feature when the user explicitly requests to see the formatted resume, and ALWAYS ask before compiling to HTML.
 
 If you're having trouble with the JSON formatting, you can use the validate_json tool to check if your JSON is properly formatted, ONLY USE IF THE USER EXPLICITLY REQUESTS IT
+
+For small follow-up edits to a resume that was loaded with set_working_resume, you may send only the changes with apply_resume_patch (JSON Patch operations or a merge patch) instead of returning the complete JSON, and show the user the changed parts.
+
+Resumes saved with save_resume can be passed to compile_resume_tool and compile_resume_pdf by resume_id instead of json_input, and load_resume makes a saved resume the working resume for apply_resume_patch.
 """
-    
-    prompt = system_instructions
-    
-    # Add available tools information
-    tools_info = """
+
+RESUME_EDIT_TOOLS = """
 AVAILABLE TOOLS:
 
 1. 'get_user_context' to fetch background information about the user
 2. 'validate_json' to check if your JSON is properly formatted, ONLY USE IF THE USER EXPLICITLY REQUESTS IT
-3. 'compile_resume_tool' to generate an HTML preview of the resume, ONLY USE WHEN EXPLICITLY REQUESTED BY THE USER (ask first before using)
+3. 'compile_resume_tool' to generate an HTML preview of the resume, ONLY USE WHEN EXPLICITLY REQUESTED BY THE USER (ask first before using). Pass output_mode="compact" for previews to keep the result small
+4. 'compile_resumes_batch_tool' to compile several tailored variants in one call, either as full resumes or as JSON merge patches against a base resume, ONLY USE WHEN EXPLICITLY REQUESTED BY THE USER
+5. 'compile_resume_pdf' to render the resume directly to a PDF file, ONLY USE WHEN EXPLICITLY REQUESTED BY THE USER (ask first before using)
+6. 'fetch_artifact' to read, in chunks, an HTML or PDF result compiled with delivery="artifact"
+7. 'search_user_context' to find passages about the user in all of their context documents
+8. 'ingest_documents' to extract text from a folder of the user's documents, ONLY USE WHEN EXPLICITLY REQUESTED BY THE USER
+9. 'server_metrics' to report server timings and cache statistics, ONLY USE WHEN EXPLICITLY REQUESTED BY THE USER
+10. 'get_prompt_version' to check whether these instructions changed since they were last loaded
+11. 'set_working_resume' to load a resume on the server for patch-based editing
+12. 'apply_resume_patch' to change the working resume with a few JSON Patch operations or a merge patch
+13. 'get_working_resume' to read back the current working resume
+14. 'save_resume' to save a resume (or the working resume) under an id as a new version
+15. 'load_resume' to load a saved resume by id, optionally at an earlier version
+16. 'list_resumes' to list saved resumes or the versions of one resume
+17. 'diff_resumes' to compare two saved resumes or versions
+18. 'find_resumes' to find saved resumes by company, title or bullet text
 """
-    prompt += tools_info
-    
-    # Include user context information directly
-    user_context = build_user_context()
-    if user_context:
-        context_info = f"""
+
+_STATIC_PROMPT = RESUME_EDIT_INSTRUCTIONS + RESUME_EDIT_TOOLS
+STATIC_PROMPT_VERSION = hashlib.sha256(_STATIC_PROMPT.encode('utf-8')).hexdigest()[:16]
+
+_prompt_lock = threading.Lock()
+_prompt_cache = {"key": None, "prompt": None, "version": None}
+
+def _user_context_section(user_context, corpus_chars):
+    # Include user context information directly while it is small; larger context is
+    # left to search_user_context so the prompt doesn't grow with the corpus
+    section = ""
+    if user_context and len(user_context) <= CONTEXT_PROMPT_MAX_CHARS:
+        section += f"""
 USER CONTEXT (ONLY use information explicitly provided here, DO NOT make up additional details):
 {user_context}
 """
-        prompt += context_info
+    if corpus_chars > CONTEXT_PROMPT_MAX_CHARS or corpus_chars > len(user_context):
+        section += """
+MORE USER CONTEXT is available in the user's documents. Use 'search_user_context' with focused queries to retrieve the relevant passages (ONLY use information it returns, DO NOT make up additional details).
+"""
+    return section
+
+def build_resume_edit_prompt():
+    """Return (prompt, version) for resume_edit_prompt
+    
+    The user context and document corpus are checked for changes (a stat of each file,
+    both cached), and the prompt is reassembled only when they changed. The version is
+    a hash of the prompt text, so a client can tell when it needs to be sent again.
+    """
+    user_context = build_user_context()
+    corpus_chars = context_corpus.total_chars()
+    key = (user_context, corpus_chars)
+    with _prompt_lock:
+        if _prompt_cache["key"] == key:
+            return _prompt_cache["prompt"], _prompt_cache["version"]
     
-    return prompt
+    prompt = _STATIC_PROMPT + _user_context_section(user_context, corpus_chars)
+    version = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+    with _prompt_lock:
+        _prompt_cache.update(key=key, prompt=prompt, version=version)
+    return prompt, version
+
+@mcp.prompt()
+@traced("prompt.resume_edit_prompt")
+async def resume_edit_prompt():
+    """Create a prompt for editing a resume"""
+    prompt, version = await asyncio.to_thread(build_resume_edit_prompt)
+    return f"{prompt}\n(prompt version: {version})\n"
+
+@mcp.tool()
+async def get_prompt_version():
+    """Return the current version hash of resume_edit_prompt
+    
+    The version changes only when the prompt text changes (e.g. the user context was
+    edited), so a client that cached the prompt can compare versions instead of
+    fetching it again.
+    
+    Returns:
+        A dictionary containing:
+        - version (str): Hash of the full prompt
+        - static_version (str): Hash of the instructions and tool list alone
+        - chars (int): Length of the prompt
+    """
+    prompt, version = await asyncio.to_thread(build_resume_edit_prompt)
+    return {"version": version, "static_version": STATIC_PROMPT_VERSION, "chars": len(prompt)}
 
 if __name__ == "__main__":
     mcp.run()
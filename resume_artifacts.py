@@ -0,0 +1,225 @@
+import base64
+import gzip
+import hashlib
+import os
+import re
+import threading
+
+# Content-addressed store for compiled outputs, so large results can be returned as a
+# handle and pulled in chunks instead of as one huge tool message
+ARTIFACT_DIR = os.environ.get("RESUME_ARTIFACT_DIR", os.path.join("output", "artifacts"))
+ARTIFACT_MAX_BYTES = int(os.environ.get("RESUME_ARTIFACT_MAX_BYTES", 256_000_000))
+
+# Chunk sizes are measured in raw bytes, before base64
+ARTIFACT_CHUNK_SIZE = 256 * 1024
+ARTIFACT_MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Encodings a client can fetch an artifact in:
+# - base64: the stored bytes
+# - gzip: the bytes gzip-compressed, then base64-encoded
+ARTIFACT_ENCODINGS = ("base64", "gzip")
+
+MEDIA_TYPES = {
+    ".html": "text/html",
+    ".pdf": "application/pdf",
+    ".json": "application/json",
+}
+
+# Artifact ids are "<sha256><extension>", which also keeps fetches inside ARTIFACT_DIR
+_ARTIFACT_ID = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+
+_lock = threading.Lock()
+
+
+def _artifact_path(artifact_id, encoding="base64"):
+    path = os.path.join(ARTIFACT_DIR, artifact_id)
+    return f"{path}.gz" if encoding == "gzip" else path
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _evict_artifacts(keep=None):
+    """Remove the least recently stored artifacts until the store fits ARTIFACT_MAX_BYTES
+
+    An artifact's raw file and its gzip copy are evicted together, so a handle never
+    points at only half of an artifact. The artifact named by keep is never evicted.
+    """
+    try:
+        names = os.listdir(ARTIFACT_DIR)
+    except OSError:
+        return
+    artifacts = {}
+    for name in names:
+        if name.endswith(".tmp"):
+            continue
+        try:
+            st = os.stat(os.path.join(ARTIFACT_DIR, name))
+        except OSError:
+            continue
+        artifact_id = name[:-len(".gz")] if name.endswith(".gz") else name
+        mtime, size, files = artifacts.get(artifact_id, (0, 0, []))
+        files.append(name)
+        artifacts[artifact_id] = (max(mtime, st.st_mtime_ns), size + st.st_size, files)
+    total = sum(size for _, size, _ in artifacts.values())
+    for mtime, size, files in sorted(artifacts.values()):
+        if total <= ARTIFACT_MAX_BYTES:
+            break
+        if keep in files:
+            continue
+        for name in files:
+            try:
+                os.remove(os.path.join(ARTIFACT_DIR, name))
+            except OSError:
+                pass
+        total -= size
+
+
+def store_artifact(data, extension):
+    """Store bytes under their SHA-256 and return a handle describing them
+
+    Storing the same bytes again reuses the existing files and marks them as recently
+    stored, so eviction keeps them. A gzip copy is written alongside so compressed
+    fetches can be served in ranges.
+
+    Args:
+        data: The artifact contents (bytes, or str to be UTF-8 encoded)
+        extension: File extension including the dot, e.g. ".html"
+
+    Returns:
+        A dictionary containing:
+        - artifact_id (str): Handle to pass to fetch_artifact
+        - media_type (str): MIME type of the contents
+        - bytes (int): Size of the artifact
+        - gzip_bytes (int): Size of the gzip-compressed artifact
+        - sha256 (str): Hex digest of the artifact
+        - chunk_size (int): Default chunk size used by fetch_artifact
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    artifact_id = f"{digest}{extension}"
+    path = _artifact_path(artifact_id)
+    gzip_path = _artifact_path(artifact_id, "gzip")
+
+    with _lock:
+        if not (os.path.exists(path) and os.path.exists(gzip_path)):
+            os.makedirs(ARTIFACT_DIR, exist_ok=True)
+            _write_atomic(path, data)
+            # mtime=0 keeps the compressed bytes identical for identical content
+            _write_atomic(gzip_path, gzip.compress(data, mtime=0))
+            _evict_artifacts(keep=artifact_id)
+        else:
+            # Eviction goes by mtime, so a reused artifact counts as just stored
+            os.utime(path)
+            os.utime(gzip_path)
+        gzip_size = os.path.getsize(gzip_path)
+
+    return {
+        "artifact_id": artifact_id,
+        "media_type": MEDIA_TYPES.get(extension, "application/octet-stream"),
+        "bytes": len(data),
+        "gzip_bytes": gzip_size,
+        "sha256": digest,
+        "chunk_size": ARTIFACT_CHUNK_SIZE,
+    }
+
+
+def read_artifact_range(artifact_id, offset=0, length=None, encoding="base64"):
+    """Read part of a stored artifact
+
+    Args:
+        artifact_id: Handle returned by store_artifact
+        offset: Byte offset into the encoded stream (the gzip stream for "gzip")
+        length: Number of bytes to read, capped at ARTIFACT_MAX_CHUNK_SIZE
+        encoding: "base64" or "gzip"
+
+    Returns:
+        tuple: (chunk bytes, total size of the stream)
+
+    Raises:
+        ValueError: If the id, range or encoding is invalid
+        FileNotFoundError: If the artifact is not (or no longer) in the store
+    """
+    if not isinstance(artifact_id, str) or not _ARTIFACT_ID.match(artifact_id):
+        raise ValueError(f"Invalid artifact id '{artifact_id}'")
+    if encoding not in ARTIFACT_ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}', expected one of {', '.join(ARTIFACT_ENCODINGS)}")
+    if length is None:
+        length = ARTIFACT_CHUNK_SIZE
+    if offset < 0 or length <= 0:
+        raise ValueError("offset must be >= 0 and length must be > 0")
+    length = min(length, ARTIFACT_MAX_CHUNK_SIZE)
+
+    with open(_artifact_path(artifact_id, encoding), "rb") as f:
+        total = os.fstat(f.fileno()).st_size
+        f.seek(offset)
+        return f.read(length), total
+
+
+def fetch_artifact(artifact_id, offset=0, length=None, encoding="base64"):
+    """Fetch a chunk of a stored artifact, base64-encoded
+
+    Read chunks in order by passing next_offset back as offset until complete is true,
+    then concatenate the decoded chunks (and gunzip them for the "gzip" encoding).
+
+    Args:
+        artifact_id: Handle returned in a compile result
+        offset: Byte offset to start from
+        length: Maximum number of bytes to return (defaults to ARTIFACT_CHUNK_SIZE)
+        encoding: "base64" for the raw bytes or "gzip" for the compressed stream
+
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the chunk could be read
+        - message (str): Error message if not
+        - data (str): The chunk, base64-encoded
+        - offset (int): Offset of the chunk
+        - length (int): Number of bytes in the chunk
+        - total (int): Size of the whole encoded stream
+        - next_offset (int): Offset of the following chunk, or None when complete
+        - complete (bool): Whether this chunk reaches the end
+    """
+    try:
+        chunk, total = read_artifact_range(artifact_id, offset, length, encoding)
+    except ValueError as e:
+        return {"valid": False, "message": str(e), "data": None}
+    except FileNotFoundError:
+        return {"valid": False, "message": f"Artifact '{artifact_id}' not found", "data": None}
+
+    end = offset + len(chunk)
+    complete = end >= total
+    return {
+        "valid": True,
+        "message": "Chunk read successfully",
+        "artifact_id": artifact_id,
+        "encoding": encoding,
+        "data": base64.b64encode(chunk).decode('ascii'),
+        "offset": offset,
+        "length": len(chunk),
+        "total": total,
+        "next_offset": None if complete else end,
+        "complete": complete,
+    }
+
+
+def artifact_result(result, field, data, extension):
+    """Replace an inline field of a successful tool result with an artifact handle
+
+    Args:
+        result: Result dictionary from a compile function
+        field: Key holding the inline output (e.g. "html"), set to None in the copy
+        data: The output to store
+        extension: File extension for the artifact
+
+    Returns:
+        A copy of result with an "artifact" entry (see store_artifact)
+    """
+    result = dict(result)
+    result[field] = None
+    result["artifact"] = store_artifact(data, extension)
+    return result
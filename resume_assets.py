@@ -0,0 +1,108 @@
+import hashlib
+import os
+import re
+import threading
+
+# html2pdf.js, used by the "Download PDF" button in compiled HTML
+HTML2PDF_VERSION = "0.10.1"
+HTML2PDF_FILENAME = f"html2pdf-{HTML2PDF_VERSION}.bundle.min.js"
+HTML2PDF_URL = f"https://cdnjs.cloudflare.com/ajax/libs/html2pdf.js/{HTML2PDF_VERSION}/html2pdf.bundle.min.js"
+
+# Local cache of downloaded assets, so compiled HTML can embed or link them offline
+ASSET_CACHE_DIR = os.environ.get("RESUME_ASSET_CACHE_DIR", os.path.join(".cache", "assets"))
+
+# Subdirectory of the output directory that holds shared, versioned asset files
+LINKED_ASSET_DIR = "assets"
+
+# How compiled HTML gets its stylesheet and html2pdf.js:
+# - cdn: inline stylesheet, script loaded from cdnjs (the original output)
+# - inline: minified stylesheet and the locally cached script embedded in the document
+# - linked: shared versioned files written once beside the outputs and referenced
+ASSET_MODES = ("cdn", "inline", "linked")
+
+_lock = threading.Lock()
+_html2pdf_bundle = None
+
+
+def minify_css(css):
+    """Strip comments and insignificant whitespace from a stylesheet"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def html2pdf_cache_path():
+    return os.path.join(ASSET_CACHE_DIR, HTML2PDF_FILENAME)
+
+
+def load_html2pdf_bundle():
+    """Return the locally cached html2pdf.js bundle, or None if it hasn't been fetched
+
+    The file is read once per process and kept in memory.
+    """
+    global _html2pdf_bundle
+    if _html2pdf_bundle is None:
+        try:
+            with open(html2pdf_cache_path(), "r", encoding="utf-8") as f:
+                _html2pdf_bundle = f.read()
+        except OSError:
+            return None
+    return _html2pdf_bundle
+
+
+def fetch_html2pdf_bundle(timeout=30.0):
+    """Download html2pdf.js into the local asset cache (the only step that needs network)
+
+    Returns:
+        str: Path of the cached bundle
+    """
+    global _html2pdf_bundle
+    import httpx
+
+    path = html2pdf_cache_path()
+    if os.path.exists(path):
+        return path
+    response = httpx.get(HTML2PDF_URL, timeout=timeout, follow_redirects=True)
+    response.raise_for_status()
+    os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(response.text)
+    os.replace(tmp_path, path)
+    with _lock:
+        _html2pdf_bundle = None
+    return path
+
+
+def write_linked_asset(name, extension, content, output_dir):
+    """Write content once as <output_dir>/assets/<name>-<hash><extension>
+
+    The hash in the file name versions the asset, so documents linking an older copy
+    keep working and browsers may cache each version indefinitely.
+
+    Returns:
+        str: The asset path relative to output_dir, for use in href/src attributes
+    """
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    filename = f"{name}-{digest}{extension}"
+    asset_dir = os.path.join(output_dir, LINKED_ASSET_DIR)
+    path = os.path.join(asset_dir, filename)
+    # Checked on every call (callers memoize the href), so a cleaned output directory
+    # gets its files back
+    if not os.path.exists(path):
+        os.makedirs(asset_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    return f"{LINKED_ASSET_DIR}/{filename}"
+
+
+if __name__ == "__main__":
+    # Prefetch assets so the "inline" and "linked" modes work without network access
+    try:
+        print(f"html2pdf.js cached at {fetch_html2pdf_bundle()}")
+    except Exception as e:
+        print(f"Failed to fetch html2pdf.js: {str(e)}")
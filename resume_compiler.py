@@ -1,134 +1,341 @@
+import copy
+import functools
+import hashlib
 import json
 import os
+import re
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait
+from resume_cache import LRUCache, DiskCache, canonical_hash
+from resume_metrics import count, span
+from resume_patch import apply_merge_patch
+from resume_render_pool import terminate_workers, worker_context
+from resume_assets import (
+    ASSET_MODES,
+    HTML2PDF_URL,
+    load_html2pdf_bundle,
+    minify_css,
+    write_linked_asset,
+)
 
-def validate_resume_json(resume_data):
+# Compiled output cache, keyed on the canonical hash of the parsed resume
+COMPILE_CACHE_MAX_ENTRIES = 128
+COMPILE_CACHE_MAX_BYTES = 32_000_000  # ~32 MB of compiled HTML
+COMPILE_CACHE_DIR = os.environ.get("RESUME_COMPILE_CACHE_DIR")  # Optional on-disk tier
+COMPILE_CACHE_DISK_MAX_BYTES = 256_000_000
+
+_compile_cache = LRUCache(
+    max_entries=COMPILE_CACHE_MAX_ENTRIES,
+    max_bytes=COMPILE_CACHE_MAX_BYTES,
+    sizeof=lambda result: len(result["html"] or "") + len(result["message"]),
+)
+_compile_disk_cache = (
+    DiskCache(COMPILE_CACHE_DIR, max_bytes=COMPILE_CACHE_DISK_MAX_BYTES)
+    if COMPILE_CACHE_DIR else None
+)
+
+# Resume schema. Top-level fields that must be non-empty strings:
+REQUIRED_FIELDS = ('name', 'location', 'phone', 'email')
+
+# Optional array fields, in validation order. Each entry gives the item type and, for
+# object items, the label used in messages, the required item fields and the item
+# fields that must be arrays of strings (mapped to the noun used for their elements).
+RESUME_ARRAY_SCHEMA = {
+    'technicalSkills': {'item_type': str},
+    'education': {
+        'item_type': dict,
+        'label': 'Education item',
+        'required': ('institution', 'location', 'graduationDate', 'degree'),
+        'string_lists': {'coursework': 'Course'},
+    },
+    'experience': {
+        'item_type': dict,
+        'label': 'Experience item',
+        'required': ('title', 'company', 'location', 'dateRange'),
+        'string_lists': {'bullets': 'Bullet'},
+    },
+    'projects': {
+        'item_type': dict,
+        'label': 'Project item',
+        'required': ('name', 'dateRange'),
+        'string_lists': {'bullets': 'Bullet'},
+    },
+    'publications': {
+        'item_type': dict,
+        'label': 'Publication item',
+        'required': ('title', 'citation'),
+        'string_lists': {'bullets': 'Bullet'},
+    },
+}
+
+# Error phases. The first error reported is the earliest by phase, then document order,
+# which matches checking required fields, then array types, then section structure.
+_PHASE_REQUIRED, _PHASE_TYPES, _PHASE_STRUCTURE = 0, 1, 2
+
+# A validation error. item is the index of the array item it concerns (None for errors
+# about the field itself) and rule names the broken rule without the item's position,
+# so the same error can be recognized after items are inserted or removed ahead of it.
+ResumeError = namedtuple('ResumeError', ['phase', 'message', 'item', 'rule'])
+
+def _compile_array_rules(schema):
+    """Flatten the array schema into tuples so the validator does no dict lookups per item"""
+    rules = []
+    for field, spec in schema.items():
+        label = spec.get('label')
+        rules.append((
+            field,
+            spec['item_type'],
+            spec['item_type'].__name__,
+            label,
+            label.lower() if label else None,
+            spec.get('required', ()),
+            tuple(spec.get('string_lists', {}).items()),
+        ))
+    return tuple(rules)
+
+_ARRAY_RULES = _compile_array_rules(RESUME_ARRAY_SCHEMA)
+
+# Hashes of documents that were already validated, mapped to their error lists
+VALIDATION_CACHE_MAX_ENTRIES = 1024
+_validation_cache = LRUCache(max_entries=VALIDATION_CACHE_MAX_ENTRIES)
+
+def _collect_resume_errors(resume_data, fields=None):
+    """Walk the document once and return every error as a ResumeError
+    
+    If fields is given, only the rules for those top-level fields are checked.
+    """
+    errors = []
+    for field in REQUIRED_FIELDS:
+        if fields is not None and field not in fields:
+            continue
+        if field not in resume_data:
+            errors.append(ResumeError(_PHASE_REQUIRED, f"Missing required field: '{field}'", None, ('missing',)))
+        elif not isinstance(resume_data[field], str) or not resume_data[field].strip():
+            # Check that required fields are strings and not empty
+            errors.append(ResumeError(_PHASE_REQUIRED, f"Field '{field}' must be a non-empty string", None, ('string',)))
+    
+    for field, item_type, type_name, label, lowered, required, string_lists in _ARRAY_RULES:
+        if field not in resume_data or (fields is not None and field not in fields):
+            continue
+        items = resume_data[field]
+        if not isinstance(items, list):
+            errors.append(ResumeError(_PHASE_TYPES, f"Field '{field}' must be an array", None, ('array',)))
+            continue
+        
+        for i, item in enumerate(items):
+            if not isinstance(item, item_type):
+                errors.append(ResumeError(_PHASE_TYPES, f"Item {i} in '{field}' must be a {type_name}", i, ('type',)))
+                continue
+            if label is None:
+                continue
+            
+            for required_field in required:
+                if required_field not in item:
+                    errors.append(ResumeError(
+                        _PHASE_STRUCTURE, f"{label} {i} is missing required field: '{required_field}'",
+                        i, ('missing', required_field),
+                    ))
+            
+            # Nested arrays (bullets, coursework) must hold only strings
+            for list_field, noun in string_lists:
+                if list_field not in item:
+                    continue
+                values = item[list_field]
+                if not isinstance(values, list):
+                    errors.append(ResumeError(
+                        _PHASE_STRUCTURE, f"'{list_field}' in {lowered} {i} must be an array",
+                        i, ('array', list_field),
+                    ))
+                    continue
+                for j, value in enumerate(values):
+                    if not isinstance(value, str):
+                        errors.append(ResumeError(
+                            _PHASE_STRUCTURE, f"{noun} {j} in {lowered} {i} must be a string",
+                            i, ('string', list_field),
+                        ))
+    
+    return errors
+
+def validate_resume_json(resume_data, collect_all=False, content_hash=None):
     """
     Validates that the resume JSON has the correct format according to ResumeBuilder requirements.
     
+    The rules in REQUIRED_FIELDS and RESUME_ARRAY_SCHEMA are compiled once at import and
+    the document is checked in a single pass.
+    
     Args:
         resume_data: Dictionary or JSON string containing resume data
+        collect_all: If True, report every error (joined with "; ") instead of only the first
+        content_hash: Optional canonical hash of resume_data. Documents whose hash was
+            already validated return immediately without being walked again.
     
     Returns:
         tuple: (is_valid, error_message)
             - is_valid (bool): True if the resume is valid, False otherwise
             - error_message (str): Description of the validation error if any, empty string if valid
     """
+    is_valid, errors = validate_resume_errors(resume_data, content_hash=content_hash)
+    if is_valid:
+        return True, ""
+    return False, "; ".join(errors) if collect_all else errors[0]
+
+def validate_resume_errors(resume_data, content_hash=None):
+    """Validate resume data and return (is_valid, errors) with every error message listed"""
     # If a string is provided, try to parse it as JSON
     if isinstance(resume_data, str):
         try:
             resume_data = json.loads(resume_data)
         except json.JSONDecodeError as e:
-            return False, f"Invalid JSON format: {str(e)}"
+            return False, [f"Invalid JSON format: {str(e)}"]
     
     # Check if resume_data is a dictionary
     if not isinstance(resume_data, dict):
-        return False, "Resume data must be a JSON object (dictionary)"
+        return False, ["Resume data must be a JSON object (dictionary)"]
     
-    # Required fields for a valid resume
-    required_fields = ['name', 'location', 'phone', 'email']
+    if content_hash is not None:
+        cached = _validation_cache.get(content_hash)
+        if cached is not None:
+            return not cached, list(cached)
     
-    # Check all required fields are present
-    for field in required_fields:
-        if field not in resume_data:
-            return False, f"Missing required field: '{field}'"
-        
-        # Check that required fields are strings and not empty
-        if not isinstance(resume_data[field], str) or not resume_data[field].strip():
-            return False, f"Field '{field}' must be a non-empty string"
-    
-    # Validate optional array fields
-    array_fields = {
-        'technicalSkills': str,
-        'education': dict,
-        'experience': dict,
-        'projects': dict,
-        'publications': dict
+    errors = _collect_resume_errors(resume_data)
+    # Stable sort keeps document order within each phase
+    messages = tuple(error.message for error in sorted(errors, key=lambda error: error.phase)) if errors else ()
+    
+    if content_hash is not None:
+        _validation_cache.put(content_hash, messages)
+    return not messages, list(messages)
+
+# Top-level fields in the order their errors are reported
+VALIDATED_FIELDS = REQUIRED_FIELDS + tuple(RESUME_ARRAY_SCHEMA)
+
+def validate_resume_fields(resume_data, fields):
+    """Validate only some top-level fields of a resume
+    
+    Used after a patch, when the rest of the document is known to be unchanged.
+    
+    Args:
+        resume_data: Dictionary containing resume data
+        fields: Top-level field names to check
+    
+    Returns:
+        dict: Each validated field in fields mapped to its list of ResumeError. Merge
+        these with the errors of the untouched fields using order_resume_errors.
+    """
+    return {
+        field: _collect_resume_errors(resume_data, (field,))
+        for field in fields if field in VALIDATED_FIELDS
     }
+
+def order_resume_errors(errors_by_field):
+    """Flatten per-field ResumeErrors into messages in validator order"""
+    errors = [
+        error for field in VALIDATED_FIELDS for error in errors_by_field.get(field, ())
+    ]
+    return [error.message for error in sorted(errors, key=lambda error: error.phase)]
+
+# Short-lived store of parsed and validated documents, so that validate_json followed by
+# compile_resume_tool on the same input only parses and validates it once
+PARSED_DOCUMENT_MAX_ENTRIES = 64
+PARSED_DOCUMENT_TTL_SECONDS = 300
+_parsed_documents = LRUCache(max_entries=PARSED_DOCUMENT_MAX_ENTRIES, ttl=PARSED_DOCUMENT_TTL_SECONDS)
+
+# A parsed resume, its canonical hash (None if it can't be hashed) and its validation errors
+ResumeDocument = namedtuple('ResumeDocument', ['resume', 'content_hash', 'errors'])
+
+def load_resume_document(json_input):
+    """Parse and validate a resume, reusing the result for identical recent input
     
-    for field, expected_type in array_fields.items():
-        if field in resume_data:
-            if not isinstance(resume_data[field], list):
-                return False, f"Field '{field}' must be an array"
-            
-            # Check array elements
-            for i, item in enumerate(resume_data[field]):
-                if not isinstance(item, expected_type):
-                    return False, f"Item {i} in '{field}' must be a {expected_type.__name__}"
-    
-    # Validate education structure
-    if 'education' in resume_data and resume_data['education']:
-        education_required = ['institution', 'location', 'graduationDate', 'degree']
-        for i, edu in enumerate(resume_data['education']):
-            for field in education_required:
-                if field not in edu:
-                    return False, f"Education item {i} is missing required field: '{field}'"
-            
-            # Validate coursework if present
-            if 'coursework' in edu:
-                if not isinstance(edu['coursework'], list):
-                    return False, f"'coursework' in education item {i} must be an array"
-                
-                # Check that all coursework items are strings
-                for j, course in enumerate(edu['coursework']):
-                    if not isinstance(course, str):
-                        return False, f"Course {j} in education item {i} must be a string"
-    
-    # Validate experience structure
-    if 'experience' in resume_data and resume_data['experience']:
-        experience_required = ['title', 'company', 'location', 'dateRange']
-        for i, exp in enumerate(resume_data['experience']):
-            for field in experience_required:
-                if field not in exp:
-                    return False, f"Experience item {i} is missing required field: '{field}'"
-            
-            # Check bullets field
-            if 'bullets' in exp and not isinstance(exp['bullets'], list):
-                return False, f"'bullets' in experience item {i} must be an array"
-            
-            # Validate all bullets are strings if they exist
-            if 'bullets' in exp and isinstance(exp['bullets'], list):
-                for j, bullet in enumerate(exp['bullets']):
-                    if not isinstance(bullet, str):
-                        return False, f"Bullet {j} in experience item {i} must be a string"
-    
-    # Validate projects structure
-    if 'projects' in resume_data and resume_data['projects']:
-        project_required = ['name', 'dateRange']
-        for i, proj in enumerate(resume_data['projects']):
-            for field in project_required:
-                if field not in proj:
-                    return False, f"Project item {i} is missing required field: '{field}'"
-            
-            # Check bullets field
-            if 'bullets' in proj and not isinstance(proj['bullets'], list):
-                return False, f"'bullets' in project item {i} must be an array"
-            
-            # Validate all bullets are strings if they exist
-            if 'bullets' in proj and isinstance(proj['bullets'], list):
-                for j, bullet in enumerate(proj['bullets']):
-                    if not isinstance(bullet, str):
-                        return False, f"Bullet {j} in project item {i} must be a string"
-    
-    # Validate publications structure
-    if 'publications' in resume_data and resume_data['publications']:
-        publication_required = ['title', 'citation']
-        for i, pub in enumerate(resume_data['publications']):
-            for field in publication_required:
-                if field not in pub:
-                    return False, f"Publication item {i} is missing required field: '{field}'"
-            
-            # Check bullets field
-            if 'bullets' in pub and not isinstance(pub['bullets'], list):
-                return False, f"'bullets' in publication item {i} must be an array"
-            
-            # Validate all bullets are strings if they exist
-            if 'bullets' in pub and isinstance(pub['bullets'], list):
-                for j, bullet in enumerate(pub['bullets']):
-                    if not isinstance(bullet, str):
-                        return False, f"Bullet {j} in publication item {i} must be a string"
+    String input is looked up by a hash of the raw text before it is parsed, so a
+    repeated string costs one hash instead of a parse, a canonical hash and a walk.
+    Dictionary input belongs to the caller, who may change it later, so the store
+    keeps a copy of it rather than the dictionary itself.
+    
+    Args:
+        json_input: A resume in JSON format (string or dictionary)
+    
+    Returns:
+        tuple: (document, reused)
+            - document (ResumeDocument): The parsed resume, its hash and its errors
+            - reused (bool): True if the document came from the store
+    
+    Raises:
+        json.JSONDecodeError: If a string input is not valid JSON
+        TypeError: If the input is neither a string nor a dictionary
+    """
+    if isinstance(json_input, str):
+        raw_hash = hashlib.sha256(json_input.encode('utf-8', 'surrogatepass')).hexdigest()
+        store_key = f"text:{raw_hash}"
+        document = _parsed_documents.get(store_key)
+        if document is not None:
+            return document, True
+        resume_data = json.loads(json_input)
+    elif isinstance(json_input, dict):
+        store_key = None
+        resume_data = json_input
+    else:
+        raise TypeError(f"Input must be a JSON string or dictionary, got {type(json_input)}")
+    
+    try:
+        content_hash = canonical_hash(resume_data)
+    except (TypeError, ValueError):
+        content_hash = None
+    
+    if store_key is None and content_hash is not None:
+        store_key = f"hash:{content_hash}"
+        document = _parsed_documents.get(store_key)
+        if document is not None:
+            return document, True
+    
+    _, errors = validate_resume_errors(resume_data, content_hash=content_hash)
+    document = ResumeDocument(resume_data, content_hash, tuple(errors))
+    if store_key is not None:
+        if resume_data is json_input:
+            _parsed_documents.put(store_key, document._replace(resume=copy.deepcopy(resume_data)))
+        else:
+            _parsed_documents.put(store_key, document)
+    return document, False
+
+def register_resume_document(resume_data, errors, content_hash=None):
+    """Record a resume whose validation errors are already known (e.g. after a patch)
+    
+    A following compile_resume of the same document then skips validation.
     
-    # If all checks pass, the resume is valid
-    return True, ""
+    Returns:
+        ResumeDocument: The stored document
+    """
+    if content_hash is None:
+        content_hash = canonical_hash(resume_data)
+    errors = tuple(errors)
+    _validation_cache.put(content_hash, errors)
+    document = ResumeDocument(resume_data, content_hash, errors)
+    _parsed_documents.put(f"hash:{content_hash}", document)
+    return document
+
+def parsed_document_stats():
+    """Return hit/miss counters for the parsed document store"""
+    return _parsed_documents.stats()
+
+# Bold markup tokenizer: text between ** delimiters is bold, an unclosed ** runs to the end
+_BOLD_DELIMITER = re.compile(r'\*\*')
+BOLD_MARKUP_CACHE_SIZE = 8192
+
+@functools.lru_cache(maxsize=BOLD_MARKUP_CACHE_SIZE)
+def split_bold_markup(text):
+    """Split text into (segment, is_bold) pairs in a single pass, dropping empty segments"""
+    return tuple(
+        (segment, i % 2 == 1)
+        for i, segment in enumerate(_BOLD_DELIMITER.split(text))
+        if segment
+    )
+
+@functools.lru_cache(maxsize=BOLD_MARKUP_CACHE_SIZE)
+def _bold_markup_to_html(text):
+    return "".join(
+        f"<strong>{segment}</strong>" if is_bold else segment
+        for segment, is_bold in split_bold_markup(text)
+    )
 
 def parse_bullet_text_html(text):
     """Parse text with bold formatting (text inside ** will be bolded)"""
@@ -138,45 +345,21 @@ def parse_bullet_text_html(text):
     if '**' not in text:
         return text
     
-    # Replace **text** with <strong>text</strong>
-    parts = []
-    is_bold = False
-    current_part = ""
-    i = 0
-    
-    while i < len(text):
-        if i + 1 < len(text) and text[i:i+2] == '**':
-            # Add the current part to the result
-            if current_part:
-                parts.append(f"<strong>{current_part}</strong>" if is_bold else current_part)
-                current_part = ""
-            
-            # Toggle bold state
-            is_bold = not is_bold
-            i += 2
-        else:
-            current_part += text[i]
-            i += 1
-    
-    # Add the last part
-    if current_part:
-        parts.append(f"<strong>{current_part}</strong>" if is_bold else current_part)
-    
-    return "".join(parts)
+    # Replace **text** with <strong>text</strong>; repeated bullets come from the memo
+    return _bold_markup_to_html(text)
 
-def generate_resume_html(resume_data):
-    """Generate HTML for a resume that matches the ResumeBuilder component output"""
-    # Start building HTML
-    html = """
+# Static document head, up to the asset tags
+_HTML_HEAD_OPEN = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Resume</title>
-    <!-- Include html2pdf.js for PDF conversion -->
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/html2pdf.js/0.10.1/html2pdf.bundle.min.js"></script>
-    <style>
+"""
+
+# Inline stylesheet of the resume template
+RESUME_STYLESHEET = """
         @page {
             size: letter;  /* 8.5in x 11in */
             margin: 0.5in;
@@ -437,8 +620,10 @@ def generate_resume_html(resume_data):
                 page-break-before: always;
             }
         }
-    </style>
-</head>
+    """
+
+# Closes the head and opens the resume container
+_HTML_BODY_OPEN = """</head>
 <body>
     <div class="container">
         <div class="actions">
@@ -449,280 +634,717 @@ def generate_resume_html(resume_data):
         <div class="resume-wrapper" id="resume-content">
             <div class="resume">
 """
+
+HTML2PDF_SCRIPT_TAG = f"""    <!-- Include html2pdf.js for PDF conversion -->
+    <script src="{HTML2PDF_URL}"></script>
+"""
+
+# Static document head: metadata, the html2pdf.js loader and the inline stylesheet
+RESUME_HTML_HEAD = (
+    _HTML_HEAD_OPEN + HTML2PDF_SCRIPT_TAG
+    + "    <style>" + RESUME_STYLESHEET + "</style>\n"
+    + _HTML_BODY_OPEN
+)
+
+# Directory compiled documents are written to; "linked" assets are placed beside them
+OUTPUT_DIR = "output"
+
+def _inline_script_tag(script):
+    # Keep a literal "</script" inside the bundle from closing the tag early
+    script = script.replace('</script', '<\\/script')
+    return f"    <script>{script}</script>\n"
+
+def _build_html_head(assets, output_dir, html2pdf_bundle):
+    """Return (head, paths of the linked asset files it references)"""
+    if assets == "cdn":
+        return RESUME_HTML_HEAD, ()
+    if assets == "inline":
+        script = _inline_script_tag(html2pdf_bundle) if html2pdf_bundle else HTML2PDF_SCRIPT_TAG
+        return (
+            _HTML_HEAD_OPEN + script
+            + "    <style>" + minify_css(RESUME_STYLESHEET) + "</style>\n"
+            + _HTML_BODY_OPEN
+        ), ()
+    # linked: shared, versioned files beside the outputs
+    css_href = write_linked_asset("resume", ".css", minify_css(RESUME_STYLESHEET), output_dir)
+    hrefs = [css_href]
+    script = HTML2PDF_SCRIPT_TAG
+    if html2pdf_bundle:
+        script_src = write_linked_asset("html2pdf", ".js", html2pdf_bundle, output_dir)
+        hrefs.append(script_src)
+        script = f'    <script src="{script_src}"></script>\n'
+    return (
+        _HTML_HEAD_OPEN + script
+        + f'    <link rel="stylesheet" href="{css_href}">\n'
+        + _HTML_BODY_OPEN
+    ), tuple(os.path.join(output_dir, href) for href in hrefs)
+
+# (assets, output dir, bundle cached, output mode) -> (head, digest, linked asset paths)
+_html_heads = {}
+
+def _html_head_entry(assets, output_dir, output_mode):
+    if assets not in ASSET_MODES:
+        raise ValueError(f"Unknown asset mode '{assets}', expected one of {', '.join(ASSET_MODES)}")
+    html2pdf_bundle = load_html2pdf_bundle() if assets != "cdn" else None
+    key = (assets, os.path.abspath(output_dir), html2pdf_bundle is not None, output_mode)
+    entry = _html_heads.get(key)
+    # A linked head is only valid while its asset files exist; rebuilding rewrites them
+    if entry is None or not all(map(os.path.exists, entry[2])):
+        head, asset_paths = _build_html_head(assets, output_dir, html2pdf_bundle)
+        if output_mode == "compact":
+            head = compact_html(head.replace(
+                f"<style>{RESUME_STYLESHEET}</style>", f"<style>{minify_css(RESUME_STYLESHEET)}</style>"
+            ))
+        digest = hashlib.sha256(head.encode('utf-8')).hexdigest()[:16]
+        entry = _html_heads[key] = (head, digest, asset_paths)
+    return entry
+
+def render_html_head(assets="cdn", output_dir=OUTPUT_DIR, output_mode="pretty"):
+    """Return the document head for an asset mode (see resume_assets.ASSET_MODES)
+    
+    Heads are built once per mode and reused. Without a locally cached html2pdf.js
+    (python resume_assets.py fetches it), the script still loads from the CDN.
+    """
+    return _html_head_entry(assets, output_dir, output_mode)[0]
+
+def html_head_digest(assets="cdn", output_dir=OUTPUT_DIR, output_mode="pretty"):
+    """Return a short hash identifying the head render_html_head currently produces
+    
+    It changes when the html2pdf.js bundle is fetched (the head switches from the CDN
+    script to the local copy) or when the stylesheet changes.
+    """
+    return _html_head_entry(assets, output_dir, output_mode)[1]
+
+# Output modes for compiled HTML:
+# - pretty: the indented document
+# - compact: the same document without comments or whitespace between tags, with the
+#   stylesheet minified
+# - body-only: only the compacted <div class="resume"> fragment, for clients that
+#   already hold the stylesheet
+OUTPUT_MODES = ("pretty", "compact", "body-only")
+
+_SCRIPT_BLOCK = re.compile(r'(<script\b.*?</script>)', re.DOTALL | re.IGNORECASE)
+_HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+_NEWLINE_WHITESPACE = re.compile(r'\s*\n\s*')
+_WHITESPACE_BETWEEN_TAGS = re.compile(r'>\s+<')
+# Whitespace beside these tags is never rendered
+_BLOCK_TAGS = r'(?:html|head|body|meta|title|link|style|div|p|h[1-6]|ul|ol|li|br|hr)\b'
+_NEWLINE_BEFORE_BLOCK_TAG = re.compile(rf'\s*\n\s*(?=</?{_BLOCK_TAGS})', re.IGNORECASE)
+_NEWLINE_AFTER_BLOCK_TAG = re.compile(rf'(</?{_BLOCK_TAGS}[^>]*>)\s*\n\s*', re.IGNORECASE)
+
+def compact_html(html):
+    """Drop comments and layout whitespace from an HTML fragment
+    
+    Only whitespace runs containing a newline are template layout: they are removed
+    beside block-level tags and collapse to one space elsewhere. Other whitespace
+    (e.g. between two bold spans of a bullet) is kept, so the text reads the same as
+    in the pretty document. <script> blocks are left untouched.
+    """
+    parts = _SCRIPT_BLOCK.split(html)
+    for i in range(0, len(parts), 2):
+        part = _HTML_COMMENT.sub('', parts[i])
+        part = _NEWLINE_AFTER_BLOCK_TAG.sub(r'\1', part)
+        part = _NEWLINE_BEFORE_BLOCK_TAG.sub('', part)
+        parts[i] = _NEWLINE_WHITESPACE.sub(' ', part)
+    return "".join(parts).strip()
+
+# Static document tail: closing tags and the PDF download script
+RESUME_HTML_FOOT = """
+            </div>
+        </div>
+    </div>
     
-    # Add header section
-    html += f"""
+    <script>
+        function downloadPDF() {
+            // Get the resume content element
+            const element = document.getElementById('resume-content');
+            
+            // Options for html2pdf
+            const options = {
+                margin: 0,
+                filename: 'resume.pdf',
+                image: { type: 'jpeg', quality: 1 },
+                html2canvas: { scale: 2, useCORS: true },
+                jsPDF: { unit: 'in', format: 'letter', orientation: 'portrait' }
+            };
+            
+            // Generate and save the PDF
+            html2pdf().set(options).from(element).save();
+        }
+    </script>
+</body>
+</html>
+"""
+
+# The tail is static and its script only has full-line comments, so once they are gone
+# it is safe to collapse all whitespace between tags
+_COMPACT_HTML_FOOT = _WHITESPACE_BETWEEN_TAGS.sub('><', _NEWLINE_WHITESPACE.sub(
+    ' ', re.sub(r'^\s*//.*\n', '', RESUME_HTML_FOOT, flags=re.MULTILINE)
+)).strip()
+
+# Rendered fragments, keyed on the kind of fragment plus the content hash of its data
+FRAGMENT_CACHE_MAX_ENTRIES = 4096
+_fragment_cache = LRUCache(max_entries=FRAGMENT_CACHE_MAX_ENTRIES)
+
+# Fields of the top-level resume that feed the header fragment
+HEADER_FIELDS = ('name', 'location', 'phone', 'email', 'website')
+
+def _fragment_key(kind, data):
+    """Return the memo key for a fragment, or None if data can't be hashed"""
+    try:
+        return f"{kind}:{canonical_hash(data)}"
+    except (TypeError, ValueError):
+        return None
+
+def _memoized_fragment(kind, data, render):
+    """Render data with render(), reusing a previous result for identical content"""
+    key = _fragment_key(kind, data)
+    if key is None:
+        return render(data)
+    html = _fragment_cache.get(key)
+    if html is None:
+        html = render(data)
+        _fragment_cache.put(key, html)
+    return html
+
+def render_header_html(header):
+    """Render the name and contact block"""
+    return f"""
                 <div class="header">
-                    <h1>{resume_data.get('name', '')}</h1>
+                    <h1>{header.get('name', '')}</h1>
                     <p class="contact-info">
-                        <span>{resume_data.get('location', '')}</span> | <span>{resume_data.get('phone', '')}</span> | <span>{resume_data.get('email', '')}</span>
+                        <span>{header.get('location', '')}</span> | <span>{header.get('phone', '')}</span> | <span>{header.get('email', '')}</span>
                     </p>
-                    {f'<p style="margin: 2px 0; font-size: 10pt; line-height: 1.2">{resume_data.get("website", "")}</p>' if resume_data.get('website') else ''}
+                    {f'<p style="margin: 2px 0; font-size: 10pt; line-height: 1.2">{header.get("website", "")}</p>' if header.get('website') else ''}
                 </div>
 """
-    
-    # Add education section
-    if 'education' in resume_data and resume_data['education']:
-        html += """
-                <div class="section">
-                    <h2>EDUCATION</h2>
-                    <div id="educationList">
-"""
-        for edu in resume_data['education']:
-            html += f"""
+
+def render_education_item_html(edu):
+    """Render a single education entry"""
+    parts = [f"""
                         <div class="education-item">
                             <p style="margin-bottom: 0; margin-top: 0;">
                                 <strong>{parse_bullet_text_html(edu.get('institution', ''))}</strong>, {parse_bullet_text_html(edu.get('location', ''))}
                                 <span class="date-range">{parse_bullet_text_html(edu.get('graduationDate', ''))}</span><br>
                                 {parse_bullet_text_html(edu.get('degree', ''))}{f" | GPA: {edu.get('gpa')}" if edu.get('gpa') else ""}
                             </p>
-"""
-            if 'coursework' in edu and edu['coursework']:
-                html += f"""
+"""]
+    if 'coursework' in edu and edu['coursework']:
+        parts.append(f"""
                             <p class="coursework">
                                 Relevant Coursework: {', '.join([parse_bullet_text_html(course) for course in edu['coursework']])}
                             </p>
-"""
-            html += """
+""")
+    parts.append("""
                         </div>
-"""
-        html += """
-                    </div>
-                </div>
-"""
-    
-    # Add technical skills section
-    if 'technicalSkills' in resume_data and resume_data['technicalSkills']:
-        html += """
-                <div class="section">
-                    <h2>TECHNICAL SKILLS</h2>
-                    <div id="technicalSkillsList" class="skills-container">
-"""
-        # Group skills by category
-        skills_by_category = {}
-        for skill in resume_data['technicalSkills']:
-            parts = skill.split(':')
-            if len(parts) == 2:
-                category = parts[0].strip()
-                items = [item.strip() for item in parts[1].split(',')]
-                if category not in skills_by_category:
-                    skills_by_category[category] = []
-                skills_by_category[category].extend(items)
-            else:
-                if 'Other' not in skills_by_category:
-                    skills_by_category['Other'] = []
-                skills_by_category['Other'].append(skill)
-        
-        for category, skills in skills_by_category.items():
-            html += f"""
+""")
+    return "".join(parts)
+
+def group_technical_skills(technical_skills):
+    """Group "Category: a, b" skill entries by category; entries without a category go under 'Other'"""
+    skills_by_category = {}
+    for skill in technical_skills:
+        parts = skill.split(':')
+        if len(parts) == 2:
+            category = parts[0].strip()
+            items = [item.strip() for item in parts[1].split(',')]
+            if category not in skills_by_category:
+                skills_by_category[category] = []
+            skills_by_category[category].extend(items)
+        else:
+            if 'Other' not in skills_by_category:
+                skills_by_category['Other'] = []
+            skills_by_category['Other'].append(skill)
+    return skills_by_category
+
+def render_technical_skills_html(technical_skills):
+    """Render the technical skills grid, grouping "Category: a, b" entries by category"""
+    skills_by_category = group_technical_skills(technical_skills)
+    return "".join(
+        f"""
                         <div class="skill-category-title">{category}:</div>
                         <div class="skill-items">{', '.join(skills)}</div>
 """
-        html += """
-                    </div>
-                </div>
-"""
-    
-    # Add experience section
-    if 'experience' in resume_data and resume_data['experience']:
-        html += """
-                <div class="section">
-                    <h2>EXPERIENCE</h2>
-                    <div id="experienceList">
-"""
-        for job in resume_data['experience']:
-            html += f"""
+        for category, skills in skills_by_category.items()
+    )
+
+def render_bullet_list_html(bullets):
+    """Render bullets as a <ul> list"""
+    parts = ["""
+                            <ul style="margin-top: 0;">
+"""]
+    for bullet in bullets:
+        parts.append(f"""
+                                <li>{parse_bullet_text_html(bullet)}</li>
+""")
+    parts.append("""
+                            </ul>
+""")
+    return "".join(parts)
+
+def render_experience_item_html(job):
+    """Render a single experience entry"""
+    parts = [f"""
                         <div class="experience-item">
                             <p style="margin-bottom: 0; margin-top: 0;">
                                 <strong>{parse_bullet_text_html(job.get('company', ''))}</strong>, <span class="job-title">{parse_bullet_text_html(job.get('title', ''))}</span>, {parse_bullet_text_html(job.get('location', ''))}
                                 <span class="date-range">{parse_bullet_text_html(job.get('dateRange', ''))}</span>
                             </p>
-"""
-            if 'bullets' in job and job['bullets']:
-                html += """
-                            <ul style="margin-top: 0;">
-"""
-                for bullet in job['bullets']:
-                    html += f"""
-                                <li>{parse_bullet_text_html(bullet)}</li>
-"""
-                html += """
-                            </ul>
-"""
-            html += """
+"""]
+    if 'bullets' in job and job['bullets']:
+        parts.append(render_bullet_list_html(job['bullets']))
+    parts.append("""
                         </div>
-"""
-        html += """
-                    </div>
-                </div>
-"""
-    
-    # Add projects section
-    if 'projects' in resume_data and resume_data['projects']:
-        html += """
-                <div class="section">
-                    <h2>PROJECTS</h2>
-                    <div id="projectsList">
-"""
-        for project in resume_data['projects']:
-            html += f"""
+""")
+    return "".join(parts)
+
+def render_project_item_html(project):
+    """Render a single project entry; the first bullet becomes the subtitle"""
+    parts = [f"""
                         <div class="project-item">
                             <p style="margin-bottom: 0; margin-top: 0;">
                                 <span class="project-title">{parse_bullet_text_html(project.get('name', ''))}</span>
                                 <span class="date-range">{parse_bullet_text_html(project.get('dateRange', ''))}</span>
                             </p>
-"""
-            if 'bullets' in project and project['bullets']:
-                # First bullet becomes subtitle
-                if project['bullets']:
-                    html += f"""
+"""]
+    if 'bullets' in project and project['bullets']:
+        # First bullet becomes subtitle
+        parts.append(f"""
                             <p class="project-subtitle">{parse_bullet_text_html(project['bullets'][0])}</p>
-"""
-                # Remaining bullets as list
-                if len(project['bullets']) > 1:
-                    html += """
-                            <ul style="margin-top: 0;">
-"""
-                    for bullet in project['bullets'][1:]:
-                        html += f"""
-                                <li>{parse_bullet_text_html(bullet)}</li>
-"""
-                    html += """
-                            </ul>
-"""
-            html += """
+""")
+        # Remaining bullets as list
+        if len(project['bullets']) > 1:
+            parts.append(render_bullet_list_html(project['bullets'][1:]))
+    parts.append("""
                         </div>
-"""
-        html += """
-                    </div>
-                </div>
-"""
-    
-    # Add publications section
-    if 'publications' in resume_data and resume_data['publications']:
-        html += """
-                <div class="section">
-                    <h2>PUBLICATIONS</h2>
-                    <div id="publicationsList">
-"""
-        for pub in resume_data['publications']:
-            html += f"""
+""")
+    return "".join(parts)
+
+def render_publication_item_html(pub):
+    """Render a single publication entry"""
+    parts = [f"""
                         <div class="publication-item">
                             <p style="margin-bottom: 0; margin-top: 0;">
                                 <span class="publication-title">{parse_bullet_text_html(pub.get('title', ''))}</span>, {parse_bullet_text_html(pub.get('citation', ''))}
                             </p>
-"""
-            if 'bullets' in pub and pub['bullets']:
-                html += """
-                            <ul style="margin-top: 0;">
-"""
-                for bullet in pub['bullets']:
-                    html += f"""
-                                <li>{parse_bullet_text_html(bullet)}</li>
-"""
-                html += """
-                            </ul>
-"""
-            html += """
+"""]
+    if 'bullets' in pub and pub['bullets']:
+        parts.append(render_bullet_list_html(pub['bullets']))
+    parts.append("""
                         </div>
-"""
-        html += """
+""")
+    return "".join(parts)
+
+# Section model shared by every renderer, in document order:
+# (resume field, heading, list element id, extra list class, item renderer)
+# An item renderer of None means the section is rendered as a whole.
+RESUME_SECTIONS = (
+    ('education', 'EDUCATION', 'educationList', None, render_education_item_html),
+    ('technicalSkills', 'TECHNICAL SKILLS', 'technicalSkillsList', 'skills-container', None),
+    ('experience', 'EXPERIENCE', 'experienceList', None, render_experience_item_html),
+    ('projects', 'PROJECTS', 'projectsList', None, render_project_item_html),
+    ('publications', 'PUBLICATIONS', 'publicationsList', None, render_publication_item_html),
+)
+
+_SECTION_BODY_RENDERERS = {
+    'technicalSkills': render_technical_skills_html,
+}
+
+def render_section_html(heading, list_id, list_class, body_html):
+    """Wrap a rendered section body in its heading and list container"""
+    class_attr = f' class="{list_class}"' if list_class else ''
+    return f"""
+                <div class="section">
+                    <h2>{heading}</h2>
+                    <div id="{list_id}"{class_attr}>
+{body_html}
                     </div>
                 </div>
 """
+
+def _render_section(resume_data, field, heading, list_id, list_class, render_item):
+    """Render one section, memoizing the section and each of its items by content"""
+    items = resume_data[field]
+    if render_item is None:
+        body_html = _memoized_fragment(field, items, _SECTION_BODY_RENDERERS[field])
+        return render_section_html(heading, list_id, list_class, body_html)
     
-    # Close HTML tags and add JavaScript for PDF conversion
-    html += """
-            </div>
-        </div>
-    </div>
+    item_keys = [_fragment_key(field, item) for item in items]
+    section_key = None
+    if None not in item_keys:
+        section_key = "section:" + canonical_hash(item_keys)
+        cached = _fragment_cache.get(section_key)
+        if cached is not None:
+            return cached
     
-    <script>
-        function downloadPDF() {
-            // Get the resume content element
-            const element = document.getElementById('resume-content');
-            
-            // Options for html2pdf
-            const options = {
-                margin: 0,
-                filename: 'resume.pdf',
-                image: { type: 'jpeg', quality: 1 },
-                html2canvas: { scale: 2, useCORS: true },
-                jsPDF: { unit: 'in', format: 'letter', orientation: 'portrait' }
-            };
-            
-            // Generate and save the PDF
-            html2pdf().set(options).from(element).save();
-        }
-    </script>
-</body>
-</html>
-"""
+    # Only items whose content changed are rendered again
+    parts = []
+    for item, item_key in zip(items, item_keys):
+        item_html = _fragment_cache.get(item_key) if item_key is not None else None
+        if item_html is None:
+            item_html = render_item(item)
+            if item_key is not None:
+                _fragment_cache.put(item_key, item_html)
+        parts.append(item_html)
     
+    html = render_section_html(heading, list_id, list_class, "".join(parts))
+    if section_key is not None:
+        _fragment_cache.put(section_key, html)
     return html
 
-def compile_resume(json_input):
+def iter_resume_html(resume_data, assets="cdn", output_dir=OUTPUT_DIR, output_mode="pretty"):
+    """Yield the resume HTML document as a sequence of chunks
+    
+    Chunks are the static head, the header, one chunk per non-empty section and the
+    static tail. Joining them gives exactly the output of generate_resume_html, so
+    transports and file writers can stream a document without building it first.
+    Sections and their items are memoized by content hash, so re-rendering a resume
+    that differs by a single bullet only re-renders the item that changed.
+    
+    Args:
+        resume_data: Validated resume dictionary
+        assets: How the stylesheet and html2pdf.js are included ("cdn", "inline" or "linked")
+        output_dir: Directory the document will be saved in, used by "linked" assets
+        output_mode: "pretty", "compact" or "body-only" (see OUTPUT_MODES)
+    """
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode '{output_mode}', expected one of {', '.join(OUTPUT_MODES)}")
+    compact = output_mode != "pretty"
+    
+    header = {field: resume_data[field] for field in HEADER_FIELDS if field in resume_data}
+    if output_mode == "body-only":
+        yield '<div class="resume">'
+    else:
+        yield render_html_head(assets, output_dir, output_mode)
+    
+    header_html = _memoized_fragment('header', header, render_header_html)
+    yield compact_html(header_html) if compact else header_html
+    
+    for field, heading, list_id, list_class, render_item in RESUME_SECTIONS:
+        if field in resume_data and resume_data[field]:
+            section_html = _render_section(resume_data, field, heading, list_id, list_class, render_item)
+            yield compact_html(section_html) if compact else section_html
+    
+    if output_mode == "body-only":
+        yield '</div>'
+    elif compact:
+        yield _COMPACT_HTML_FOOT
+    else:
+        yield RESUME_HTML_FOOT
+
+def generate_resume_html(resume_data, assets="cdn", output_dir=OUTPUT_DIR, output_mode="pretty"):
+    """Generate HTML for a resume that matches the ResumeBuilder component output"""
+    return "".join(iter_resume_html(resume_data, assets, output_dir, output_mode))
+
+def write_resume_html(resume_data, file, assets="cdn", output_dir=OUTPUT_DIR, output_mode="pretty"):
+    """Stream the resume HTML into a writable text file object, returning characters written"""
+    written = 0
+    for chunk in iter_resume_html(resume_data, assets, output_dir, output_mode):
+        written += file.write(chunk)
+    return written
+
+def fragment_cache_stats():
+    """Return hit/miss counters for the section and item fragment memo"""
+    return _fragment_cache.stats()
+
+def configure_compile_cache(max_entries=None, max_bytes=None, disk_dir=None, disk_max_bytes=None,
+                            disk_cache=None):
+    """Adjust the compiled output cache limits and optionally enable the on-disk tier
+
+    Args:
+        max_entries: Maximum number of compiled resumes kept in memory
+        max_bytes: Maximum total size of compiled resumes kept in memory
+        disk_dir: Directory for the on-disk tier; pass "" to disable it
+        disk_max_bytes: Maximum total size of the on-disk tier
+        disk_cache: Use this object as the persistent tier instead of a directory
+            (anything with DiskCache's get, put, clear and stats methods)
+    """
+    global _compile_disk_cache
+    _compile_cache.resize(max_entries=max_entries, max_bytes=max_bytes)
+    if disk_cache is not None:
+        _compile_disk_cache = disk_cache
+    elif disk_dir == "":
+        _compile_disk_cache = None
+    elif disk_dir is not None:
+        _compile_disk_cache = DiskCache(
+            disk_dir, max_bytes=disk_max_bytes or COMPILE_CACHE_DISK_MAX_BYTES
+        )
+    elif disk_max_bytes is not None and _compile_disk_cache is not None:
+        _compile_disk_cache.max_bytes = disk_max_bytes
+
+def compile_cache_stats():
+    """Return hit/miss counters and sizes for the compiled output cache"""
+    return {
+        "memory": _compile_cache.stats(),
+        "disk": _compile_disk_cache.stats() if _compile_disk_cache is not None else None,
+    }
+
+def clear_compile_cache():
+    """Drop every entry from the compiled output cache (memory and disk tiers)"""
+    _compile_cache.clear()
+    if _compile_disk_cache is not None:
+        _compile_disk_cache.clear()
+
+def _cached_compile_result(cache_key):
+    """Look up a compiled result in the memory tier, then the disk tier"""
+    result = _compile_cache.get(cache_key)
+    if result is None and _compile_disk_cache is not None:
+        cached_text = _compile_disk_cache.get(cache_key)
+        if cached_text is not None:
+            try:
+                result = json.loads(cached_text)
+            except json.JSONDecodeError:
+                result = None
+            if result is not None:
+                _compile_cache.put(cache_key, result)
+    return result
+
+def _store_compile_result(cache_key, result):
+    _compile_cache.put(cache_key, result)
+    if _compile_disk_cache is not None:
+        try:
+            _compile_disk_cache.put(cache_key, json.dumps(result))
+        except OSError as e:
+            # stdout carries the MCP stdio protocol, so report on stderr
+            print(f"Error writing compile cache entry: {str(e)}", file=sys.stderr)
+
+def compile_resume(json_input, assets="cdn", output_mode="pretty"):
     """Validate a JSON resume and compile it into a single HTML file if valid
     
     This tool first validates if the JSON resume meets all requirements, then
     generates an HTML representation matching what the ResumeBuilder component displays.
+    Results are cached by the canonical hash of the parsed resume, so compiling the
+    same resume again skips validation and rendering.
     
     Args:
         json_input: A resume in JSON format (string or dictionary)
+        assets: How the stylesheet and html2pdf.js are included: "cdn" (default),
+            "inline" (embedded, works offline) or "linked" (shared files in OUTPUT_DIR)
+        output_mode: "pretty" (default), "compact" (whitespace stripped, stylesheet
+            minified) or "body-only" (just the resume fragment, no head or stylesheet)
         
     Returns:
         A dictionary containing:
         - valid (bool): Whether the JSON is valid
         - message (str): Validation message if invalid
         - html (str): The compiled HTML if valid
+        - bytes (int): Size of the HTML in UTF-8 bytes, if valid
+        - bytes_saved (int): Bytes saved compared with the pretty output, if valid
+        - reused (bool): Whether a previously parsed and validated document was reused
     """
     try:
         # Handle input as either a string or dictionary
-        if isinstance(json_input, str):
-            # Parse string into dictionary if it's a string
-            resume_data = json.loads(json_input)
-        elif isinstance(json_input, dict):
-            # Use the dictionary directly
-            resume_data = json_input
-        else:
+        if not isinstance(json_input, (str, dict)):
             return {
                 "valid": False,
                 "message": f"Input must be a JSON string or dictionary, got {type(json_input)}",
                 "html": None
             }
+        if assets not in ASSET_MODES:
+            return {
+                "valid": False,
+                "message": f"Unknown asset mode '{assets}', expected one of {', '.join(ASSET_MODES)}",
+                "html": None
+            }
+        if output_mode not in OUTPUT_MODES:
+            return {
+                "valid": False,
+                "message": f"Unknown output mode '{output_mode}', expected one of {', '.join(OUTPUT_MODES)}",
+                "html": None
+            }
         
-        # Validate the resume data
-        is_valid, error_message = validate_resume_json(resume_data)
+        # Parse and validate once; input seen recently (e.g. by validate_json) is reused
+        with span("compile.load_document"):
+            document, reused = load_resume_document(json_input)
+        cache_key = document.content_hash
+        if cache_key is not None and assets != "cdn":
+            cache_key = f"{cache_key}-{assets}"
+            if output_mode != "body-only":
+                # Keyed on the head too, so fetching the bundle changes inline/linked output
+                cache_key = f"{cache_key}-{html_head_digest(assets, output_mode=output_mode)}"
+        if cache_key is not None and output_mode != "pretty":
+            cache_key = f"{cache_key}-{output_mode}"
         
-        if not is_valid:
-            return {
+        if cache_key is not None:
+            cached = _cached_compile_result(cache_key)
+            if cached is not None:
+                result = dict(cached)
+                result["reused"] = reused
+                return result
+        
+        if document.errors:
+            # Report every error so callers can fix them in one pass
+            result = {
                 "valid": False,
-                "message": f"JSON fails resume validation: {error_message}",
+                "message": f"JSON fails resume validation: {'; '.join(document.errors)}",
                 "html": None
             }
+        else:
+            # If valid, compile the HTML
+            with span("compile.render"):
+                html = generate_resume_html(document.resume, assets, output_mode=output_mode)
+                size = len(html.encode('utf-8'))
+                pretty_size = size
+                if output_mode != "pretty":
+                    # Fragments are memoized, so the pretty rendering here is cheap
+                    pretty_size = len(generate_resume_html(document.resume, assets).encode('utf-8'))
+            
+            result = {
+                "valid": True,
+                "message": "Resume compiled successfully",
+                "html": html,
+                "bytes": size,
+                "bytes_saved": pretty_size - size
+            }
         
-        # If valid, compile the HTML
-        html = generate_resume_html(resume_data)
+        if cache_key is not None:
+            _store_compile_result(cache_key, result)
         
-        return {
-            "valid": True,
-            "message": "Resume compiled successfully",
-            "html": html
-        }
+        result = dict(result)
+        result["reused"] = reused
+        return result
             
     except json.JSONDecodeError as e:
+        count("errors", span="compile", type="JSONDecodeError")
         return {
             "valid": False,
             "message": f"Invalid JSON format: {str(e)}",
             "html": None
         }
     except Exception as e:
+        count("errors", span="compile", type=type(e).__name__)
         return {
             "valid": False,
             "message": f"Error compiling resume: {str(e)}",
             "html": None
         } 
 
+# Batches smaller than this are compiled in-process, where a worker pool costs more than it saves
+BATCH_PARALLEL_THRESHOLD = 4
+
+# Seconds a pooled batch may run before unfinished items are reported as timed out
+BATCH_TIMEOUT_SECONDS = 120
+
+def _compile_batch_item(resume_data):
+    """Compile one batch item and time it (runs inside a worker process)"""
+    start = time.perf_counter()
+    result = compile_resume(resume_data)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def _compile_batch_chunk(items):
+    return [_compile_batch_item(resume_data) for resume_data in items]
+
+def _batch_error(message):
+    return {"valid": False, "message": message, "html": None, "seconds": 0.0}
+
+def _compile_batch_pooled(items, workers, timeout):
+    """Compile items in chunks on a process pool, turning failed or late chunks into item errors"""
+    chunksize = max(1, len(items) // (workers * 4))
+    chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+    compiled = []
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=worker_context())
+    not_done = ()
+    try:
+        futures = [executor.submit(_compile_batch_chunk, chunk) for chunk in chunks]
+        _, not_done = wait(futures, timeout=timeout)
+        for future, chunk in zip(futures, chunks):
+            if future in not_done:
+                compiled.extend(_batch_error(f"Compile did not finish within {timeout} seconds") for _ in chunk)
+            elif future.exception() is not None:
+                compiled.extend(_batch_error(f"Error compiling resume: {str(future.exception())}") for _ in chunk)
+            else:
+                compiled.extend(future.result())
+    finally:
+        if not_done:
+            terminate_workers(executor)
+        else:
+            executor.shutdown()
+    return compiled
+
+def _resolve_batch_item(item, base):
+    """Turn a batch item into the resume to compile, applying it as a merge patch if a base is given"""
+    if base is None:
+        return item
+    if isinstance(item, str):
+        item = json.loads(item)
+    return apply_merge_patch(base, item)
+
+def compile_resumes_batch(resumes, base=None, max_workers=None, timeout=BATCH_TIMEOUT_SECONDS):
+    """Validate and compile many resumes in one call, spreading the work across processes
+    
+    Args:
+        resumes: A list of resumes (JSON strings or dictionaries). If base is given, each
+            item is instead an RFC 7386 JSON merge patch applied to base.
+        base: Optional base resume (JSON string or dictionary) that items patch
+        max_workers: Maximum number of worker processes (defaults to the CPU count)
+        timeout: Seconds a batch on worker processes may run; items still unfinished
+            then fail with a timeout message
+        
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the batch request itself was well formed
+        - message (str): Summary of the batch
+        - count (int): Number of items
+        - compiled (int): Number of items that compiled successfully
+        - seconds (float): Wall-clock time for the whole batch
+        - results (list): One compile_resume result per item, in input order, each with
+          its index and the seconds spent compiling it
+    """
+    start = time.perf_counter()
+    if not isinstance(resumes, list):
+        return {
+            "valid": False,
+            "message": f"Input must be a list of resumes, got {type(resumes)}",
+            "results": []
+        }
+    
+    if base is not None:
+        try:
+            base = json.loads(base) if isinstance(base, str) else base
+        except json.JSONDecodeError as e:
+            return {
+                "valid": False,
+                "message": f"Invalid JSON format in base resume: {str(e)}",
+                "results": []
+            }
+    
+    # Resolve patches up front; items that fail here never reach a worker
+    results = [None] * len(resumes)
+    pending = []
+    for index, item in enumerate(resumes):
+        try:
+            pending.append((index, _resolve_batch_item(item, base)))
+        except json.JSONDecodeError as e:
+            results[index] = _batch_error(f"Invalid JSON format: {str(e)}")
+        except Exception as e:
+            # One malformed item (e.g. a patch that isn't an object) fails only itself
+            results[index] = _batch_error(f"Error preparing resume: {str(e)}")
+    
+    workers = min(max_workers or os.cpu_count() or 1, len(pending))
+    items = [resume_data for _, resume_data in pending]
+    if workers <= 1 or len(pending) < BATCH_PARALLEL_THRESHOLD:
+        workers = 1
+        compiled = map(_compile_batch_item, items)
+    else:
+        compiled = _compile_batch_pooled(items, workers, timeout)
+    
+    for (index, _), result in zip(pending, compiled):
+        results[index] = result
+    for index, result in enumerate(results):
+        result["index"] = index
+    
+    compiled_count = sum(1 for result in results if result["valid"])
+    return {
+        "valid": True,
+        "message": f"Compiled {compiled_count} of {len(results)} resumes",
+        "count": len(results),
+        "compiled": compiled_count,
+        "workers": workers,
+        "seconds": time.perf_counter() - start,
+        "results": results
+    }
+
 if __name__ == "__main__":
     # Test resume data
     test_resume = {
@@ -827,7 +1449,7 @@ if __name__ == "__main__":
     
     if result["valid"]:
         # Define the output directory and file path
-        output_dir = "output"
+        output_dir = OUTPUT_DIR
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
         
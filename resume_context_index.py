@@ -0,0 +1,173 @@
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+
+# Passages are built from paragraphs merged up to this many characters
+PASSAGE_MAX_CHARS = 800
+
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have i in is it its me my of on or our that the
+their this to was we were what when where which who with you your
+""".split())
+
+
+def tokenize(text):
+    """Lowercase text and split it into index terms, dropping stopwords"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def split_passages(text, max_chars=PASSAGE_MAX_CHARS):
+    """Split text into passages of whole paragraphs (or lines, for long paragraphs)"""
+    pieces = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(line.strip() for line in paragraph.splitlines() if line.strip())
+
+    passages = []
+    current = []
+    current_len = 0
+    for piece in pieces:
+        if current and current_len + len(piece) > max_chars:
+            passages.append("\n\n".join(current))
+            current = []
+            current_len = 0
+        current.append(piece)
+        current_len += len(piece) + 2
+    if current:
+        passages.append("\n\n".join(current))
+    return passages
+
+
+class ContextIndex:
+    """BM25 index over the passages of a set of documents
+
+    Args:
+        documents: Mapping of source name to extracted text
+    """
+
+    def __init__(self, documents):
+        self.passages = []
+        self.postings = defaultdict(list)
+        lengths = []
+        for source in sorted(documents):
+            for passage in split_passages(documents[source]):
+                terms = Counter(tokenize(passage))
+                if not terms:
+                    continue
+                passage_id = len(self.passages)
+                self.passages.append((source, passage))
+                lengths.append(sum(terms.values()))
+                for term, count in terms.items():
+                    self.postings[term].append((passage_id, count))
+        self.lengths = lengths
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    def search(self, query, top_k=5):
+        """Return the top_k passages for query as dicts of source, passage and score"""
+        count = len(self.passages)
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for passage_id, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[passage_id] / self.average_length)
+                scores[passage_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [
+            {"source": self.passages[passage_id][0], "passage": self.passages[passage_id][1], "score": round(score, 4)}
+            for passage_id, score in ranked
+        ]
+
+    def stats(self):
+        return {
+            "documents": len({source for source, _ in self.passages}),
+            "passages": len(self.passages),
+            "terms": len(self.postings),
+        }
+
+
+class ContextCorpus:
+    """Every file in a directory, extracted and indexed, refreshed when files change
+
+    Extracted text is kept per file and keyed on its modification time and size, so a
+    refresh only re-extracts files that were added or modified. The index itself is
+    rebuilt only when the set of files or their contents changed.
+
+    Args:
+        directory: Directory to index (searched recursively, hidden files skipped)
+        extract: Function returning the text of a file path, or None if unsupported
+    """
+
+    def __init__(self, directory, extract):
+        self.directory = directory
+        self.extract = extract
+        self._texts = {}
+        self._signature = None
+        self._index = ContextIndex({})
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        files = {}
+        for root, dirs, names in os.walk(self.directory):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(names):
+                if name.startswith("."):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files[os.path.relpath(path, self.directory)] = (st.st_mtime_ns, st.st_size)
+        return files
+
+    def refresh(self):
+        """Re-extract changed files and rebuild the index if anything changed"""
+        files = self._scan()
+        signature = tuple(sorted(files.items()))
+        with self._lock:
+            if signature == self._signature:
+                return self._index
+
+            texts = {}
+            for source, file_signature in files.items():
+                cached = self._texts.get(source)
+                if cached is not None and cached[0] == file_signature:
+                    texts[source] = cached
+                    continue
+                text = self.extract(os.path.join(self.directory, source))
+                texts[source] = (file_signature, text or "")
+            self._texts = texts
+            self._index = ContextIndex({source: text for source, (_, text) in texts.items() if text})
+            self._signature = signature
+            return self._index
+
+    def search(self, query, top_k=5):
+        return self.refresh().search(query, top_k)
+
+    def total_chars(self):
+        """Total size of the extracted text in the corpus"""
+        self.refresh()
+        with self._lock:
+            return sum(len(text) for _, text in self._texts.values())
+
+    def stats(self):
+        index = self.refresh()
+        return dict(index.stats(), files=len(self._texts))
@@ -0,0 +1,315 @@
+import contextvars
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# Latency samples kept per span name for percentiles
+SPAN_SAMPLES = 1024
+
+# Top-level spans (tool calls) slower than this are kept, with their stages, in the
+# slow request log
+SLOW_REQUEST_SECONDS = float(os.environ.get("RESUME_SLOW_REQUEST_SECONDS", 1.0))
+SLOW_REQUEST_LOG_SIZE = 50
+
+# Optional profiling: "cprofile" aggregates function statistics of the outermost span
+# running in each thread (one at a time, since the profiler is process-wide), and
+# "tracemalloc" records the peak memory allocated during each top-level span
+PROFILE_MODES = ("", "cprofile", "tracemalloc")
+
+_lock = threading.Lock()
+_counters = {}
+_spans = {}
+_slow_requests = deque(maxlen=SLOW_REQUEST_LOG_SIZE)
+_collectors = {}
+_profile_mode = ""
+_profile_stats = None
+
+# The span enclosing the current code, so nested spans are recorded as its stages.
+# asyncio.to_thread copies the context, so stages run in worker threads still attach.
+_current_span = contextvars.ContextVar("resume_metrics_span", default=None)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def count(name, value=1, **labels):
+    """Add value to the counter name{labels}"""
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, error=None):
+    """Record a duration for name measured elsewhere (e.g. in a worker process)"""
+    with _lock:
+        stat = _spans.get(name)
+        if stat is None:
+            stat = _spans[name] = {"count": 0, "errors": 0, "sum": 0.0, "max": 0.0, "samples": deque(maxlen=SPAN_SAMPLES)}
+        stat["count"] += 1
+        stat["sum"] += seconds
+        stat["max"] = max(stat["max"], seconds)
+        stat["samples"].append(seconds)
+        if error is not None:
+            stat["errors"] += 1
+            key = ("errors", _label_key({"span": name, "type": error}))
+            _counters[key] = _counters.get(key, 0) + 1
+    parent = _current_span.get()
+    if parent is not None:
+        parent["stages"].append((name, seconds))
+
+
+class span:
+    """Time a block of code as a named span
+
+    Exceptions are counted by type and re-raised. Spans opened inside another span are
+    also listed as its stages in the slow request log.
+
+    Usage:
+        with span("compile.render"):
+            ...
+    """
+
+    def __init__(self, name, profile=True, **labels):
+        self.name = name
+        self.profile = profile
+        self.labels = labels
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        thread = threading.get_ident()
+        self.record = {"stages": [], "thread": thread}
+        self.token = _current_span.set(self.record)
+        self.profiler = None
+        outermost_in_thread = self.parent is None or self.parent["thread"] != thread
+        if self.profile and outermost_in_thread and _profile_mode == "cprofile":
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # Another request is already being profiled
+                self.profiler = None
+        if self.parent is None and _profile_mode == "tracemalloc" and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def set(self, **labels):
+        """Attach labels (e.g. valid=False) that show up in the slow request log"""
+        self.labels.update(labels)
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        _current_span.reset(self.token)
+        if self.profiler is not None:
+            self.profiler.disable()
+            _add_profile(self.profiler)
+        observe(self.name, seconds, error=exc_type.__name__ if exc_type else None)
+
+        if self.parent is None and seconds >= SLOW_REQUEST_SECONDS:
+            entry = {
+                "span": self.name,
+                "seconds": round(seconds, 6),
+                "at": time.time(),
+                "labels": dict(self.labels),
+                "stages": [(name, round(duration, 6)) for name, duration in self.record["stages"]],
+            }
+            if exc_type is not None:
+                entry["error"] = f"{exc_type.__name__}: {exc}"
+            if _profile_mode == "tracemalloc" and tracemalloc.is_tracing():
+                entry["alloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            with _lock:
+                _slow_requests.append(entry)
+        return False
+
+
+def _count_result(name, result, current):
+    # Tool results report failures as {"valid": False, ...} rather than raising
+    if isinstance(result, dict) and "valid" in result:
+        valid = bool(result["valid"])
+        count("results", span=name, valid=str(valid).lower())
+        if not valid:
+            current.set(valid=False, message=str(result.get("message", ""))[:200])
+
+
+def traced(name):
+    """Decorator running a function (sync or async) inside span(name)
+
+    Returned dicts with a "valid" key are also counted as valid or invalid results.
+    """
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                # The event loop thread mostly waits on worker threads, so leave
+                # profiling to the spans running there
+                with span(name, profile=False) as current:
+                    result = await fn(*args, **kwargs)
+                    _count_result(name, result, current)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name) as current:
+                result = fn(*args, **kwargs)
+                _count_result(name, result, current)
+                return result
+        return wrapper
+    return decorate
+
+
+def _add_profile(profiler):
+    global _profile_stats
+    with _lock:
+        if _profile_stats is None:
+            _profile_stats = pstats.Stats(profiler)
+        else:
+            _profile_stats.add(profiler)
+
+
+def configure_profiling(mode):
+    """Turn request profiling on ("cprofile" or "tracemalloc") or off ("")"""
+    global _profile_mode, _profile_stats
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}', expected one of {', '.join(repr(m) for m in PROFILE_MODES)}")
+    if mode == "tracemalloc" and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif mode != "tracemalloc" and _profile_mode == "tracemalloc":
+        tracemalloc.stop()
+    with _lock:
+        _profile_mode = mode
+        _profile_stats = None
+
+
+def profile_report(limit=25):
+    """Return the top functions by cumulative time across profiled requests, as text"""
+    with _lock:
+        if _profile_stats is None:
+            return ""
+        out = io.StringIO()
+        _profile_stats.stream = out
+        _profile_stats.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+
+def register_collector(name, fn):
+    """Include fn()'s dict (e.g. cache or pool statistics) in every snapshot"""
+    _collectors[name] = fn
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def snapshot():
+    """Return counters, span latency summaries, the slow request log and collector stats"""
+    with _lock:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+        spans = {}
+        for name, stat in sorted(_spans.items()):
+            samples = sorted(stat["samples"])
+            spans[name] = {
+                "count": stat["count"],
+                "errors": stat["errors"],
+                "sum_seconds": stat["sum"],
+                "mean_seconds": stat["sum"] / stat["count"] if stat["count"] else None,
+                "p50_seconds": _percentile(samples, 0.50),
+                "p95_seconds": _percentile(samples, 0.95),
+                "p99_seconds": _percentile(samples, 0.99),
+                "max_seconds": stat["max"],
+            }
+        slow_requests = list(_slow_requests)
+    collected = {}
+    for name, fn in _collectors.items():
+        try:
+            collected[name] = fn()
+        except Exception as e:
+            collected[name] = {"error": str(e)}
+    return {
+        "counters": counters,
+        "spans": spans,
+        "slow_requests": slow_requests,
+        "collectors": collected,
+        "profile_mode": _profile_mode,
+    }
+
+
+def _metric_name(*parts):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", "_".join(parts))
+
+
+def _labels_text(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{str(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _flatten(prefix, value, out):
+    if isinstance(value, bool):
+        out.append((prefix, int(value)))
+    elif isinstance(value, (int, float)):
+        out.append((prefix, value))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f"{prefix}_{key}", item, out)
+
+
+def prometheus_text(data=None):
+    """Render a snapshot in the Prometheus text exposition format"""
+    data = data or snapshot()
+    lines = []
+    for counter in data["counters"]:
+        name = _metric_name("resume", counter["name"], "total")
+        lines.append(f"{name}{_labels_text(counter['labels'])} {counter['value']}")
+
+    lines.append("# TYPE resume_span_seconds summary")
+    for name, stat in data["spans"].items():
+        for quantile, key in (("0.5", "p50_seconds"), ("0.95", "p95_seconds"), ("0.99", "p99_seconds")):
+            if stat[key] is not None:
+                lines.append(f'resume_span_seconds{{span="{name}",quantile="{quantile}"}} {stat[key]:.6f}')
+        lines.append(f'resume_span_seconds_sum{{span="{name}"}} {stat["sum_seconds"]:.6f}')
+        lines.append(f'resume_span_seconds_count{{span="{name}"}} {stat["count"]}')
+        lines.append(f'resume_span_errors_total{{span="{name}"}} {stat["errors"]}')
+
+    for collector, stats in data["collectors"].items():
+        values = []
+        _flatten(_metric_name("resume", collector), stats, values)
+        for name, value in values:
+            lines.append(f"{_metric_name(name)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    global _profile_stats
+    with _lock:
+        _counters.clear()
+        _spans.clear()
+        _slow_requests.clear()
+        _profile_stats = None
+
+
+# Profiling can be switched on for a server process without code changes. A bad value
+# must not stop the server from starting, so it is reported (on stderr, since stdout
+# carries the MCP stdio protocol) and ignored.
+if os.environ.get("RESUME_PROFILE"):
+    try:
+        configure_profiling(os.environ["RESUME_PROFILE"])
+    except ValueError as e:
+        print(f"Ignoring RESUME_PROFILE: {str(e)}", file=sys.stderr)
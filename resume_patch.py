@@ -0,0 +1,254 @@
+import copy
+import json
+
+
+def _load_json(value):
+    """Accept a JSON string or an already parsed value"""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+def apply_merge_patch(target, patch):
+    """Apply an RFC 7386 JSON merge patch to target and return the result
+
+    Objects in the patch are merged recursively, null removes a key and any other
+    value replaces the target value. The target is not modified.
+
+    Args:
+        target: The document to patch (JSON string or parsed value)
+        patch: The merge patch (JSON string or parsed value)
+
+    Returns:
+        The patched document
+    """
+    target = _load_json(target)
+    patch = _load_json(patch)
+    return _merge(copy.deepcopy(target), patch)
+
+
+def _merge(target, patch):
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    if not isinstance(target, dict):
+        target = {}
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = _merge(target.get(key), value)
+    return target
+
+
+class JsonPatchError(ValueError):
+    """Raised when a JSON Patch operation is malformed or cannot be applied"""
+
+
+def parse_pointer(pointer):
+    """Split an RFC 6901 JSON pointer into its unescaped reference tokens"""
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer '{pointer}'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _array_index(container, token, allow_end=False):
+    if token == "-" and allow_end:
+        return len(container)
+    if not (token.isascii() and token.isdigit()) or (len(token) > 1 and token[0] == "0"):
+        raise JsonPatchError(f"Invalid array index '{token}'")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index {index} out of range")
+    return index
+
+
+def _resolve(document, tokens):
+    """Return the value at tokens"""
+    for token in tokens:
+        if isinstance(document, dict):
+            if token not in document:
+                raise JsonPatchError(f"Path segment '{token}' not found")
+            document = document[token]
+        elif isinstance(document, list):
+            document = document[_array_index(document, token)]
+        else:
+            raise JsonPatchError(f"Cannot index into a {type(document).__name__} with '{token}'")
+    return document
+
+
+def _add(document, tokens, value):
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1])
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to a {type(parent).__name__}")
+    return document
+
+
+def _remove(document, tokens):
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document")
+    parent = _resolve(document, tokens[:-1])
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path segment '{token}' not found")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_array_index(parent, token))
+    raise JsonPatchError(f"Cannot remove from a {type(parent).__name__}")
+
+
+def _replace(document, tokens, value):
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1])
+    token = tokens[-1]
+    # Assigned in place, so a replaced member keeps its position in the object
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path segment '{token}' not found")
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent[_array_index(parent, token)] = value
+    else:
+        raise JsonPatchError(f"Cannot replace in a {type(parent).__name__}")
+    return document
+
+
+def _json_equal(a, b):
+    """Compare JSON values the way a "test" op does: true, 1 and 1.0 are all different"""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def apply_json_patch(target, operations):
+    """Apply an RFC 6902 JSON Patch to target and return the result
+
+    Operations are applied in order; if any fails, JsonPatchError is raised and the
+    target is left unmodified.
+
+    Args:
+        target: The document to patch (JSON string or parsed value)
+        operations: List of operations (JSON string or parsed), each a dict with "op",
+            "path" and, depending on the op, "value" or "from"
+
+    Returns:
+        The patched document
+    """
+    document = copy.deepcopy(_load_json(target))
+    operations = _load_json(operations)
+    if not isinstance(operations, list):
+        raise JsonPatchError("A JSON Patch must be an array of operations")
+
+    for i, operation in enumerate(operations):
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JsonPatchError(f"Operation {i} must be an object with 'op' and 'path'")
+        op = operation["op"]
+        try:
+            tokens = parse_pointer(operation["path"])
+            if op in ("add", "replace", "test") and "value" not in operation:
+                raise JsonPatchError("missing 'value'")
+            if op == "add":
+                document = _add(document, tokens, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                _remove(document, tokens)
+            elif op == "replace":
+                document = _replace(document, tokens, copy.deepcopy(operation["value"]))
+            elif op in ("move", "copy"):
+                if "from" not in operation:
+                    raise JsonPatchError("missing 'from'")
+                from_tokens = parse_pointer(operation["from"])
+                if op == "move":
+                    if tokens[:len(from_tokens)] == from_tokens and tokens != from_tokens:
+                        raise JsonPatchError("cannot move a value into itself")
+                    value = _remove(document, from_tokens) if from_tokens else document
+                else:
+                    value = copy.deepcopy(_resolve(document, from_tokens))
+                document = _add(document, tokens, value)
+            elif op == "test":
+                if not _json_equal(_resolve(document, tokens), operation["value"]):
+                    raise JsonPatchError(f"test failed at '{operation['path']}'")
+            else:
+                raise JsonPatchError(f"unknown op '{op}'")
+        except JsonPatchError as e:
+            raise JsonPatchError(f"Operation {i} ({op} {operation['path']}): {e}") from None
+    return document
+
+
+def touched_fields(patch):
+    """Return the top-level fields a JSON Patch or merge patch can change, or None for all
+
+    Args:
+        patch: A JSON Patch (list of operations) or a merge patch (object), parsed
+    """
+    if isinstance(patch, dict):
+        return set(patch)
+    if not isinstance(patch, list):
+        return None
+    fields = set()
+    for operation in patch:
+        if not isinstance(operation, dict):
+            continue
+        if operation.get("op") == "test":
+            continue
+        for key in ("path", "from"):
+            if key not in operation or (key == "from" and operation.get("op") == "copy"):
+                continue
+            tokens = parse_pointer(operation[key])
+            if not tokens:
+                return None
+            fields.add(tokens[0])
+    return fields
+
+
+def _escape_token(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def make_json_patch(source, target, path=""):
+    """Return an RFC 6902 JSON Patch that turns source into target
+
+    Objects are compared key by key and arrays index by index, so changing one bullet
+    produces one replace operation rather than a copy of the whole section.
+    """
+    if isinstance(source, dict) and isinstance(target, dict):
+        operations = []
+        for key in source:
+            if key not in target:
+                operations.append({"op": "remove", "path": f"{path}/{_escape_token(key)}"})
+        for key, value in target.items():
+            child = f"{path}/{_escape_token(key)}"
+            if key not in source:
+                operations.append({"op": "add", "path": child, "value": value})
+            else:
+                operations.extend(make_json_patch(source[key], value, child))
+        return operations
+
+    if isinstance(source, list) and isinstance(target, list):
+        operations = []
+        common = min(len(source), len(target))
+        for i in range(common):
+            operations.extend(make_json_patch(source[i], target[i], f"{path}/{i}"))
+        # Remove from the end so earlier indexes stay valid
+        for i in range(len(source) - 1, common - 1, -1):
+            operations.append({"op": "remove", "path": f"{path}/{i}"})
+        for i in range(common, len(target)):
+            operations.append({"op": "add", "path": f"{path}/{i}", "value": target[i]})
+        return operations
+
+    if type(source) is not type(target) or source != target:
+        return [{"op": "replace", "path": path, "value": target}]
+    return []
@@ -0,0 +1,600 @@
+import base64
+import json
+import os
+import re
+import threading
+import zlib
+from resume_cache import LRUCache
+from resume_render_pool import RenderPoolBusy, RenderTimeout, RenderWorkerLost, create_render_pool
+from resume_compiler import (
+    RESUME_SECTIONS,
+    load_resume_document,
+    split_bold_markup,
+    group_technical_skills,
+)
+
+# Page geometry in points (1/72 in), matching the 8.5in x 11in page and 0.5in margins
+# of the HTML template
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 36
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+
+# Typography, mirroring the stylesheet in RESUME_HTML_HEAD
+BODY_SIZE = 10
+NAME_SIZE = 16
+COURSEWORK_SIZE = 9
+LINE_HEIGHT = 1.2
+BULLET_INDENT = 12
+SKILLS_COLUMN_GAP = 15
+
+# Compiled PDFs, keyed on the canonical hash of the resume
+PDF_CACHE_MAX_ENTRIES = 32
+PDF_CACHE_MAX_BYTES = 16_000_000
+_pdf_cache = LRUCache(max_entries=PDF_CACHE_MAX_ENTRIES, max_bytes=PDF_CACHE_MAX_BYTES)
+
+# Warm worker pool that renders PDFs off the calling process. Worker count defaults to
+# the CPU count; jobs beyond workers + PDF_POOL_MAX_QUEUE are turned away.
+PDF_POOL_WORKERS = int(os.environ.get("RESUME_PDF_WORKERS", "0")) or None
+PDF_POOL_MAX_QUEUE = 32
+PDF_POOL_QUEUE_WAIT_SECONDS = 2.0
+PDF_RENDER_TIMEOUT_SECONDS = 30.0
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+# Text is drawn with the standard Times fonts, which every PDF viewer provides, so
+# nothing is embedded. Strings are encoded as WinAnsi (cp1252); characters outside it
+# are drawn as "?" and reported in the result's warnings.
+FONTS = {False: b"F1", True: b"F2"}
+FONT_NAMES = {False: b"Times-Roman", True: b"Times-Bold"}
+TEXT_ENCODING = "cp1252"
+
+# Advance widths (1/1000 em) for printable ASCII, from the Adobe core font metrics
+_ASCII_WIDTHS = {
+    False: (
+        "250 333 408 500 500 833 778 180 333 333 500 564 250 333 250 278 "
+        "500 500 500 500 500 500 500 500 500 500 278 278 564 564 564 444 "
+        "921 722 667 667 722 611 556 722 722 333 389 722 611 889 722 722 "
+        "556 722 667 556 611 722 722 944 722 722 611 333 278 333 469 500 "
+        "333 444 500 444 500 444 333 500 500 278 278 500 278 778 500 500 "
+        "500 500 333 389 278 500 500 722 500 500 444 480 200 480 541"
+    ),
+    True: (
+        "250 333 555 500 500 1000 833 278 333 333 500 570 250 333 250 278 "
+        "500 500 500 500 500 500 500 500 500 500 333 333 570 570 570 500 "
+        "930 722 667 722 722 667 611 778 778 389 500 778 667 944 722 778 "
+        "611 778 722 556 667 722 722 1000 722 722 667 333 278 333 581 500 "
+        "333 500 556 444 556 444 333 500 556 278 333 556 278 833 556 500 "
+        "556 556 444 389 333 556 500 722 500 500 444 394 220 394 520"
+    ),
+}
+
+# Common WinAnsi punctuation outside ASCII: quotes, bullet, dashes, ellipsis
+_EXTRA_WIDTHS = {
+    False: {0x91: 333, 0x92: 333, 0x93: 444, 0x94: 444, 0x95: 350, 0x96: 500, 0x97: 1000, 0x85: 1000},
+    True: {0x91: 333, 0x92: 333, 0x93: 500, 0x94: 500, 0x95: 350, 0x96: 500, 0x97: 1000, 0x85: 1000},
+}
+_DEFAULT_WIDTH = 500
+
+
+def _build_width_table(bold):
+    widths = [_DEFAULT_WIDTH] * 256
+    for offset, width in enumerate(_ASCII_WIDTHS[bold].split()):
+        widths[32 + offset] = int(width)
+    for code, width in _EXTRA_WIDTHS[bold].items():
+        widths[code] = width
+    return widths
+
+
+_WIDTHS = {bold: _build_width_table(bold) for bold in (False, True)}
+_WORD_SPLIT = re.compile(r"(\s+)")
+
+
+def encode_pdf_text(text):
+    """Encode text for a WinAnsi font, replacing characters the encoding lacks"""
+    return text.encode(TEXT_ENCODING, errors="replace")
+
+
+def unencodable_characters(resume_data):
+    """Return the sorted characters of a resume that the PDF fonts cannot draw"""
+    text = json.dumps(resume_data, ensure_ascii=False)
+    try:
+        text.encode(TEXT_ENCODING)
+        return []
+    except UnicodeEncodeError:
+        pass
+    missing = set()
+    for char in set(text):
+        try:
+            char.encode(TEXT_ENCODING)
+        except UnicodeEncodeError:
+            missing.add(char)
+    return sorted(missing)
+
+
+def text_width(text, bold=False, size=BODY_SIZE):
+    """Return the width of text in points when set in Times at the given size"""
+    widths = _WIDTHS[bold]
+    return sum(widths[byte] for byte in encode_pdf_text(text)) * size / 1000
+
+
+def _escape(data):
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _num(value):
+    return f"{value:.2f}".rstrip("0").rstrip(".").encode("ascii")
+
+
+def markup_runs(text, bold=False):
+    """Turn text with **bold** markup into (text, is_bold) runs; bold=True bolds everything"""
+    if not isinstance(text, str):
+        text = str(text)
+    return [(segment, bold or is_bold) for segment, is_bold in split_bold_markup(text)]
+
+
+def wrap_runs(runs, width, size=BODY_SIZE, first_width=None):
+    """Greedily break runs into lines no wider than width
+
+    Args:
+        runs: List of (text, is_bold) runs
+        width: Available width in points
+        size: Font size in points
+        first_width: Optional narrower width for the first line (e.g. beside a date)
+
+    Returns:
+        list: Lines, each a list of (text, is_bold) runs with adjacent runs merged
+    """
+    lines = [[]]
+    line_width = 0.0
+    limit = first_width if first_width is not None else width
+    for text, bold in runs:
+        for piece in _WORD_SPLIT.split(text):
+            if not piece:
+                continue
+            is_space = piece.isspace()
+            if is_space:
+                piece = " "
+                if not lines[-1]:
+                    continue
+            piece_width = text_width(piece, bold, size)
+            if not is_space and lines[-1] and line_width + piece_width > limit:
+                # Drop trailing spaces before breaking the line
+                while lines[-1] and lines[-1][-1][0] == " ":
+                    line_width -= lines[-1].pop()[2]
+                lines.append([])
+                line_width = 0.0
+                limit = width
+            lines[-1].append((piece, bold, piece_width))
+            line_width += piece_width
+    while lines[-1] and lines[-1][-1][0] == " ":
+        lines[-1].pop()
+
+    merged = []
+    for line in lines:
+        runs_out = []
+        for piece, bold, _ in line:
+            if runs_out and runs_out[-1][1] == bold:
+                runs_out[-1] = (runs_out[-1][0] + piece, bold)
+            else:
+                runs_out.append((piece, bold))
+        merged.append(runs_out)
+    return merged
+
+
+def runs_width(runs, size=BODY_SIZE):
+    return sum(text_width(text, bold, size) for text, bold in runs)
+
+
+class Block:
+    """A vertical slice of laid-out content that is placed on a page as one unit
+
+    Operations use offsets measured down from the top of the block, so a block can be
+    measured before deciding which page it goes on.
+    """
+
+    def __init__(self):
+        self.ops = []
+        self.height = 0.0
+
+    def text(self, runs, x, size=BODY_SIZE):
+        """Add one line of text at the current bottom of the block"""
+        leading = size * LINE_HEIGHT
+        self.ops.append(("text", x, self.height + size, runs, size))
+        self.height += leading
+
+    def paragraph(self, runs, x=0.0, width=CONTENT_WIDTH, size=BODY_SIZE, right_text=None):
+        """Add wrapped text, optionally with right-aligned text on its first line"""
+        first_width = None
+        right_op = None
+        if right_text:
+            right_runs = markup_runs(right_text)
+            right_width = runs_width(right_runs, size)
+            first_width = width - right_width - 6
+            right_op = ("text", x + width - right_width, self.height + size, right_runs, size)
+        for i, line in enumerate(wrap_runs(runs, width, size, first_width)):
+            self.text(line, x, size)
+            if i == 0 and right_op is not None:
+                self.ops.append(right_op)
+
+    def bullet(self, runs, size=BODY_SIZE):
+        """Add a bulleted paragraph with a hanging indent"""
+        self.ops.append(("text", BULLET_INDENT - 8, self.height + size, [("•", False)], size))
+        for line in wrap_runs(runs, CONTENT_WIDTH - BULLET_INDENT, size):
+            self.text(line, BULLET_INDENT, size)
+
+    def rule(self, gap_before=2.0, gap_after=4.0):
+        """Add a full-width horizontal rule"""
+        self.height += gap_before
+        self.ops.append(("rule", 0.0, self.height, CONTENT_WIDTH))
+        self.height += gap_after
+
+    def space(self, points):
+        self.height += points
+
+    def extend(self, other):
+        for op in other.ops:
+            self.ops.append(op[:2] + (op[2] + self.height,) + op[3:])
+        self.height += other.height
+
+
+class PdfCanvas:
+    """Places blocks on pages and serializes the pages into a PDF document"""
+
+    def __init__(self):
+        self.pages = []
+        self._new_page()
+
+    def _new_page(self):
+        self.pages.append([])
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def place(self, block):
+        """Place a block below the previous one, starting a new page if it doesn't fit"""
+        fits_on_empty_page = block.height <= PAGE_HEIGHT - 2 * MARGIN
+        if block.height > self.y - MARGIN and self.pages[-1] and fits_on_empty_page:
+            self._new_page()
+        top = self.y
+        for op in block.ops:
+            y = top - op[2]
+            if y < MARGIN and self.pages[-1]:
+                # Blocks taller than a page continue at the top of the next one
+                line_top = op[2] - (op[4] if op[0] == "text" else 0)
+                self._new_page()
+                top = self.y + line_top
+                y = top - op[2]
+            self.pages[-1].append(op[:2] + (y,) + op[3:])
+        self.y = top - block.height
+
+    def _content_stream(self, ops):
+        out = [b"0 g 0 G 0.5 w"]
+        for op in ops:
+            if op[0] == "rule":
+                _, x, y, width = op
+                x += MARGIN
+                out.append(_num(x) + b" " + _num(y) + b" m " + _num(x + width) + b" " + _num(y) + b" l S")
+                continue
+            _, x, y, runs, size = op
+            parts = [b"BT", _num(MARGIN + x) + b" " + _num(y) + b" Td"]
+            for text, bold in runs:
+                parts.append(b"/" + FONTS[bold] + b" " + _num(size) + b" Tf (" + _escape(encode_pdf_text(text)) + b") Tj")
+            parts.append(b"ET")
+            out.append(b" ".join(parts))
+        return b"\n".join(out)
+
+    def to_pdf(self, title=""):
+        """Serialize the pages into PDF bytes with Flate-compressed content streams"""
+        objects = []
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(None)
+        pages = add(None)
+        fonts = {
+            bold: add(
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /" + FONT_NAMES[bold]
+                + b" /Encoding /WinAnsiEncoding >>"
+            )
+            for bold in (False, True)
+        }
+        info = add(
+            b"<< /Title (" + _escape(encode_pdf_text(title)) + b") /Producer (ResumeBuilderMCP) >>"
+        )
+        resources = (
+            b"<< /Font << /F1 " + str(fonts[False]).encode() + b" 0 R /F2 "
+            + str(fonts[True]).encode() + b" 0 R >> >>"
+        )
+        page_ids = []
+        for ops in self.pages:
+            stream = zlib.compress(self._content_stream(ops))
+            content = add(
+                b"<< /Length " + str(len(stream)).encode() + b" /Filter /FlateDecode >>\nstream\n"
+                + stream + b"\nendstream"
+            )
+            page_ids.append(add(
+                b"<< /Type /Page /Parent " + str(pages).encode() + b" 0 R /MediaBox [0 0 "
+                + str(PAGE_WIDTH).encode() + b" " + str(PAGE_HEIGHT).encode() + b"] /Resources "
+                + resources + b" /Contents " + str(content).encode() + b" 0 R >>"
+            ))
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages " + str(pages).encode() + b" 0 R >>"
+        objects[pages - 1] = (
+            b"<< /Type /Pages /Kids [" + b" ".join(str(i).encode() + b" 0 R" for i in page_ids)
+            + b"] /Count " + str(len(page_ids)).encode() + b" >>"
+        )
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += str(number).encode() + b" 0 obj\n" + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 " + str(len(objects) + 1).encode() + b"\n0000000000 65535 f \n"
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += (
+            b"trailer\n<< /Size " + str(len(objects) + 1).encode() + b" /Root "
+            + str(catalog).encode() + b" 0 R /Info " + str(info).encode() + b" 0 R >>\nstartxref\n"
+            + str(xref).encode() + b"\n%%EOF\n"
+        )
+        return bytes(out)
+
+
+# --- Section layouts, mirroring the HTML renderers in resume_compiler.py ---
+
+def layout_header(resume_data):
+    block = Block()
+    name_runs = markup_runs(resume_data.get('name', ''), bold=True)
+    block.text(name_runs, (CONTENT_WIDTH - runs_width(name_runs, NAME_SIZE)) / 2, NAME_SIZE)
+    contact = " | ".join(
+        str(resume_data.get(field, '')) for field in ('location', 'phone', 'email')
+    )
+    lines = [wrap_runs([(contact, False)], CONTENT_WIDTH)]
+    if resume_data.get('website'):
+        lines.append(wrap_runs([(str(resume_data['website']), False)], CONTENT_WIDTH))
+    for wrapped in lines:
+        for line in wrapped:
+            block.text(line, (CONTENT_WIDTH - runs_width(line)) / 2)
+    block.space(8)
+    return block
+
+
+def layout_heading(heading):
+    block = Block()
+    block.text([(heading, True)], 0)
+    block.rule(gap_before=0.0, gap_after=5.0)
+    return block
+
+
+def layout_education_item(edu):
+    block = Block()
+    runs = markup_runs(edu.get('institution', ''), bold=True) + [(", ", False)]
+    runs += markup_runs(edu.get('location', ''))
+    block.paragraph(runs, right_text=edu.get('graduationDate', ''))
+    degree = markup_runs(edu.get('degree', ''))
+    if edu.get('gpa'):
+        degree.append((f" | GPA: {edu.get('gpa')}", False))
+    block.paragraph(degree)
+    if edu.get('coursework'):
+        runs = [("Relevant Coursework: ", False)]
+        for i, course in enumerate(edu['coursework']):
+            if i:
+                runs.append((", ", False))
+            runs += markup_runs(course)
+        block.paragraph(runs, size=COURSEWORK_SIZE)
+    block.space(6)
+    return block
+
+
+def layout_technical_skills(technical_skills):
+    skills_by_category = group_technical_skills(technical_skills)
+    label_width = max(
+        (text_width(f"{category}:", True) for category in skills_by_category), default=0
+    )
+    items_x = label_width + SKILLS_COLUMN_GAP
+    blocks = []
+    for category, skills in skills_by_category.items():
+        block = Block()
+        block.ops.append(("text", 0.0, BODY_SIZE, [(f"{category}:", True)], BODY_SIZE))
+        block.paragraph([(", ".join(skills), False)], x=items_x, width=CONTENT_WIDTH - items_x)
+        blocks.append(block)
+    return blocks
+
+
+def _layout_bullets(block, bullets):
+    for bullet in bullets:
+        block.bullet(markup_runs(bullet))
+
+
+def layout_experience_item(job):
+    block = Block()
+    runs = markup_runs(job.get('company', ''), bold=True) + [(", ", False)]
+    runs += markup_runs(job.get('title', '')) + [(", ", False)]
+    runs += markup_runs(job.get('location', ''))
+    block.paragraph(runs, right_text=job.get('dateRange', ''))
+    _layout_bullets(block, job.get('bullets') or [])
+    block.space(3)
+    return block
+
+
+def layout_project_item(project):
+    block = Block()
+    block.paragraph(markup_runs(project.get('name', '')), right_text=project.get('dateRange', ''))
+    bullets = project.get('bullets') or []
+    if bullets:
+        # First bullet becomes subtitle
+        block.paragraph(markup_runs(bullets[0]))
+        _layout_bullets(block, bullets[1:])
+    block.space(5)
+    return block
+
+
+def layout_publication_item(pub):
+    block = Block()
+    runs = markup_runs(pub.get('title', '')) + [(", ", False)]
+    runs += markup_runs(pub.get('citation', ''))
+    block.paragraph(runs)
+    _layout_bullets(block, pub.get('bullets') or [])
+    block.space(3)
+    return block
+
+
+# Item layouts for each section in RESUME_SECTIONS
+SECTION_LAYOUTS = {
+    'education': layout_education_item,
+    'experience': layout_experience_item,
+    'projects': layout_project_item,
+    'publications': layout_publication_item,
+}
+
+
+def render_resume_pdf(resume_data):
+    """Lay out a validated resume and return it as PDF bytes with selectable vector text"""
+    canvas = PdfCanvas()
+    canvas.place(layout_header(resume_data))
+    for field, heading, _, _, _ in RESUME_SECTIONS:
+        if not resume_data.get(field):
+            continue
+        if field == 'technicalSkills':
+            blocks = layout_technical_skills(resume_data[field])
+        else:
+            blocks = [SECTION_LAYOUTS[field](item) for item in resume_data[field]]
+        # Keep each heading on the same page as the section's first item
+        first = layout_heading(heading)
+        first.extend(blocks[0])
+        canvas.place(first)
+        for block in blocks[1:]:
+            canvas.place(block)
+        canvas.place(_section_gap())
+    return canvas.to_pdf(title=resume_data.get('name', 'Resume'))
+
+
+def _section_gap():
+    block = Block()
+    block.space(4)
+    return block
+
+
+def _warm_pdf_worker():
+    """Worker initializer: render a minimal resume so imports and caches are hot"""
+    render_resume_pdf({
+        "name": "Warm Up",
+        "location": "-",
+        "phone": "-",
+        "email": "-",
+        "experience": [{"title": "-", "company": "**-**", "location": "-", "dateRange": "-", "bullets": ["-"]}],
+    })
+
+
+def configure_pdf_render_pool(workers=None, max_queue=None, timeout=None, queue_wait=None):
+    """Replace the PDF render pool with one using the given limits
+
+    Args:
+        workers: Number of worker processes
+        max_queue: Number of jobs allowed to wait for a free worker
+        timeout: Per-job timeout in seconds
+        queue_wait: Seconds a job may wait for a queue slot before being rejected
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        old_pool = _pdf_pool
+        _pdf_pool = create_render_pool(
+            workers=workers or PDF_POOL_WORKERS,
+            max_queue=max_queue if max_queue is not None else PDF_POOL_MAX_QUEUE,
+            timeout=timeout or PDF_RENDER_TIMEOUT_SECONDS,
+            queue_wait=queue_wait if queue_wait is not None else PDF_POOL_QUEUE_WAIT_SECONDS,
+            initializer=_warm_pdf_worker,
+        )
+    if old_pool is not None:
+        old_pool.shutdown(wait=False)
+    return _pdf_pool
+
+
+def get_pdf_render_pool():
+    """Return the shared PDF render pool, creating it on first use"""
+    if _pdf_pool is None:
+        return configure_pdf_render_pool()
+    return _pdf_pool
+
+
+def pdf_render_pool_stats():
+    """Return queue depth, counters and latency percentiles for the PDF render pool"""
+    return get_pdf_render_pool().stats() if _pdf_pool is not None else {"started": False}
+
+
+def compile_resume_pdf(json_input):
+    """Validate a JSON resume and render it to a PDF in-process, with no browser or network
+
+    Args:
+        json_input: A resume in JSON format (string or dictionary)
+
+    Rendering runs on the shared warm worker pool (see get_pdf_render_pool). When the
+    pool is saturated, a job times out or its worker dies, the result has retry=True.
+
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the JSON is valid
+        - message (str): Validation message if invalid
+        - pdf (str): The PDF document, base64-encoded, if valid
+        - bytes (int): Size of the PDF in bytes
+        - warnings (list): Present if some text could not be drawn exactly, e.g.
+          characters outside the WinAnsi font encoding that were replaced with "?"
+    """
+    try:
+        if not isinstance(json_input, (str, dict)):
+            return {
+                "valid": False,
+                "message": f"Input must be a JSON string or dictionary, got {type(json_input)}",
+                "pdf": None
+            }
+
+        document, _ = load_resume_document(json_input)
+        if document.errors:
+            return {
+                "valid": False,
+                "message": f"JSON fails resume validation: {'; '.join(document.errors)}",
+                "pdf": None
+            }
+
+        pdf = _pdf_cache.get(document.content_hash) if document.content_hash else None
+        if pdf is None:
+            pdf = get_pdf_render_pool().run(render_resume_pdf, document.resume)
+            if document.content_hash:
+                _pdf_cache.put(document.content_hash, pdf)
+
+        result = {
+            "valid": True,
+            "message": "Resume compiled to PDF successfully",
+            "pdf": base64.b64encode(pdf).decode("ascii"),
+            "bytes": len(pdf)
+        }
+        missing = unencodable_characters(document.resume)
+        if missing:
+            result["warnings"] = [
+                "Characters the PDF fonts cannot draw were replaced with '?': "
+                + " ".join(f"{char} (U+{ord(char):04X})" for char in missing)
+                + ". Use compile_resume_tool and print the HTML to keep them."
+            ]
+        return result
+
+    except (RenderPoolBusy, RenderTimeout, RenderWorkerLost) as e:
+        # The resume itself may be fine; tell the caller the server is overloaded
+        return {
+            "valid": False,
+            "message": f"PDF renderer unavailable, try again shortly: {str(e)}",
+            "pdf": None,
+            "retry": True
+        }
+    except json.JSONDecodeError as e:
+        return {
+            "valid": False,
+            "message": f"Invalid JSON format: {str(e)}",
+            "pdf": None
+        }
+    except Exception as e:
+        return {
+            "valid": False,
+            "message": f"Error compiling resume to PDF: {str(e)}",
+            "pdf": None
+        }
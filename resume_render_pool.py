@@ -0,0 +1,238 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+
+# Pools are created from a multi-threaded server, where a forked child can inherit a lock
+# another thread was holding (e.g. a cache lock) and deadlock on it. Workers are
+# started from a clean forkserver process instead, or spawned where that isn't available.
+WORKER_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def worker_context():
+    """Return the multiprocessing context every worker pool in the server should use"""
+    return multiprocessing.get_context(WORKER_START_METHOD)
+
+
+def terminate_workers(executor):
+    """Kill the worker processes of a ProcessPoolExecutor and shut it down
+
+    Used when a job timed out: a running job cannot be cancelled, so the only way to
+    get its worker back is to end the process.
+    """
+    if hasattr(executor, "terminate_workers"):  # Python 3.14+
+        executor.terminate_workers()
+        return
+    for process in list((executor._processes or {}).values()):
+        if process.is_alive():
+            process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RenderPoolBusy(Exception):
+    """Raised when the render queue is full and no slot freed up in time"""
+
+
+class RenderTimeout(Exception):
+    """Raised when a render job does not finish within its timeout"""
+
+
+class RenderWorkerLost(Exception):
+    """Raised when a job's worker process died (crashed, or ended by a pool recycle)"""
+
+
+def _timed_call(fn, args):
+    """Run fn(*args) in a worker and report how long the call itself took"""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RenderPool:
+    """A persistent pool of pre-initialized worker processes with a bounded queue
+
+    At most workers + max_queue jobs are admitted at once. Further jobs wait up to
+    queue_wait seconds for a slot and are then rejected with RenderPoolBusy, so a
+    burst of requests degrades into fast refusals instead of unbounded work.
+
+    A job that exceeds its timeout raises RenderTimeout. A running job cannot be
+    cancelled, and a process pool breaks as a whole when one of its workers dies, so
+    the pool is recycled: its workers are terminated and the next job starts a fresh
+    pool. Other jobs that were in flight on it raise RenderWorkerLost, as do jobs
+    whose worker crashed.
+
+    Args:
+        workers: Number of worker processes (defaults to the CPU count)
+        max_queue: Number of jobs allowed to wait for a free worker
+        timeout: Default per-job timeout in seconds
+        queue_wait: Seconds a job may wait for a queue slot before being rejected
+        initializer: Optional function run once in each worker when it starts
+    """
+
+    def __init__(self, workers=None, max_queue=32, timeout=30.0, queue_wait=2.0, initializer=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.queue_wait = queue_wait
+        self.initializer = initializer
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.workers + max_queue)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1024)
+        self._queue_waits = deque(maxlen=1024)
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.recycled = 0
+
+    def start(self):
+        """Start the worker processes and wait until each has run its initializer
+
+        Returns:
+            The running ProcessPoolExecutor
+        """
+        with self._lock:
+            if self._executor is not None:
+                return self._executor
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=worker_context(), initializer=self.initializer
+            )
+            executor = self._executor
+        # Processes are spawned on demand, so submit one no-op per worker to bring them all up
+        try:
+            warmups = [executor.submit(time.sleep, 0) for _ in range(self.workers)]
+            for future in warmups:
+                future.result()
+        except BrokenProcessPool:
+            self._recycle(executor)
+            raise
+        return executor
+
+    def _recycle(self, executor):
+        """Terminate a broken or stuck executor so the next job starts a fresh one"""
+        with self._lock:
+            if self._executor is not executor:
+                return  # Already replaced by another job
+            self._executor = None
+            self.recycled += 1
+        terminate_workers(executor)
+
+    def run(self, fn, *args, timeout=None):
+        """Run fn(*args) on a worker and return its result
+
+        Raises:
+            RenderPoolBusy: If the queue stayed full for queue_wait seconds
+            RenderTimeout: If the job took longer than timeout seconds
+        """
+        if not self._slots.acquire(timeout=self.queue_wait):
+            with self._lock:
+                self.rejected += 1
+            raise RenderPoolBusy(
+                f"Render queue is full ({self.workers} workers, {self.max_queue} queued)"
+            )
+
+        executor = None
+        try:
+            executor = self.start()
+            submitted_at = time.perf_counter()
+            future = executor.submit(_timed_call, fn, args)
+        except BrokenProcessPool as e:
+            self._slots.release()
+            if executor is not None:
+                self._recycle(executor)
+            raise RenderWorkerLost(f"Render workers exited unexpectedly: {str(e)}") from e
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+        future.add_done_callback(lambda f: self._finish(f, submitted_at))
+
+        try:
+            result, _ = future.result(timeout=timeout if timeout is not None else self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            # Ending the workers fails the future, which releases the job's slot
+            self._recycle(executor)
+            raise RenderTimeout(f"Render job did not finish within {timeout or self.timeout} seconds")
+        except BrokenProcessPool as e:
+            self._recycle(executor)
+            raise RenderWorkerLost(f"Render worker exited unexpectedly: {str(e)}") from e
+        return result
+
+    def _finish(self, future, submitted_at):
+        total = time.perf_counter() - submitted_at
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                _, run_seconds = future.result()
+                self.completed += 1
+                self._latencies.append(total)
+                self._queue_waits.append(max(0.0, total - run_seconds))
+        self._slots.release()
+
+    def stats(self):
+        """Return queue depth, counters and latency percentiles (seconds)"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            waits = sorted(self._queue_waits)
+            return {
+                "started": self._executor is not None,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "recycled": self.recycled,
+                "latency_p50": _percentile(latencies, 0.50),
+                "latency_p95": _percentile(latencies, 0.95),
+                "latency_max": latencies[-1] if latencies else None,
+                "queue_wait_p95": _percentile(waits, 0.95),
+            }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_pools = []
+
+
+def create_render_pool(**kwargs):
+    """Create a RenderPool that is shut down automatically when the process exits"""
+    pool = RenderPool(**kwargs)
+    _pools.append(pool)
+    return pool
+
+
+@atexit.register
+def _shutdown_pools():
+    for pool in _pools:
+        pool.shutdown(wait=False)
@@ -0,0 +1,554 @@
+import contextlib
+import hashlib
+import json
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+from resume_cache import canonical_hash
+from resume_store import ResumeStore, parse_resume_ref
+
+# SQLite backend for the resume store, selected with RESUME_STORE_BACKEND=sqlite.
+#
+# Documents are split on save: array items (education, experience, projects,
+# publications) become rows in sections, and their bullets rows in bullets, all keyed
+# by content hash. A variant that changes one bullet therefore adds one bullet row and
+# one section row instead of a full copy, and sections are indexed by company and title
+# so queries like "every variant with an Acme role" don't read any documents.
+SQLITE_POOL_SIZE = int(os.environ.get("RESUME_SQLITE_POOL_SIZE", 4))
+SQLITE_BUSY_TIMEOUT_SECONDS = 30
+
+# Compiled results kept in the artifacts table when it serves as the compile cache
+SQLITE_ARTIFACT_MAX_BYTES = int(os.environ.get("RESUME_SQLITE_ARTIFACT_MAX_BYTES", 256_000_000))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id TEXT PRIMARY KEY,
+    name TEXT,
+    head TEXT NOT NULL,
+    updated REAL NOT NULL,
+    version_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resumes_updated ON resumes(updated);
+CREATE INDEX IF NOT EXISTS resumes_head ON resumes(head);
+
+CREATE TABLE IF NOT EXISTS versions (
+    resume_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    saved REAL NOT NULL,
+    bytes INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (resume_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS versions_version ON versions(version);
+
+-- A document is its top-level fields, with each split array left empty; its items
+-- are listed in document_sections
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    version TEXT NOT NULL UNIQUE,
+    skeleton TEXT NOT NULL,
+    bytes INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS document_sections (
+    document_id INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    section_id INTEGER NOT NULL,
+    PRIMARY KEY (document_id, field, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS document_sections_section ON document_sections(section_id);
+
+-- One array item; when split_bullets is set its bullets are in section_bullets
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    field TEXT NOT NULL,
+    data TEXT NOT NULL,
+    split_bullets INTEGER NOT NULL,
+    company TEXT,
+    title TEXT
+);
+CREATE INDEX IF NOT EXISTS sections_company ON sections(company);
+CREATE INDEX IF NOT EXISTS sections_title ON sections(title);
+
+CREATE TABLE IF NOT EXISTS section_bullets (
+    section_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    bullet_id INTEGER NOT NULL,
+    PRIMARY KEY (section_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS section_bullets_bullet ON section_bullets(bullet_id);
+
+CREATE TABLE IF NOT EXISTS bullets (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS artifacts_accessed ON artifacts(accessed);
+"""
+
+_BOLD_MARKUP = re.compile(r'\*\*')
+_WHITESPACE = re.compile(r'\s+')
+
+# Upper bound for prefix range scans, so "company starts with" queries use the index
+_PREFIX_END = "\U0010ffff"
+
+
+def search_key(text):
+    """Normalize a company or title for indexed lookups: no bold markup, lowercase"""
+    if not isinstance(text, str):
+        return None
+    return _WHITESPACE.sub(" ", _BOLD_MARKUP.sub("", text)).strip().lower() or None
+
+
+def _text_hash(text):
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def split_resume(resume):
+    """Split a resume into a skeleton, its sections and its bullets
+
+    Returns:
+        tuple: (skeleton, sections, bullets)
+            - skeleton (dict): The resume with each array of objects emptied
+            - sections (list): (field, position, hash, data, split_bullets, bullet hashes)
+              for every array item
+            - bullets (dict): Bullet text by hash
+    """
+    skeleton, sections, bullets = {}, [], {}
+    for field, value in resume.items():
+        if not (isinstance(value, list) and value and all(isinstance(item, dict) for item in value)):
+            skeleton[field] = value
+            continue
+        for position, item in enumerate(value):
+            section_hash = canonical_hash([field, item])
+            data = dict(item)
+            item_bullets = item.get("bullets")
+            split_bullets = isinstance(item_bullets, list) and all(isinstance(b, str) for b in item_bullets)
+            bullet_hashes = []
+            if split_bullets:
+                # The key keeps its position in the item; the texts live in bullets
+                data["bullets"] = []
+                for text in item_bullets:
+                    bullet_hash = _text_hash(text)
+                    bullets[bullet_hash] = text
+                    bullet_hashes.append(bullet_hash)
+            sections.append((field, position, section_hash, data, split_bullets, bullet_hashes))
+        skeleton[field] = []
+    return skeleton, sections, bullets
+
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections to one database, opened on first use
+
+    Connections run in autocommit mode with WAL journaling, so readers don't block the
+    writer; writes go through transaction(), which takes the write lock up front.
+
+    Args:
+        path: Database file (its directory is created on first connect)
+        size: Maximum number of open connections; further callers wait for one
+    """
+
+    def __init__(self, path, size=SQLITE_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self.opened = 0
+        self.waits = 0
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.executescript(SCHEMA)
+                self._schema_ready = True
+            self.opened += 1
+        return conn
+
+    @contextlib.contextmanager
+    def connection(self):
+        if not self._slots.acquire(blocking=False):
+            self.waits += 1
+            self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self):
+        return {"size": self.size, "opened": self.opened, "idle": self._idle.qsize(), "waits": self.waits}
+
+
+class SQLiteResumeStore(ResumeStore):
+    """Resume store in a SQLite database, with sections and bullets shared across versions
+
+    Exposes the same methods as ResumeStore, plus search() for indexed queries across
+    every saved resume.
+
+    Args:
+        path: Database file
+        pool_size: Maximum number of pooled connections
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path, pool_size=SQLITE_POOL_SIZE):
+        super().__init__(os.path.dirname(path) or ".")
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+
+    # --- References ---
+
+    def resolve(self, ref):
+        resume_id, version = parse_resume_ref(ref)
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT head FROM resumes WHERE resume_id = ?", (resume_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"No saved resume '{resume_id}'")
+            if not version:
+                return resume_id, row[0]
+            matches = [match for (match,) in conn.execute(
+                "SELECT DISTINCT version FROM versions WHERE resume_id = ? AND version >= ? AND version < ?",
+                (resume_id, version, version + "g"),
+            )]
+        if not matches:
+            raise KeyError(f"Resume '{resume_id}' has no version '{version}'")
+        if len(matches) > 1:
+            raise ValueError(f"Version '{version}' is ambiguous for resume '{resume_id}'")
+        return resume_id, matches[0]
+
+    # --- Documents ---
+
+    def _rebuild(self, conn, version):
+        row = conn.execute("SELECT id, skeleton FROM documents WHERE version = ?", (version,)).fetchone()
+        if row is None:
+            raise KeyError(f"Version '{version}' is missing from the database")
+        document_id, skeleton = row
+        resume = json.loads(skeleton)
+        rows = conn.execute(
+            """
+            SELECT ds.field, ds.position, s.data, s.split_bullets, b.text
+            FROM document_sections ds
+            JOIN sections s ON s.id = ds.section_id
+            LEFT JOIN section_bullets sb ON sb.section_id = s.id
+            LEFT JOIN bullets b ON b.id = sb.bullet_id
+            WHERE ds.document_id = ?
+            ORDER BY ds.field, ds.position, sb.position
+            """,
+            (document_id,),
+        )
+        item, current = None, None
+        for field, position, data, split_bullets, text in rows:
+            if (field, position) != current:
+                current = (field, position)
+                item = json.loads(data)
+                resume[field].append(item)
+            if split_bullets and text is not None:
+                item["bullets"].append(text)
+        return resume
+
+    def load_text(self, ref):
+        resume_id, version = self.resolve(ref)
+        text = self._documents.get(version)
+        if text is None:
+            with self.pool.connection() as conn:
+                text = json.dumps(self._rebuild(conn, version), ensure_ascii=False)
+            self._documents.put(version, text)
+        return resume_id, version, text
+
+    def _store_version(self, resume_id, document, text, message):
+        version = document.content_hash
+        size = len(text.encode("utf-8"))
+        with self.pool.transaction() as conn:
+            if conn.execute("SELECT 1 FROM documents WHERE version = ?", (version,)).fetchone() is None:
+                skeleton, sections, bullets = split_resume(document.resume)
+                document_id = conn.execute(
+                    "INSERT INTO documents (version, skeleton, bytes) VALUES (?, ?, ?)",
+                    (version, json.dumps(skeleton, ensure_ascii=False), size),
+                ).lastrowid
+                conn.executemany("INSERT OR IGNORE INTO bullets (hash, text) VALUES (?, ?)", bullets.items())
+                for field, position, section_hash, data, split_bullets, bullet_hashes in sections:
+                    row = conn.execute("SELECT id FROM sections WHERE hash = ?", (section_hash,)).fetchone()
+                    if row is not None:
+                        section_id = row[0]
+                    else:
+                        section_id = conn.execute(
+                            "INSERT INTO sections (hash, field, data, split_bullets, company, title) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (
+                                section_hash, field, json.dumps(data, ensure_ascii=False), int(split_bullets),
+                                search_key(data.get("company") or data.get("institution")),
+                                search_key(data.get("title") or data.get("name") or data.get("degree")),
+                            ),
+                        ).lastrowid
+                        conn.executemany(
+                            "INSERT INTO section_bullets (section_id, position, bullet_id) "
+                            "SELECT ?, ?, id FROM bullets WHERE hash = ?",
+                            [(section_id, i, bullet_hash) for i, bullet_hash in enumerate(bullet_hashes)],
+                        )
+                    conn.execute(
+                        "INSERT INTO document_sections (document_id, field, position, section_id) VALUES (?, ?, ?, ?)",
+                        (document_id, field, position, section_id),
+                    )
+
+            row = conn.execute(
+                "SELECT head, version_count FROM resumes WHERE resume_id = ?", (resume_id,)
+            ).fetchone()
+            name = document.resume.get("name", "")
+            if row is not None and row[0] == version:
+                conn.execute("UPDATE resumes SET name = ? WHERE resume_id = ?", (name, resume_id))
+                return False, row[1]
+            versions = (row[1] if row is not None else 0) + 1
+            now = time.time()
+            conn.execute(
+                "INSERT INTO versions (resume_id, seq, version, saved, bytes, message) VALUES (?, ?, ?, ?, ?, ?)",
+                (resume_id, versions, version, now, size, message or ""),
+            )
+            conn.execute(
+                "INSERT INTO resumes (resume_id, name, head, updated, version_count) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (resume_id) DO UPDATE SET name = excluded.name, head = excluded.head, "
+                "updated = excluded.updated, version_count = excluded.version_count",
+                (resume_id, name, version, now, versions),
+            )
+        return True, versions
+
+    # --- Listing and queries ---
+
+    def list(self, prefix="", limit=100, offset=0):
+        prefix = prefix or ""
+        bounds = (prefix, prefix + _PREFIX_END)
+        with self.pool.connection() as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM resumes WHERE resume_id >= ? AND resume_id < ?", bounds
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT resume_id, name, head, updated, version_count FROM resumes "
+                "WHERE resume_id >= ? AND resume_id < ? ORDER BY updated DESC LIMIT ? OFFSET ?",
+                (*bounds, limit, offset),
+            ).fetchall()
+        return total, [
+            {"resume_id": resume_id, "name": name, "head": head, "updated": updated, "versions": versions}
+            for resume_id, name, head, updated, versions in rows
+        ]
+
+    def versions(self, resume_id):
+        resume_id, _ = self.resolve(resume_id.partition("@")[0])
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT version, saved, bytes, message FROM versions WHERE resume_id = ? ORDER BY seq",
+                (resume_id,),
+            ).fetchall()
+        return [
+            {"version": version, "saved": saved, "bytes": size, "message": message}
+            for version, saved, size, message in rows
+        ]
+
+    def search(self, company=None, title=None, bullet=None, all_versions=False, limit=100):
+        """Find saved resumes containing a company, a title or a bullet
+
+        Company and title match by prefix, ignoring case and bold markup, through their
+        indexes; bullet matches any bullet containing the text. Every given filter must
+        match some item of the resume.
+
+        Args:
+            company: Company (or institution) name, e.g. "acme"
+            title: Job title, project name or degree, e.g. "software engineer"
+            bullet: Text contained in a bullet, e.g. "kubernetes"
+            all_versions: Match every saved version instead of only each resume's head
+            limit: Maximum number of matches to return
+
+        Returns:
+            list: Matches with resume_id, name, version and saved/updated time
+        """
+        subqueries, params = [], []
+        for column, value in (("company", company), ("title", title)):
+            key = search_key(value)
+            if key:
+                subqueries.append(
+                    "SELECT d.version FROM sections s "
+                    "JOIN document_sections ds ON ds.section_id = s.id "
+                    "JOIN documents d ON d.id = ds.document_id "
+                    f"WHERE s.{column} >= ? AND s.{column} < ?"
+                )
+                params.extend((key, key + _PREFIX_END))
+        if bullet:
+            subqueries.append(
+                "SELECT d.version FROM bullets b "
+                "JOIN section_bullets sb ON sb.bullet_id = b.id "
+                "JOIN document_sections ds ON ds.section_id = sb.section_id "
+                "JOIN documents d ON d.id = ds.document_id "
+                "WHERE b.text LIKE ? ESCAPE '\\'"
+            )
+            params.append("%" + re.sub(r"([%_\\])", r"\\\1", bullet) + "%")
+        if not subqueries:
+            raise ValueError("Give at least one of company, title or bullet")
+
+        conditions = " AND ".join(f"{{column}} IN ({subquery})" for subquery in subqueries)
+        if all_versions:
+            sql = (
+                "SELECT v.resume_id, r.name, v.version, v.saved FROM versions v "
+                "JOIN resumes r ON r.resume_id = v.resume_id WHERE "
+                + conditions.format(column="v.version") + " ORDER BY v.saved DESC LIMIT ?"
+            )
+        else:
+            sql = (
+                "SELECT r.resume_id, r.name, r.head, r.updated FROM resumes r WHERE "
+                + conditions.format(column="r.head") + " ORDER BY r.updated DESC LIMIT ?"
+            )
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, (*params, limit)).fetchall()
+        return [
+            {"resume_id": resume_id, "name": name, "version": version, "saved": saved}
+            for resume_id, name, version, saved in rows
+        ]
+
+    def compile_cache(self, max_bytes=SQLITE_ARTIFACT_MAX_BYTES):
+        """Return the artifacts table as a persistent tier for the compile cache"""
+        return SQLiteArtifactCache(self.pool, max_bytes)
+
+    def stats(self):
+        with self.pool.connection() as conn:
+            counts = {
+                table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("resumes", "versions", "documents", "sections", "bullets", "artifacts")
+            }
+            counts["bullet_references"] = conn.execute("SELECT COUNT(*) FROM section_bullets").fetchone()[0]
+        try:
+            db_bytes = sum(
+                os.path.getsize(self.path + suffix) for suffix in ("", "-wal") if os.path.exists(self.path + suffix)
+            )
+        except OSError:
+            db_bytes = None
+        return dict(counts, path=self.path, bytes=db_bytes, pool=self.pool.stats(),
+                    document_cache=self._documents.stats())
+
+
+class SQLiteArtifactCache:
+    """Compiled results in the artifacts table, evicted least recently used first
+
+    Has DiskCache's get, put, clear and stats methods, so it can be passed to
+    configure_compile_cache(disk_cache=...).
+    """
+
+    def __init__(self, pool, max_bytes=SQLITE_ARTIFACT_MAX_BYTES):
+        self.pool = pool
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def get(self, key):
+        try:
+            with self.pool.connection() as conn:
+                row = conn.execute("SELECT data FROM artifacts WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE artifacts SET accessed = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error:
+            row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def put(self, key, value):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        try:
+            with self.pool.transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts (key, data, bytes, accessed) VALUES (?, ?, ?, ?)",
+                    (key, value, size, time.time()),
+                )
+                total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM artifacts").fetchone()[0]
+                evicted = 0
+                if total > self.max_bytes:
+                    for old_key, old_size in conn.execute(
+                        "SELECT key, bytes FROM artifacts ORDER BY accessed"
+                    ).fetchall():
+                        if total <= self.max_bytes:
+                            break
+                        conn.execute("DELETE FROM artifacts WHERE key = ?", (old_key,))
+                        total -= old_size
+                        evicted += 1
+        except sqlite3.Error as e:
+            # stdout carries the MCP stdio protocol, so report on stderr
+            print(f"Error writing compile cache entry: {str(e)}", file=sys.stderr)
+            return
+        with self._lock:
+            self.writes += 1
+            self.evictions += evicted
+
+    def clear(self):
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM artifacts")
+
+    def stats(self):
+        with self.pool.connection() as conn:
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM artifacts").fetchone()
+        with self._lock:
+            return {
+                "database": self.pool.path,
+                "entries": entries,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,186 @@
+import json
+import threading
+from collections import Counter, defaultdict, namedtuple
+
+from resume_cache import LRUCache, canonical_hash
+from resume_compiler import (
+    VALIDATED_FIELDS, load_resume_document, order_resume_errors, register_resume_document,
+    validate_resume_fields,
+)
+from resume_patch import JsonPatchError, apply_json_patch, apply_merge_patch, touched_fields
+
+# Working copies of resumes being edited, so an edit can be sent as a small patch
+# instead of the whole document
+DEFAULT_RESUME_ID = "default"
+WORKING_RESUME_MAX_ENTRIES = 64
+
+# The current document, its version (canonical hash) and its errors by top-level field
+WorkingResume = namedtuple('WorkingResume', ['resume', 'version', 'errors_by_field'])
+
+_working_resumes = LRUCache(max_entries=WORKING_RESUME_MAX_ENTRIES)
+_lock = threading.Lock()
+
+
+def _error_keys(resume, field, error):
+    """Return (content key, position key) for an error of one top-level field"""
+    if error.item is None:
+        return (error.rule, None), (error.rule, None)
+    return (error.rule, canonical_hash(resume[field][error.item])), (error.rule, error.item)
+
+
+def _introduced_errors(field, errors, resume, previous_errors, previous_resume):
+    """Return the errors of a patched field that the previous version did not have
+
+    Messages name items by position, so errors are matched on the rule they break and
+    the item's content instead (the item may have moved, e.g. when another one was
+    inserted ahead of it). Errors left over are then matched by position, for items
+    edited in place.
+    """
+    unmatched = defaultdict(list)
+    for error in previous_errors:
+        content_key, position_key = _error_keys(previous_resume, field, error)
+        unmatched[content_key].append(position_key)
+    remaining = []
+    for error in errors:
+        content_key, position_key = _error_keys(resume, field, error)
+        if unmatched[content_key]:
+            unmatched[content_key].pop()
+        else:
+            remaining.append((error, position_key))
+    positions = Counter(key for keys in unmatched.values() for key in keys)
+    introduced = []
+    for error, position_key in remaining:
+        if positions[position_key]:
+            positions[position_key] -= 1
+        else:
+            introduced.append(error)
+    return introduced
+
+
+def _summary(resume_id, working, message, touched=None):
+    errors = order_resume_errors(working.errors_by_field)
+    result = {
+        "valid": not errors,
+        "message": message if not errors else f"JSON fails resume validation: {'; '.join(errors)}",
+        "resume_id": resume_id,
+        "version": working.version,
+    }
+    if errors:
+        result["errors"] = errors
+    if touched is not None:
+        result["touched"] = sorted(touched)
+    return result
+
+
+def set_working_resume(json_input, resume_id=DEFAULT_RESUME_ID):
+    """Start editing a resume on the server
+
+    The resume is validated in full once; later patches only revalidate what they touch.
+
+    Args:
+        json_input: The resume in JSON format (string or dictionary)
+        resume_id: Name of the working copy, for editing several resumes at once
+
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether the resume passes validation
+        - message (str): Validation message
+        - resume_id (str): Name of the working copy
+        - version (str): Canonical hash of the document, for expected_version checks
+    """
+    try:
+        document, _ = load_resume_document(json_input)
+    except json.JSONDecodeError as e:
+        return {"valid": False, "message": f"Invalid JSON format: {str(e)}"}
+    except TypeError as e:
+        return {"valid": False, "message": str(e)}
+    if not isinstance(document.resume, dict):
+        return {"valid": False, "message": "Resume data must be a JSON object (dictionary)"}
+
+    resume = document.resume
+    errors_by_field = validate_resume_fields(resume, VALIDATED_FIELDS)
+    working = WorkingResume(resume, document.content_hash or canonical_hash(resume), errors_by_field)
+    with _lock:
+        _working_resumes.put(resume_id, working)
+    return _summary(resume_id, working, "Working resume set")
+
+
+def get_working_resume(resume_id=DEFAULT_RESUME_ID):
+    """Return the WorkingResume for resume_id, or None if there is none"""
+    return _working_resumes.get(resume_id)
+
+
+def patch_working_resume(patch, resume_id=DEFAULT_RESUME_ID, expected_version=None):
+    """Apply a JSON Patch (RFC 6902) or JSON merge patch (RFC 7386) to a working resume
+
+    Only the top-level fields the patch touches are revalidated. A patch that fails to
+    apply or introduces an error the working copy did not already have is rejected and
+    the working copy is unchanged, so an invalid resume can be fixed one patch at a time.
+
+    Args:
+        patch: A list of JSON Patch operations or a merge patch object (or its JSON text)
+        resume_id: Name of the working copy
+        expected_version: If given, the patch is rejected unless the working copy is
+            still at this version
+
+    Returns:
+        tuple: (result dictionary, WorkingResume after the patch or None if rejected)
+    """
+    if isinstance(patch, str):
+        try:
+            patch = json.loads(patch)
+        except json.JSONDecodeError as e:
+            return {"valid": False, "message": f"Invalid JSON format in patch: {str(e)}"}, None
+
+    with _lock:
+        working = _working_resumes.get(resume_id)
+        if working is None:
+            return {"valid": False, "message": f"No working resume '{resume_id}'; set one first"}, None
+        if expected_version is not None and expected_version != working.version:
+            return {
+                "valid": False,
+                "message": f"Working resume '{resume_id}' changed (now at version {working.version})",
+                "version": working.version,
+            }, None
+
+        try:
+            if isinstance(patch, list):
+                resume = apply_json_patch(working.resume, patch)
+            elif isinstance(patch, dict):
+                resume = apply_merge_patch(working.resume, patch)
+            else:
+                raise JsonPatchError("Patch must be a JSON Patch array or a merge patch object")
+            touched = touched_fields(patch)
+        except JsonPatchError as e:
+            return {"valid": False, "message": f"Patch could not be applied: {str(e)}"}, None
+        if not isinstance(resume, dict):
+            return {"valid": False, "message": "Resume data must be a JSON object (dictionary)"}, None
+
+        if touched is None:
+            touched = set(VALIDATED_FIELDS) | set(resume)
+        touched_errors = validate_resume_fields(resume, touched)
+        introduced = {
+            field: _introduced_errors(
+                field, errors, resume, working.errors_by_field.get(field, ()), working.resume
+            )
+            for field, errors in touched_errors.items()
+        }
+        if any(introduced.values()):
+            messages = order_resume_errors(introduced)
+            return {
+                "valid": False,
+                "message": f"Patch rejected, working resume unchanged: {'; '.join(messages)}",
+                "errors": messages,
+                "resume_id": resume_id,
+                "version": working.version,
+                "touched": sorted(touched),
+            }, None
+        errors_by_field = dict(working.errors_by_field)
+        errors_by_field.update(touched_errors)
+        patched = WorkingResume(resume, canonical_hash(resume), errors_by_field)
+        result = _summary(resume_id, patched, "Patch applied", touched)
+        _working_resumes.put(resume_id, patched)
+
+    # The errors are already known, so compiling the patched resume skips validation
+    register_resume_document(resume, order_resume_errors(errors_by_field), patched.version)
+    return result, patched
@@ -0,0 +1,371 @@
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+
+from resume_cache import LRUCache
+from resume_compiler import load_resume_document
+from resume_patch import make_json_patch, touched_fields
+
+try:
+    import fcntl
+except ImportError:  # Windows: only writers within one process are serialized
+    fcntl = None
+
+# Saved resumes, so clients can refer to a resume by id instead of re-sending it.
+#
+# Layout under the store directory:
+# - objects/<aa>/<hash>.json: each distinct document, named by its canonical hash, so
+#   identical versions (of the same or different resumes) are stored once
+# - index.json: snapshot of every resume id with its head and version list (hash,
+#   time, size, message), so listing and resolving versions never opens a document
+# - index.log: versions saved since the snapshot, one JSON line each, so a save appends
+#   a line instead of rewriting the whole index. Every STORE_LOG_COMPACT_ENTRIES lines
+#   the log is folded into a new snapshot.
+STORE_INDEX_FILE = "index.json"
+STORE_LOG_FILE = "index.log"
+STORE_OBJECT_DIR = "objects"
+STORE_LOG_COMPACT_ENTRIES = 500
+
+# Parsed documents kept in memory, by version hash
+STORE_DOCUMENT_CACHE_ENTRIES = 256
+
+# Short version prefixes are accepted when they match exactly one version of a resume
+VERSION_PREFIX_MIN_LENGTH = 7
+
+_RESUME_ID = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$')
+_VERSION = re.compile(r'^[0-9a-f]+$')
+
+
+def parse_resume_ref(ref):
+    """Split "resume_id" or "resume_id@version" into (resume_id, version or "")
+
+    Raises:
+        ValueError: If the id or version is malformed
+    """
+    if not isinstance(ref, str):
+        raise ValueError(f"Resume reference must be a string, got {type(ref)}")
+    resume_id, _, version = ref.partition("@")
+    if not _RESUME_ID.match(resume_id):
+        raise ValueError(f"Invalid resume id '{resume_id}'")
+    if version and (not _VERSION.match(version) or len(version) < VERSION_PREFIX_MIN_LENGTH):
+        raise ValueError(f"Version must be at least {VERSION_PREFIX_MIN_LENGTH} hex characters, got '{version}'")
+    return resume_id, version
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ResumeStore:
+    """Versioned resume store on disk with content-addressed documents and an index
+
+    The index is loaded once; afterwards only log lines appended by other processes
+    are read, and the snapshot is reloaded only after a compaction, so lookups cost two
+    stats rather than a parse. Writers hold a lock file while they append to the log.
+
+    Args:
+        directory: Directory holding the store (created on first save)
+    """
+
+    backend = "files"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_signature = None
+        # Inode of the log file read so far, how far it was read and how many lines it had
+        self._log_inode = None
+        self._log_offset = 0
+        self._log_entries = 0
+        self._documents = LRUCache(max_entries=STORE_DOCUMENT_CACHE_ENTRIES)
+
+    # --- Index ---
+
+    def _index_path(self):
+        return os.path.join(self.directory, STORE_INDEX_FILE)
+
+    def _object_path(self, version):
+        return os.path.join(self.directory, STORE_OBJECT_DIR, version[:2], f"{version}.json")
+
+    def _log_path(self):
+        return os.path.join(self.directory, STORE_LOG_FILE)
+
+    def _load_index(self):
+        """Return the index, reading only what changed on disk since the last call
+
+        The caller holds _lock.
+        """
+        try:
+            st = os.stat(self._index_path())
+            signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            signature = None
+        if self._index is None or signature != self._index_signature:
+            index = {"resumes": {}, "seq": 0}
+            if signature is not None:
+                with open(self._index_path(), "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                index.setdefault("seq", 0)
+            self._index, self._index_signature = index, signature
+            self._log_inode, self._log_offset, self._log_entries = None, 0, 0
+        self._read_log()
+        return self._index
+
+    def _read_log(self):
+        """Apply log lines appended since the last read (caller holds _lock)"""
+        try:
+            st = os.stat(self._log_path())
+        except FileNotFoundError:
+            self._log_inode, self._log_offset, self._log_entries = None, 0, 0
+            return
+        if st.st_ino == self._log_inode and st.st_size == self._log_offset:
+            return
+        with open(self._log_path(), "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._log_inode:
+                # Replaced by a compaction: lines already in the snapshot are skipped by seq
+                self._log_inode, self._log_offset, self._log_entries = inode, 0, 0
+            f.seek(self._log_offset)
+            data = f.read()
+        # A line still being written has no newline yet; it is read next time
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            self._apply_log_entry(json.loads(line))
+            self._log_entries += 1
+        self._log_offset += end
+
+    def _apply_log_entry(self, record):
+        index = self._index
+        if record["seq"] <= index["seq"]:
+            return
+        index["seq"] = record["seq"]
+        entry = index["resumes"].setdefault(record["resume_id"], {"head": None, "versions": []})
+        entry["versions"].append({
+            "version": record["version"],
+            "saved": record["saved"],
+            "bytes": record["bytes"],
+            "message": record["message"],
+        })
+        entry["head"] = record["version"]
+        entry["updated"] = record["saved"]
+        entry["name"] = record["name"]
+
+    @contextlib.contextmanager
+    def _locked_index(self):
+        """Hold the process and file locks and yield the up-to-date index"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield self._load_index()
+
+    def _append_log(self, record):
+        """Append a version record to the log and the index (caller holds both locks)"""
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        with open(self._log_path(), "ab") as f:
+            # Drop a partial line left by a writer that died mid-append
+            if f.tell() != self._log_offset:
+                f.truncate(self._log_offset)
+            f.write(line)
+            self._log_inode = os.fstat(f.fileno()).st_ino
+        self._log_offset += len(line)
+        self._log_entries += 1
+        self._apply_log_entry(record)
+        if self._log_entries >= STORE_LOG_COMPACT_ENTRIES:
+            self._compact()
+
+    def _compact(self):
+        """Fold the log into a new index.json snapshot and start an empty log"""
+        data = json.dumps(self._index, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        _write_atomic(self._index_path(), data)
+        st = os.stat(self._index_path())
+        self._index_signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        _write_atomic(self._log_path(), b"")
+        self._log_inode = os.stat(self._log_path()).st_ino
+        self._log_offset = self._log_entries = 0
+
+    # --- References ---
+
+    def resolve(self, ref):
+        """Resolve "resume_id" or "resume_id@version" to (resume_id, full version hash)
+
+        Raises:
+            KeyError: If the resume or version is not in the store
+            ValueError: If the reference is malformed or the version prefix is ambiguous
+        """
+        resume_id, version = parse_resume_ref(ref)
+        with self._lock:
+            entry = self._load_index()["resumes"].get(resume_id)
+        if entry is None:
+            raise KeyError(f"No saved resume '{resume_id}'")
+        if not version:
+            return resume_id, entry["head"]
+        matches = {v["version"] for v in entry["versions"] if v["version"].startswith(version)}
+        if not matches:
+            raise KeyError(f"Resume '{resume_id}' has no version '{version}'")
+        if len(matches) > 1:
+            raise ValueError(f"Version '{version}' is ambiguous for resume '{resume_id}'")
+        return resume_id, matches.pop()
+
+    # --- Documents ---
+
+    def load_text(self, ref):
+        """Return (resume_id, version, JSON text) of a saved resume"""
+        resume_id, version = self.resolve(ref)
+        text = self._documents.get(version)
+        if text is None:
+            with open(self._object_path(version), "r", encoding="utf-8") as f:
+                text = f.read()
+            self._documents.put(version, text)
+        return resume_id, version, text
+
+    def load(self, ref):
+        """Return (resume_id, version, resume dictionary) of a saved resume"""
+        resume_id, version, text = self.load_text(ref)
+        return resume_id, version, json.loads(text)
+
+    def save(self, resume_id, json_input, message=None):
+        """Save a resume as the new head version of resume_id
+
+        Only resumes that pass validation are saved, so anything loaded from the store
+        can be compiled. Saving the same content as the current head adds no version.
+
+        Args:
+            resume_id: Name of the resume (letters, digits, ".", "_" and "-")
+            json_input: The resume in JSON format (string or dictionary)
+            message: Optional note describing the version (e.g. the target job)
+
+        Returns:
+            A dictionary containing:
+            - valid (bool): Whether the resume was saved
+            - message (str): Result or validation message
+            - resume_id (str): Name of the resume
+            - version (str): Canonical hash of the saved document
+            - created (bool): False if the content matched the current head
+            - versions (int): Number of versions of the resume
+        """
+        if not isinstance(resume_id, str) or not _RESUME_ID.match(resume_id):
+            return {"valid": False, "message": f"Invalid resume id '{resume_id}' (use letters, digits, '.', '_' and '-')"}
+        try:
+            document, _ = load_resume_document(json_input)
+        except json.JSONDecodeError as e:
+            return {"valid": False, "message": f"Invalid JSON format: {str(e)}"}
+        except TypeError as e:
+            return {"valid": False, "message": str(e)}
+        if not isinstance(document.resume, dict):
+            return {"valid": False, "message": "Resume data must be a JSON object (dictionary)"}
+        if document.errors:
+            return {
+                "valid": False,
+                "message": f"JSON fails resume validation: {'; '.join(document.errors)}",
+                "errors": list(document.errors),
+            }
+
+        version = document.content_hash
+        text = json_input if isinstance(json_input, str) else json.dumps(json_input, ensure_ascii=False)
+        created, versions = self._store_version(resume_id, document, text, message)
+        self._documents.put(version, text)
+        return {
+            "valid": True,
+            "message": f"Saved resume '{resume_id}'" if created else f"Resume '{resume_id}' unchanged",
+            "resume_id": resume_id,
+            "version": version,
+            "created": created,
+            "versions": versions,
+        }
+
+    def _store_version(self, resume_id, document, text, message):
+        """Write the document if new and make it the head of resume_id
+
+        Returns:
+            tuple: (whether a version was added, number of versions of resume_id)
+        """
+        version = document.content_hash
+        path = self._object_path(version)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path, text.encode("utf-8"))
+
+        with self._locked_index() as index:
+            entry = index["resumes"].get(resume_id)
+            if entry is not None and entry["head"] == version:
+                return False, len(entry["versions"])
+            self._append_log({
+                "seq": index["seq"] + 1,
+                "resume_id": resume_id,
+                "name": document.resume.get("name", ""),
+                "version": version,
+                "saved": time.time(),
+                "bytes": len(text.encode("utf-8")),
+                "message": message or "",
+            })
+            return True, len(index["resumes"][resume_id]["versions"])
+
+    # --- Listing and diffs ---
+
+    def list(self, prefix="", limit=100, offset=0):
+        """List saved resumes from the index, most recently updated first
+
+        Returns:
+            tuple: (total matching resumes, list of summaries with resume_id, name,
+                head, updated and versions)
+        """
+        with self._lock:
+            resumes = self._load_index()["resumes"]
+            matching = [
+                {
+                    "resume_id": resume_id,
+                    "name": entry.get("name", ""),
+                    "head": entry["head"],
+                    "updated": entry.get("updated"),
+                    "versions": len(entry["versions"]),
+                }
+                for resume_id, entry in resumes.items()
+                if resume_id.startswith(prefix or "")
+            ]
+        matching.sort(key=lambda item: item["updated"] or 0, reverse=True)
+        return len(matching), matching[offset:offset + limit]
+
+    def versions(self, resume_id):
+        """Return the version list of resume_id, oldest first"""
+        resume_id, _ = self.resolve(resume_id.partition("@")[0])
+        with self._lock:
+            return list(self._load_index()["resumes"][resume_id]["versions"])
+
+    def diff(self, from_ref, to_ref):
+        """Return the JSON Patch turning one saved version into another
+
+        Returns:
+            A dictionary containing:
+            - from, to (str): The resolved "resume_id@version" references
+            - patch (list): RFC 6902 operations from the first to the second version
+            - changed (list): Top-level fields the patch touches
+        """
+        from_id, from_version, source = self.load(from_ref)
+        to_id, to_version, target = self.load(to_ref)
+        patch = [] if from_version == to_version else make_json_patch(source, target)
+        changed = touched_fields(patch) if patch else set()
+        return {
+            "from": f"{from_id}@{from_version}",
+            "to": f"{to_id}@{to_version}",
+            "patch": patch,
+            "changed": sorted(changed) if changed is not None else sorted(set(source) | set(target)),
+        }
+
+    def stats(self):
+        with self._lock:
+            resumes = self._load_index()["resumes"]
+            return {
+                "directory": self.directory,
+                "resumes": len(resumes),
+                "versions": sum(len(entry["versions"]) for entry in resumes.values()),
+                "document_cache": self._documents.stats(),
+            }
@@ -0,0 +1,340 @@
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+
+from resume_cache import DiskCache
+from resume_metrics import observe, traced
+from resume_render_pool import terminate_workers, worker_context
+
+# PyPDF2 and python-docx (which loads lxml) are imported on first use rather than here,
+# so starting the MCP server doesn't pay for them until a document is extracted
+
+# Text extraction constants
+MAX_FILE_SIZE_BYTES = 2_000_000  # ~2 MB
+TEXT_EXTENSIONS = {
+    ".txt", ".py", ".js", ".ts", ".jsx", ".tsx", ".html", ".htm", ".css",
+    ".scss", ".c", ".cpp", ".h", ".hpp", ".java", ".cs", ".json", ".xml",
+    ".yaml", ".yml", ".md", ".sh", ".rb", ".go", ".rs", ".php"
+}
+DOCUMENT_EXTENSIONS = TEXT_EXTENSIONS | {".pdf", ".docx"}
+
+# PDFs over MAX_FILE_SIZE_BYTES are not rejected; only their first pages are read
+LARGE_PDF_MAX_PAGES = 20
+LARGE_PDF_MAX_CHARS = 200_000
+
+# Extracted text of PDF and DOCX files, kept on disk across restarts. Entries are keyed
+# on the file's path, modification time and size, so edited files are re-extracted.
+EXTRACTION_CACHE_DIR = os.environ.get("RESUME_EXTRACTION_CACHE_DIR", os.path.join(".cache", "extraction"))
+EXTRACTION_CACHE_MAX_BYTES = int(os.environ.get("RESUME_EXTRACTION_CACHE_MAX_BYTES", 128_000_000))
+CACHED_EXTENSIONS = {".pdf", ".docx"}
+
+_extraction_cache = DiskCache(EXTRACTION_CACHE_DIR, max_bytes=EXTRACTION_CACHE_MAX_BYTES)
+
+# Fewer files than this are extracted in-process; a pool isn't worth starting
+INGEST_PARALLEL_THRESHOLD = 2
+
+# Seconds an ingest on worker processes may run; files still unfinished then fail
+INGEST_TIMEOUT_SECONDS = 300
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+# Text extraction functions
+def decode_text(data):
+    """Decode bytes as UTF-8, falling back to latin-1, and return (text, encoding)"""
+    try:
+        return data.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        return data.decode('latin-1'), 'latin-1'
+
+def read_text_file(file_path):
+    with open(file_path, 'rb') as f:
+        text, _ = decode_text(f.read())
+    return text.strip()
+
+def extract_docx_text(file_path):
+    from docx import Document
+    document = Document(file_path)
+    full_text = []
+    for para in document.paragraphs:
+        full_text.append(para.text)
+    return "\n".join(full_text)
+
+def iter_pdf_pages(file_path, max_pages=None, max_chars=None):
+    """Yield (page number, text) for the pages of a PDF, lazily and within limits
+    
+    The file is memory-mapped rather than read, and PyPDF2 only parses the objects of
+    pages that are actually visited, so stopping early (or closing the generator)
+    keeps memory bounded by the pages consumed rather than the file size.
+    
+    Args:
+        file_path: Path of the PDF
+        max_pages: Stop after this many pages
+        max_chars: Stop once this many characters were yielded; the last page is cut
+            to fit
+    """
+    import PyPDF2
+    with open(file_path, 'rb') as pdf_file, \
+            mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        reader = PyPDF2.PdfReader(data)
+        remaining = max_chars
+        for page_num, page in enumerate(reader.pages, 1):
+            if max_pages is not None and page_num > max_pages:
+                return
+            page_text = page.extract_text()
+            if not page_text:
+                continue
+            if remaining is not None:
+                page_text = page_text[:remaining]
+                remaining -= len(page_text)
+            yield page_num, page_text
+            if remaining is not None and remaining <= 0:
+                return
+
+def extract_pdf_text(file_path, max_pages=None, max_chars=None):
+    return "\n".join(text for _, text in iter_pdf_pages(file_path, max_pages, max_chars))
+
+def _extraction_cache_key(kind, file_path, limits):
+    st = os.stat(file_path)
+    raw = f"{kind}\0{os.path.abspath(file_path)}\0{st.st_mtime_ns}\0{st.st_size}\0{limits}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def cached_extraction(kind, file_path, limits, extract):
+    """Return extract(), memoized on disk for PDF and DOCX files
+    
+    Args:
+        kind: Name of the extraction ("text" or "units"), part of the cache key
+        file_path: The file being extracted
+        limits: Page/character limits applied, part of the cache key
+        extract: Function returning a JSON-serializable extraction of the file
+        
+    Returns:
+        tuple: (extracted value, whether it came from the cache)
+    """
+    if os.path.splitext(file_path)[1].lower() not in CACHED_EXTENSIONS:
+        return extract(), False
+    key = _extraction_cache_key(kind, file_path, limits)
+    cached = _extraction_cache.get(key)
+    if cached is not None:
+        return json.loads(cached), True
+    value = extract()
+    _extraction_cache.put(key, json.dumps(value, ensure_ascii=False))
+    return value, False
+
+def configure_extraction_cache(directory=None, max_bytes=None):
+    """Move the extraction cache to another directory and/or change its size cap"""
+    global _extraction_cache
+    if directory is not None:
+        _extraction_cache = DiskCache(directory, max_bytes=max_bytes or _extraction_cache.max_bytes)
+    elif max_bytes is not None:
+        _extraction_cache.max_bytes = max_bytes
+
+def extraction_cache_stats():
+    """Return the size of the extraction cache and this process's hit/miss counters"""
+    return _extraction_cache.stats()
+
+def clear_extraction_cache():
+    _extraction_cache.clear()
+
+@traced("extract.file")
+def extract_text_from_file(file_path):
+    """Extract text from various file types"""
+    _, file_extension = os.path.splitext(file_path)
+    file_extension = file_extension.lower()
+
+    if os.path.getsize(file_path) > MAX_FILE_SIZE_BYTES:
+        if file_extension != ".pdf":
+            return f"File too large: {file_path}"
+        # Large PDFs (e.g. portfolios) are read up to a page/character budget instead
+        limits = (LARGE_PDF_MAX_PAGES, LARGE_PDF_MAX_CHARS)
+        try:
+            text, _ = cached_extraction("text", file_path, limits, lambda: extract_pdf_text(file_path, *limits))
+            return text
+        except Exception as e:
+            return f"Error extracting text: {str(e)}"
+
+    try:
+        if file_extension in TEXT_EXTENSIONS:
+            return read_text_file(file_path)
+        elif file_extension == ".pdf":
+            text, _ = cached_extraction("text", file_path, None, lambda: extract_pdf_text(file_path))
+            return text
+        elif file_extension == ".docx":
+            text, _ = cached_extraction("text", file_path, None, lambda: extract_docx_text(file_path))
+            return text
+        else:
+            return None
+    except Exception as e:
+        return f"Error extracting text: {str(e)}"
+
+
+def iter_document_units(file_path, max_pages=None, max_chars=None):
+    """Yield (kind, number, text) for each page of a PDF or paragraph of other documents"""
+    _, file_extension = os.path.splitext(file_path)
+    file_extension = file_extension.lower()
+
+    if file_extension == ".pdf":
+        for page_num, page_text in iter_pdf_pages(file_path, max_pages, max_chars):
+            if page_text.strip():
+                yield "page", page_num, page_text.strip()
+    elif file_extension == ".docx":
+        from docx import Document
+        number = 0
+        for para in Document(file_path).paragraphs:
+            if para.text.strip():
+                number += 1
+                yield "paragraph", number, para.text.strip()
+    elif file_extension in TEXT_EXTENSIONS:
+        paragraphs = _PARAGRAPH_BREAK.split(read_text_file(file_path))
+        for number, paragraph in enumerate((p.strip() for p in paragraphs if p.strip()), 1):
+            yield "paragraph", number, paragraph
+
+
+def extract_document(file_path):
+    """Extract one document into page/paragraph units and time it (runs in a worker)
+
+    Returns:
+        A dictionary containing:
+        - path (str): The document path
+        - valid (bool): Whether extraction succeeded
+        - message (str): Error message if it failed
+        - units (list): Dicts of kind ("page" or "paragraph"), number and text
+        - chars (int): Total characters extracted
+        - cached (bool): Whether the units came from the extraction cache
+        - seconds (float): Time spent extracting
+    """
+    start = time.perf_counter()
+    result = {"path": file_path, "valid": True, "message": "Extracted", "units": [], "cached": False}
+    try:
+        limits = (None, None)
+        if os.path.getsize(file_path) > MAX_FILE_SIZE_BYTES:
+            if not file_path.lower().endswith(".pdf"):
+                raise ValueError(f"File too large: {file_path}")
+            limits = (LARGE_PDF_MAX_PAGES, LARGE_PDF_MAX_CHARS)
+            result["truncated"] = True
+        result["units"], result["cached"] = cached_extraction("units", file_path, limits, lambda: [
+            {"kind": kind, "number": number, "text": text}
+            for kind, number, text in iter_document_units(file_path, *limits)
+        ])
+    except Exception as e:
+        result["valid"] = False
+        result["message"] = f"Error extracting text: {str(e)}"
+    result["chars"] = sum(len(unit["text"]) for unit in result["units"])
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def resolve_document_paths(source):
+    """Expand a file, directory (searched recursively) or glob pattern into document paths"""
+    if os.path.isdir(source):
+        paths = []
+        for root, dirs, names in os.walk(source):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            paths.extend(os.path.join(root, name) for name in names if not name.startswith("."))
+    elif os.path.isfile(source):
+        return [source]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(
+        path for path in paths
+        if os.path.isfile(path) and os.path.splitext(path)[1].lower() in DOCUMENT_EXTENSIONS
+    )
+
+
+def _ingest_error(path, message):
+    return {"path": path, "valid": False, "message": message, "units": [], "cached": False,
+            "chars": 0, "seconds": 0.0}
+
+
+def iter_ingested_documents(paths, max_workers=None, timeout=INGEST_TIMEOUT_SECONDS):
+    """Extract documents across a process pool, yielding each result as it finishes
+
+    A file whose worker failed, or that is unfinished after timeout seconds, yields an
+    error result; workers still running then are terminated.
+
+    Args:
+        paths: Document paths to extract
+        max_workers: Worker process count (defaults to the CPU count)
+        timeout: Seconds the whole pool may run
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1 or len(paths) < INGEST_PARALLEL_THRESHOLD:
+        for path in paths:
+            yield extract_document(path)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=worker_context())
+    pending = {}
+    try:
+        pending = {executor.submit(extract_document, path): path for path in paths}
+        try:
+            for future in as_completed(list(pending), timeout=timeout):
+                path = pending.pop(future)
+                if future.exception() is not None:
+                    yield _ingest_error(path, f"Error extracting text: {str(future.exception())}")
+                else:
+                    yield future.result()
+        except FutureTimeoutError:
+            for path in pending.values():
+                yield _ingest_error(path, f"Extraction did not finish within {timeout} seconds")
+    finally:
+        if pending:
+            terminate_workers(executor)
+        else:
+            executor.shutdown()
+
+
+def ingest_documents(source, max_workers=None, include_text=True, on_result=None,
+                     timeout=INGEST_TIMEOUT_SECONDS):
+    """Extract every supported document matching a directory, file or glob pattern
+
+    Args:
+        source: A directory, a single file or a glob pattern (e.g. "docs/**/*.pdf")
+        max_workers: Worker process count (defaults to the CPU count)
+        include_text: Whether to return the extracted units or only counts and timings
+        on_result: Optional callback called with each file's result as it finishes
+        timeout: Seconds extraction on worker processes may run (see
+            iter_ingested_documents)
+
+    Returns:
+        A dictionary containing:
+        - valid (bool): Whether any documents matched
+        - message (str): Summary of how many files were extracted
+        - files (list): Per-file results (see extract_document), in completion order
+        - workers (int): Number of worker processes used
+        - seconds (float): Total time for the ingest
+    """
+    start = time.perf_counter()
+    paths = resolve_document_paths(source)
+    if not paths:
+        return {"valid": False, "message": f"No supported documents found for '{source}'", "files": []}
+
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    if len(paths) < INGEST_PARALLEL_THRESHOLD:
+        workers = 1
+    files = []
+    for result in iter_ingested_documents(paths, workers, timeout):
+        # Extraction ran in a worker process, so record the timing it measured there
+        observe("extract.document", result["seconds"], error=None if result["valid"] else "ExtractionError")
+        if not include_text:
+            result["units"] = len(result["units"])
+        if on_result is not None:
+            on_result(result)
+        files.append(result)
+
+    extracted = sum(1 for result in files if result["valid"])
+    return {
+        "valid": True,
+        "message": f"Extracted {extracted} of {len(files)} documents",
+        "count": len(files),
+        "extracted": extracted,
+        "cached": sum(1 for result in files if result["cached"]),
+        "workers": workers,
+        "seconds": time.perf_counter() - start,
+        "files": files
+    }
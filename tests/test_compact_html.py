@@ -0,0 +1,108 @@
+import re
+from html.parser import HTMLParser
+
+from resume_compiler import compact_html, generate_resume_html
+
+BLOCK_TAGS = {"html", "head", "body", "div", "p", "h1", "h2", "ul", "ol", "li", "br"}
+
+
+class TextContent(HTMLParser):
+    """Collect rendered text per block, collapsing whitespace the way a browser does"""
+
+    def __init__(self):
+        super().__init__()
+        self.blocks = [""]
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "title"):
+            self.skip += 1
+        elif tag in BLOCK_TAGS:
+            self.blocks.append("")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "title"):
+            self.skip -= 1
+        elif tag in BLOCK_TAGS:
+            self.blocks.append("")
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.blocks[-1] += data
+
+
+def text_content(html):
+    parser = TextContent()
+    parser.feed(html)
+    blocks = (re.sub(r"\s+", " ", block).strip() for block in parser.blocks)
+    return [block for block in blocks if block]
+
+
+def make_resume():
+    return {
+        "name": "Ada **Lovelace**",
+        "location": "London",
+        "phone": "555-0100",
+        "email": "ada@example.com",
+        "website": "example.com",
+        "education": [{
+            "institution": "**University** of London",
+            "location": "London, UK",
+            "degree": "BSc **Mathematics**",
+            "graduationDate": "1835",
+            "gpa": "4.0",
+            "coursework": ["Analysis", "**Logic**"],
+        }],
+        "technicalSkills": ["Languages: **Python** **Go**, C", "Tools: Git"],
+        "experience": [{
+            "title": "Analyst",
+            "company": "**Analytical** **Engine**",
+            "location": "London",
+            "dateRange": "1842 - 1843",
+            "bullets": ["Wrote **Note** **G**, the first program", "Plain  double  spaced bullet"],
+        }],
+        "projects": [{
+            "name": "**Bernoulli** **numbers**",
+            "dateRange": "1843",
+            "bullets": ["(**Engine**) subtitle", "**Loop** **design** for the engine"],
+        }],
+    }
+
+
+def test_compact_output_has_the_same_text_as_pretty():
+    resume = make_resume()
+    pretty = generate_resume_html(resume)
+    compact = generate_resume_html(resume, output_mode="compact")
+
+    assert len(compact) < len(pretty)
+    assert text_content(compact) == text_content(pretty)
+
+
+def test_body_only_output_has_the_text_of_the_pretty_resume():
+    resume = make_resume()
+    pretty_text = text_content(generate_resume_html(resume))
+    body_text = text_content(generate_resume_html(resume, output_mode="body-only"))
+
+    # The pretty document adds page chrome (the download button) around the resume
+    start = pretty_text.index(body_text[0])
+    assert pretty_text[start:start + len(body_text)] == body_text
+
+
+def test_space_between_bold_spans_is_kept():
+    html = compact_html("<li>\n    <strong>Python</strong> <strong>Go</strong>\n</li>")
+
+    assert html == "<li><strong>Python</strong> <strong>Go</strong></li>"
+
+
+def test_layout_whitespace_is_removed_beside_block_tags_only():
+    html = compact_html(
+        "<div>\n  <p>\n    <strong>A</strong>\n    <span>B</span>\n  </p>\n  <!-- note -->\n</div>\n"
+    )
+
+    assert html == "<div><p><strong>A</strong> <span>B</span></p></div>"
+
+
+def test_script_blocks_are_left_untouched():
+    script = "<script>\n  if (a < b) {\n    go();\n  }\n</script>"
+
+    assert compact_html(f"<div>\n{script}\n</div>") == f"<div>{script}</div>"
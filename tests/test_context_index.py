@@ -0,0 +1,75 @@
+import os
+
+from resume_context_index import ContextCorpus, ContextIndex, split_passages, tokenize
+
+# Each document is short enough to be a single passage
+DOCUMENTS = {
+    "operator.txt": "Built a Kubernetes operator in Go for batch jobs.",
+    "tooling.txt": "Wrote Python tooling for the data team.",
+    "upgrades.txt": "Kubernetes Kubernetes Kubernetes: ran every cluster upgrade.",
+    "bank.txt": "Python developer at a bank, writing Python services and Python scripts.",
+    "guide.txt": (
+        "Managed the team's Python style guide and reviews for a large group of engineers "
+        "who all worked on many different services and libraries across the company."
+    ),
+}
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The C++ and C# code in Go") == ["c++", "c#", "code", "go"]
+
+
+def test_split_passages_merges_paragraphs_up_to_the_limit():
+    assert split_passages("one\n\ntwo\n\n\nthree", max_chars=10) == ["one\n\ntwo", "three"]
+    # A paragraph over the limit is split into its lines
+    assert split_passages("x" * 8 + "\n" + "y" * 8, max_chars=10) == ["x" * 8, "y" * 8]
+    assert split_passages("\n\n  \n\n") == []
+
+
+def test_rare_terms_outrank_common_ones():
+    index = ContextIndex(DOCUMENTS)
+
+    assert index.search("go python", top_k=1)[0]["source"] == "operator.txt"
+
+
+def test_term_frequency_and_length_change_scores():
+    index = ContextIndex(DOCUMENTS)
+
+    assert [result["source"] for result in index.search("kubernetes")] == ["upgrades.txt", "operator.txt"]
+    python = index.search("python")
+    # Saying Python three times beats once, and a long passage is penalized
+    assert python[0]["source"] == "bank.txt"
+    assert python[-1]["source"] == "guide.txt"
+    assert [result["score"] for result in python] == sorted((r["score"] for r in python), reverse=True)
+
+
+def test_search_without_matches():
+    index = ContextIndex(DOCUMENTS)
+
+    assert index.search("haskell") == []
+    assert index.search("the and of") == []
+    assert ContextIndex({}).search("python") == []
+    assert len(index.search("python kubernetes", top_k=2)) == 2
+
+
+def test_corpus_re_extracts_only_changed_files(tmp_path):
+    extracted = []
+
+    def extract(path):
+        extracted.append(os.path.basename(path))
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    for name, text in DOCUMENTS.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    (tmp_path / ".hidden").write_text("haskell", encoding="utf-8")
+    corpus = ContextCorpus(str(tmp_path), extract)
+
+    stats = corpus.stats()
+    assert (stats["documents"], stats["passages"], stats["files"]) == (5, 5, 5)
+    assert corpus.search("haskell") == []
+    assert sorted(extracted) == sorted(DOCUMENTS)
+
+    (tmp_path / "notes.txt").write_text("Learning Haskell on weekends", encoding="utf-8")
+    assert corpus.search("haskell")[0]["source"] == "notes.txt"
+    assert sorted(extracted) == sorted([*DOCUMENTS, "notes.txt"])
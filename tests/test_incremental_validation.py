@@ -0,0 +1,163 @@
+import copy
+import itertools
+import random
+
+import pytest
+
+from resume_compiler import order_resume_errors, validate_resume_errors
+from resume_patch import apply_json_patch, apply_merge_patch
+from resume_state import get_working_resume, patch_working_resume, set_working_resume
+
+_ids = itertools.count()
+
+RESUME = {
+    "name": "Ada Lovelace",
+    "location": "London",
+    "phone": "555-0100",
+    "email": "ada@example.com",
+    "technicalSkills": ["Languages: Python", "Tools: Git"],
+    "education": [{
+        "institution": "University of London",
+        "location": "London",
+        "graduationDate": "1835",
+        "degree": "BSc",
+        "coursework": ["Analysis"],
+    }],
+    "experience": [
+        {"title": "Analyst", "company": "Engine", "location": "London", "dateRange": "1842",
+         "bullets": [f"Bullet {i}" for i in range(3)]}
+        for _ in range(5)
+    ],
+    "projects": [{"name": "Notes", "dateRange": "1843", "bullets": ["Note G"]}],
+}
+
+# Patches that each break one part of the resume
+BREAKS = [
+    [{"op": "remove", "path": "/phone"}],
+    [{"op": "replace", "path": "/name", "value": 7}],
+    [{"op": "remove", "path": "/experience/1/title"}],
+    [{"op": "replace", "path": "/experience/2/bullets/0", "value": 3}],
+    [{"op": "replace", "path": "/experience/3/bullets", "value": "not a list"}],
+    [{"op": "replace", "path": "/technicalSkills", "value": {"Languages": "Python"}}],
+    [{"op": "add", "path": "/publications", "value": [{"title": "Sketch"}]}],
+    {"email": None},
+    {"projects": [{"name": "Notes"}]},
+]
+
+# Patches that repair, or edit without breaking, one part of the resume
+EDITS = [
+    [{"op": "add", "path": "/phone", "value": "555-0199"}],
+    [{"op": "replace", "path": "/name", "value": "Ada"}],
+    [{"op": "add", "path": "/experience/1/title", "value": "Analyst"}],
+    [{"op": "replace", "path": "/experience/2/bullets/0", "value": "Fixed"}],
+    [{"op": "replace", "path": "/experience/3/bullets", "value": ["Back"]}],
+    [{"op": "replace", "path": "/experience/4/bullets/1", "value": "Edited"}],
+    [{"op": "replace", "path": "/technicalSkills", "value": ["Languages: Python"]}],
+    [{"op": "add", "path": "/publications/0/citation", "value": "Taylor's Memoirs"}],
+    [{"op": "remove", "path": "/education/0/coursework/0"}],
+    {"email": "ada@example.org"},
+    {"projects": [{"name": "Notes", "dateRange": "1843"}]},
+]
+
+
+def start(resume):
+    resume_id = f"test-{next(_ids)}"
+    set_working_resume(copy.deepcopy(resume), resume_id)
+    return resume_id
+
+
+def assert_matches_full_validation(resume_id):
+    working = get_working_resume(resume_id)
+    _, errors = validate_resume_errors(copy.deepcopy(working.resume))
+    assert order_resume_errors(working.errors_by_field) == errors
+
+
+def test_set_working_resume_matches_full_validation():
+    broken = copy.deepcopy(RESUME)
+    del broken["email"]
+    broken["experience"][0]["bullets"].append(1)
+
+    assert_matches_full_validation(start(RESUME))
+    assert_matches_full_validation(start(broken))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_errors_after_patches_match_full_validation(seed):
+    rng = random.Random(seed)
+    broken = copy.deepcopy(RESUME)
+    for patch in rng.sample(BREAKS, 4):
+        broken = apply_merge_patch(broken, patch) if isinstance(patch, dict) else apply_json_patch(broken, patch)
+    resume_id = start(broken)
+    assert_matches_full_validation(resume_id)
+
+    applied = 0
+    for _ in range(30):
+        _, patched = patch_working_resume(copy.deepcopy(rng.choice(BREAKS + EDITS)), resume_id)
+        applied += patched is not None
+        assert_matches_full_validation(resume_id)
+    assert applied
+
+
+def test_patch_introducing_an_error_is_rejected():
+    resume_id = start(RESUME)
+    before = get_working_resume(resume_id)
+
+    result, patched = patch_working_resume([{"op": "remove", "path": "/experience/0/company"}], resume_id)
+
+    assert not result["valid"] and patched is None
+    assert result["errors"] == ["Experience item 0 is missing required field: 'company'"]
+    assert get_working_resume(resume_id) is before
+
+
+def test_pre_existing_errors_do_not_block_other_edits():
+    broken = copy.deepcopy(RESUME)
+    del broken["phone"]
+    del broken["experience"][0]["title"]
+    resume_id = start(broken)
+
+    # Another item of the section that already has an error can still be edited
+    result, patched = patch_working_resume(
+        [{"op": "replace", "path": "/experience/1/bullets/0", "value": "Edited"}], resume_id
+    )
+    assert patched is not None
+    assert not result["valid"]
+    assert patched.resume["experience"][1]["bullets"][0] == "Edited"
+
+    # Errors can then be fixed one patch at a time
+    result, patched = patch_working_resume({"phone": "555-0100"}, resume_id)
+    assert patched is not None and len(result["errors"]) == 1
+    result, patched = patch_working_resume(
+        [{"op": "add", "path": "/experience/0/title", "value": "Analyst"}], resume_id
+    )
+    assert result["valid"]
+    assert_matches_full_validation(resume_id)
+
+
+def test_errors_are_matched_when_items_move():
+    broken = copy.deepcopy(RESUME)
+    del broken["experience"][1]["title"]
+    broken["experience"][2]["bullets"][1] = 3
+    resume_id = start(broken)
+    item = {"title": "Intern", "company": "Engine", "location": "London", "dateRange": "1841"}
+
+    # Inserting ahead of broken items renumbers their errors without adding any
+    result, patched = patch_working_resume([{"op": "add", "path": "/experience/0", "value": item}], resume_id)
+    assert patched is not None, result["message"]
+    assert result["errors"] == [
+        "Experience item 2 is missing required field: 'title'",
+        "Bullet 1 in experience item 3 must be a string",
+    ]
+    result, patched = patch_working_resume(
+        [{"op": "add", "path": "/experience/3/bullets/0", "value": "First"}], resume_id
+    )
+    assert patched is not None, result["message"]
+
+    # A second item with the same error, or a second bad bullet, is still new
+    result, patched = patch_working_resume([{"op": "remove", "path": "/experience/0/title"}], resume_id)
+    assert patched is None
+    assert result["errors"] == ["Experience item 0 is missing required field: 'title'"]
+    result, patched = patch_working_resume(
+        [{"op": "add", "path": "/experience/3/bullets/0", "value": 4}], resume_id
+    )
+    assert patched is None
+    assert_matches_full_validation(resume_id)
@@ -0,0 +1,68 @@
+import os
+import threading
+import time
+
+import pytest
+
+from resume_render_pool import RenderPool, RenderPoolBusy, RenderTimeout, RenderWorkerLost
+
+
+@pytest.fixture
+def pool():
+    pool = RenderPool(workers=1, max_queue=0, timeout=5.0, queue_wait=0.2)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def wait_for(condition, seconds=5.0):
+    deadline = time.monotonic() + seconds
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_run_returns_the_result_and_records_latency(pool):
+    assert pool.run(pow, 2, 10) == 1024
+
+    stats = pool.stats()
+    assert stats["started"] and stats["completed"] == 1 and stats["in_flight"] == 0
+    assert stats["latency_p50"] is not None
+
+
+def test_timeout_recycles_the_pool_and_frees_the_slot(pool):
+    executor = pool.start()
+
+    with pytest.raises(RenderTimeout):
+        pool.run(time.sleep, 10, timeout=0.2)
+
+    assert pool.stats()["timed_out"] == 1 and pool.stats()["recycled"] == 1
+    wait_for(lambda: pool.stats()["in_flight"] == 0)
+    # The next job runs on a fresh pool straight away, without waiting for the stuck one
+    started = time.monotonic()
+    assert pool.run(pow, 3, 2) == 9
+    assert time.monotonic() - started < 5
+    assert pool.start() is not executor
+
+
+def test_worker_crash_raises_worker_lost_and_the_pool_recovers(pool):
+    with pytest.raises(RenderWorkerLost):
+        pool.run(os._exit, 1)
+
+    assert pool.stats()["recycled"] == 1
+    assert pool.run(pow, 2, 3) == 8
+    wait_for(lambda: pool.stats()["in_flight"] == 0)
+    assert pool.stats()["failed"] == 1 and pool.stats()["completed"] == 1
+
+
+def test_full_queue_rejects_jobs(pool):
+    pool.start()
+    blocker = threading.Thread(target=pool.run, args=(time.sleep, 0.5))
+    blocker.start()
+    wait_for(lambda: pool.stats()["in_flight"] == 1)
+
+    with pytest.raises(RenderPoolBusy):
+        pool.run(pow, 2, 2)
+
+    blocker.join()
+    assert pool.stats()["rejected"] == 1
+    assert pool.run(pow, 2, 2) == 4
@@ -0,0 +1,79 @@
+import base64
+import gzip
+import os
+
+import pytest
+
+import resume_artifacts
+from resume_artifacts import fetch_artifact, store_artifact
+
+
+@pytest.fixture(autouse=True)
+def artifact_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_artifacts, "ARTIFACT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def fetch_all(artifact_id, encoding="base64", length=None):
+    chunks, offset = [], 0
+    while offset is not None:
+        result = fetch_artifact(artifact_id, offset, length, encoding)
+        assert result["valid"], result["message"]
+        chunks.append(base64.b64decode(result["data"]))
+        offset = result["next_offset"]
+    return b"".join(chunks), len(chunks)
+
+
+def set_mtime(artifact_dir, artifact_id, seconds):
+    for name in (artifact_id, f"{artifact_id}.gz"):
+        os.utime(artifact_dir / name, (seconds, seconds))
+
+
+def test_store_returns_a_content_addressed_handle():
+    handle = store_artifact("<p>résumé</p>", ".html")
+
+    assert handle["artifact_id"] == handle["sha256"] + ".html"
+    assert handle["media_type"] == "text/html"
+    assert handle["bytes"] == len("<p>résumé</p>".encode("utf-8"))
+    assert store_artifact(b"<p>r\xc3\xa9sum\xc3\xa9</p>", ".html") == handle
+
+
+def test_fetch_in_chunks_round_trips_both_encodings():
+    data = os.urandom(10_000)
+    artifact_id = store_artifact(data, ".pdf")["artifact_id"]
+
+    assert fetch_all(artifact_id, length=4096) == (data, 3)
+    compressed, _ = fetch_all(artifact_id, "gzip", length=1000)
+    assert gzip.decompress(compressed) == data
+
+
+def test_fetch_rejects_bad_requests():
+    artifact_id = store_artifact(b"data", ".json")["artifact_id"]
+
+    assert not fetch_artifact("../secret")["valid"]
+    assert not fetch_artifact(artifact_id, encoding="br")["valid"]
+    assert not fetch_artifact(artifact_id, offset=-1)["valid"]
+    assert fetch_artifact("0" * 64 + ".json")["message"].endswith("not found")
+
+
+def test_eviction_removes_the_oldest_artifacts_with_their_gzip_copies(artifact_dir, monkeypatch):
+    old = store_artifact(os.urandom(1000), ".pdf")["artifact_id"]
+    reused = store_artifact(os.urandom(1000), ".pdf")["artifact_id"]
+    set_mtime(artifact_dir, old, 1_000)
+    set_mtime(artifact_dir, reused, 1_000)
+
+    # Storing the same content again makes it recent, so it survives eviction
+    store_artifact((artifact_dir / reused).read_bytes(), ".pdf")
+    monkeypatch.setattr(resume_artifacts, "ARTIFACT_MAX_BYTES", 4500)
+    new = store_artifact(os.urandom(1000), ".pdf")["artifact_id"]
+
+    assert sorted(os.listdir(artifact_dir)) == sorted([reused, f"{reused}.gz", new, f"{new}.gz"])
+    assert not fetch_artifact(old)["valid"]
+    assert fetch_artifact(reused)["valid"] and fetch_artifact(new, encoding="gzip")["valid"]
+
+
+def test_an_artifact_larger_than_the_store_is_kept(artifact_dir, monkeypatch):
+    monkeypatch.setattr(resume_artifacts, "ARTIFACT_MAX_BYTES", 100)
+    artifact_id = store_artifact(os.urandom(1000), ".pdf")["artifact_id"]
+
+    assert fetch_artifact(artifact_id)["valid"]
@@ -0,0 +1,37 @@
+import copy
+import json
+
+from resume_compiler import load_resume_document
+
+RESUME = {
+    "name": "Ada Lovelace",
+    "location": "London",
+    "phone": "555-0100",
+    "email": "ada@example.com",
+    "experience": [{"title": "Analyst", "company": "Engine", "location": "London",
+                    "dateRange": "1842", "bullets": ["Wrote Note G"]}],
+}
+
+
+def test_string_input_is_parsed_once():
+    text = json.dumps(RESUME)
+    first, first_cached = load_resume_document(text)
+    second, second_cached = load_resume_document(text)
+
+    assert second_cached and second is first
+    assert first.resume == RESUME and first.errors == ()
+
+
+def test_cached_dict_input_is_not_shared_with_the_caller():
+    resume = copy.deepcopy(RESUME)
+    resume["phone"] = "555-0101"
+    original = copy.deepcopy(resume)
+    document, cached = load_resume_document(resume)
+    assert not cached and document.resume is resume
+
+    resume["experience"][0]["bullets"][0] = "Changed after loading"
+    del resume["email"]
+
+    again, cached = load_resume_document(copy.deepcopy(original))
+    assert cached
+    assert again.resume == original and again.errors == ()
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+import resume_metrics
+from resume_metrics import (
+    configure_profiling, count, observe, profile_report, prometheus_text, reset_metrics, snapshot,
+    span, traced,
+)
+
+
+@pytest.fixture(autouse=True)
+def metrics(monkeypatch):
+    monkeypatch.setattr(resume_metrics, "_collectors", {})
+    reset_metrics()
+    yield
+    configure_profiling("")
+    reset_metrics()
+
+
+def counter(name, **labels):
+    for entry in snapshot()["counters"]:
+        if entry["name"] == name and entry["labels"] == labels:
+            return entry["value"]
+    return None
+
+
+def test_spans_record_latency_and_errors():
+    with span("compile"):
+        pass
+    with pytest.raises(KeyError):
+        with span("compile"):
+            raise KeyError("x")
+    observe("worker.render", 0.25)
+
+    spans = snapshot()["spans"]
+    assert spans["compile"]["count"] == 2 and spans["compile"]["errors"] == 1
+    assert spans["worker.render"]["max_seconds"] == 0.25
+    assert counter("errors", span="compile", type="KeyError") == 1
+
+
+def test_slow_top_level_spans_are_logged_with_their_stages(monkeypatch):
+    monkeypatch.setattr(resume_metrics, "SLOW_REQUEST_SECONDS", 0.0)
+
+    with span("tool.compile", resume="ada") as current:
+        with span("compile.validate"):
+            pass
+        observe("compile.render", 0.5)
+        current.set(valid=False)
+
+    [entry] = snapshot()["slow_requests"]
+    assert entry["span"] == "tool.compile"
+    assert entry["labels"] == {"resume": "ada", "valid": False}
+    assert [name for name, _ in entry["stages"]] == ["compile.validate", "compile.render"]
+
+
+def test_traced_counts_valid_and_invalid_results():
+    @traced("tool.sync")
+    def sync_tool(valid):
+        return {"valid": valid, "message": "nope"}
+
+    @traced("tool.async")
+    async def async_tool():
+        return {"valid": True}
+
+    sync_tool(True)
+    sync_tool(False)
+    asyncio.run(async_tool())
+
+    assert counter("results", span="tool.sync", valid="true") == 1
+    assert counter("results", span="tool.sync", valid="false") == 1
+    assert counter("results", span="tool.async", valid="true") == 1
+    assert snapshot()["spans"]["tool.sync"]["count"] == 2
+
+
+def test_prometheus_text():
+    count("cache_hits", cache="compile")
+    count("cache_hits", 2, cache="compile")
+    with span("compile"):
+        pass
+    resume_metrics.register_collector("pool", lambda: {"workers": 2, "started": True, "name": "pdf"})
+    resume_metrics.register_collector("broken", lambda: 1 / 0)
+
+    lines = prometheus_text().splitlines()
+    assert 'resume_cache_hits_total{cache="compile"} 3' in lines
+    assert "# TYPE resume_span_seconds summary" in lines
+    assert 'resume_span_seconds_count{span="compile"} 1' in lines
+    assert any(line.startswith('resume_span_seconds{span="compile",quantile="0.95"} ') for line in lines)
+    assert "resume_pool_workers 2" in lines and "resume_pool_started 1" in lines
+    assert not any("pool_name" in line or "broken" in line for line in lines)
+    assert snapshot()["collectors"]["broken"] == {"error": "division by zero"}
+
+
+def test_cprofile_report_covers_profiled_spans():
+    def profiled_work():
+        return sum(range(1000))
+
+    configure_profiling("cprofile")
+    with span("tool.work"):
+        profiled_work()
+
+    assert "profiled_work" in profile_report()
+    with pytest.raises(ValueError):
+        configure_profiling("perf")
+
+
+def test_invalid_resume_profile_is_reported_on_stderr():
+    env = dict(os.environ, RESUME_PROFILE="perf")
+    result = subprocess.run(
+        [sys.executable, "-c", "import resume_metrics; print(repr(resume_metrics._profile_mode))"],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(resume_metrics.__file__),
+    )
+
+    assert result.returncode == 0
+    assert result.stdout == "''\n"
+    assert "Ignoring RESUME_PROFILE: Unknown profile mode 'perf'" in result.stderr
@@ -0,0 +1,163 @@
+import json
+
+import pytest
+
+from resume_patch import (
+    JsonPatchError, apply_json_patch, apply_merge_patch, make_json_patch, touched_fields,
+)
+
+# RFC 6902, Appendix A: (section, document, patch, expected result)
+RFC6902_EXAMPLES = [
+    ("A.1 adding an object member",
+     {"foo": "bar"},
+     [{"op": "add", "path": "/baz", "value": "qux"}],
+     {"baz": "qux", "foo": "bar"}),
+    ("A.2 adding an array element",
+     {"foo": ["bar", "baz"]},
+     [{"op": "add", "path": "/foo/1", "value": "qux"}],
+     {"foo": ["bar", "qux", "baz"]}),
+    ("A.3 removing an object member",
+     {"baz": "qux", "foo": "bar"},
+     [{"op": "remove", "path": "/baz"}],
+     {"foo": "bar"}),
+    ("A.4 removing an array element",
+     {"foo": ["bar", "qux", "baz"]},
+     [{"op": "remove", "path": "/foo/1"}],
+     {"foo": ["bar", "baz"]}),
+    ("A.5 replacing a value",
+     {"baz": "qux", "foo": "bar"},
+     [{"op": "replace", "path": "/baz", "value": "boo"}],
+     {"baz": "boo", "foo": "bar"}),
+    ("A.6 moving a value",
+     {"foo": {"bar": "baz", "waldo": "fred"}, "qux": {"corge": "grault"}},
+     [{"op": "move", "from": "/foo/waldo", "path": "/qux/thud"}],
+     {"foo": {"bar": "baz"}, "qux": {"corge": "grault", "thud": "fred"}}),
+    ("A.7 moving an array element",
+     {"foo": ["all", "grass", "cows", "eat"]},
+     [{"op": "move", "from": "/foo/1", "path": "/foo/3"}],
+     {"foo": ["all", "cows", "eat", "grass"]}),
+    ("A.8 testing a value: success",
+     {"baz": "qux", "foo": ["a", 2, "c"]},
+     [{"op": "test", "path": "/baz", "value": "qux"}, {"op": "test", "path": "/foo/1", "value": 2}],
+     {"baz": "qux", "foo": ["a", 2, "c"]}),
+    ("A.10 adding a nested member object",
+     {"foo": "bar"},
+     [{"op": "add", "path": "/child", "value": {"grandchild": {}}}],
+     {"foo": "bar", "child": {"grandchild": {}}}),
+    ("A.11 ignoring unrecognized elements",
+     {"foo": "bar"},
+     [{"op": "add", "path": "/baz", "value": "qux", "xyz": 123}],
+     {"foo": "bar", "baz": "qux"}),
+    ("A.14 ~ escape ordering",
+     {"/": 9, "~1": 10},
+     [{"op": "test", "path": "/~01", "value": 10}],
+     {"/": 9, "~1": 10}),
+    ("A.16 adding an array value",
+     {"foo": ["bar"]},
+     [{"op": "add", "path": "/foo/-", "value": ["abc", "def"]}],
+     {"foo": ["bar", ["abc", "def"]]}),
+]
+
+RFC6902_ERRORS = [
+    ("A.9 testing a value: error",
+     {"baz": "qux"},
+     [{"op": "test", "path": "/baz", "value": "bar"}]),
+    ("A.12 adding to a nonexistent target",
+     {"foo": "bar"},
+     [{"op": "add", "path": "/baz/bat", "value": "qux"}]),
+    ("A.15 comparing strings and numbers",
+     {"/": 9, "~1": 10},
+     [{"op": "test", "path": "/~01", "value": "10"}]),
+]
+
+# RFC 7386, Appendix A: (target, patch, expected result)
+RFC7386_EXAMPLES = [
+    ({"a": "b"}, {"a": "c"}, {"a": "c"}),
+    ({"a": "b"}, {"b": "c"}, {"a": "b", "b": "c"}),
+    ({"a": "b"}, {"a": None}, {}),
+    ({"a": "b", "b": "c"}, {"a": None}, {"b": "c"}),
+    ({"a": ["b"]}, {"a": "c"}, {"a": "c"}),
+    ({"a": "c"}, {"a": ["b"]}, {"a": ["b"]}),
+    ({"a": {"b": "c"}}, {"a": {"b": "d", "c": None}}, {"a": {"b": "d"}}),
+    ({"a": [{"b": "c"}]}, {"a": [1]}, {"a": [1]}),
+    (["a", "b"], ["c", "d"], ["c", "d"]),
+    ({"a": "b"}, ["c"], ["c"]),
+    ({"a": "foo"}, None, None),
+    ({"a": "foo"}, '"bar"', "bar"),  # String arguments are JSON text
+    ({"e": None}, {"a": 1}, {"e": None, "a": 1}),
+    ([1, 2], {"a": "b", "c": None}, {"a": "b"}),
+    ({}, {"a": {"bb": {"ccc": None}}}, {"a": {"bb": {}}}),
+]
+
+
+@pytest.mark.parametrize("document, patch, expected",
+                         [case[1:] for case in RFC6902_EXAMPLES],
+                         ids=[case[0] for case in RFC6902_EXAMPLES])
+def test_json_patch_rfc6902_examples(document, patch, expected):
+    assert apply_json_patch(document, patch) == expected
+
+
+@pytest.mark.parametrize("document, patch",
+                         [case[1:] for case in RFC6902_ERRORS],
+                         ids=[case[0] for case in RFC6902_ERRORS])
+def test_json_patch_rfc6902_errors(document, patch):
+    original = repr(document)
+    with pytest.raises(JsonPatchError):
+        apply_json_patch(document, patch)
+    assert repr(document) == original
+
+
+@pytest.mark.parametrize("value, expected", [
+    (1, 1.0), (1, True), (0, False), (1.0, True), ([1, {"a": 0}], [1, {"a": False}]),
+])
+def test_test_op_compares_types(value, expected):
+    document = {"v": value}
+
+    assert apply_json_patch(document, [{"op": "test", "path": "/v", "value": value}]) == document
+    with pytest.raises(JsonPatchError):
+        apply_json_patch(document, [{"op": "test", "path": "/v", "value": expected}])
+
+
+def test_failed_patch_leaves_the_target_unmodified():
+    document = {"foo": ["bar"]}
+    with pytest.raises(JsonPatchError):
+        apply_json_patch(document, [
+            {"op": "add", "path": "/foo/-", "value": "baz"},
+            {"op": "remove", "path": "/missing"},
+        ])
+    assert document == {"foo": ["bar"]}
+
+
+@pytest.mark.parametrize("token", ["01", "-1", "1.0", "x", "٣", "²"])
+def test_invalid_array_indexes_are_rejected(token):
+    with pytest.raises(JsonPatchError):
+        apply_json_patch({"foo": ["a", "b"]}, [{"op": "remove", "path": f"/foo/{token}"}])
+
+
+@pytest.mark.parametrize("target, patch, expected", RFC7386_EXAMPLES)
+def test_merge_patch_rfc7386_examples(target, patch, expected):
+    assert apply_merge_patch(target, patch) == expected
+
+
+@pytest.mark.parametrize("source, target", [
+    ({"a": 1, "b": [1, 2, 3]}, {"a": 2, "b": [1, 3]}),
+    ({"a/b": {"~c": [1]}}, {"a/b": {"~c": [1, 2]}, "d": None}),
+    ({"list": [{"x": 1}, {"x": 2}]}, {"list": [{"x": 1, "y": 0}]}),
+    ({"n": 1}, {"n": 1.0, "t": True}),
+    ([1, 2], {"a": 1}),
+])
+def test_make_json_patch_round_trips(source, target):
+    result = apply_json_patch(source, make_json_patch(source, target))
+
+    # Compared as JSON text, so 1 vs 1.0 or True and key order differences also fail
+    assert json.dumps(result) == json.dumps(target)
+
+
+def test_touched_fields():
+    assert touched_fields({"phone": "1", "email": None}) == {"phone", "email"}
+    assert touched_fields([
+        {"op": "test", "path": "/name", "value": "x"},
+        {"op": "replace", "path": "/experience/0/bullets/1", "value": "y"},
+        {"op": "copy", "from": "/projects/0", "path": "/publications/0"},
+    ]) == {"experience", "publications"}
+    assert touched_fields([{"op": "replace", "path": "", "value": {}}]) is None
@@ -0,0 +1,102 @@
+import base64
+import re
+import zlib
+
+import pytest
+
+import resume_pdf
+from resume_pdf import (
+    CONTENT_WIDTH, compile_resume_pdf, layout_header, render_resume_pdf, text_width,
+    unencodable_characters, wrap_runs,
+)
+
+RESUME = {
+    "name": "Ada **Lovelace**",
+    "location": "London",
+    "phone": "555-0100",
+    "email": "ada@example.com",
+    "technicalSkills": ["Languages: Python, C", "Tools: Git"],
+    "experience": [{
+        "title": "Analyst", "company": "**Analytical Engine**", "location": "London",
+        "dateRange": "1842 - 1843",
+        "bullets": ["Wrote **Note G**, the first program (for the engine)"] * 3,
+    }],
+}
+
+
+def page_text(pdf):
+    """Concatenate the strings drawn by every page's content stream"""
+    streams = re.findall(rb"/FlateDecode >>\nstream\n(.*?)\nendstream", pdf, re.S)
+    drawn = b"".join(
+        b"".join(re.findall(rb"\((.*?)\) Tj", zlib.decompress(stream))) for stream in streams
+    )
+    return drawn.replace(b"\\(", b"(").replace(b"\\)", b")").decode("cp1252")
+
+
+@pytest.fixture
+def pdf_pool(monkeypatch):
+    monkeypatch.setattr(resume_pdf, "_pdf_pool", None)
+    yield
+    if resume_pdf._pdf_pool is not None:
+        resume_pdf._pdf_pool.shutdown(wait=True)
+
+
+def test_rendered_pdf_is_well_formed_and_has_the_text():
+    pdf = render_resume_pdf(RESUME)
+
+    assert pdf.startswith(b"%PDF-1.4\n") and pdf.endswith(b"%%EOF\n")
+    xref = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+    assert pdf[xref:].startswith(b"xref\n")
+    text = page_text(pdf)
+    assert "Lovelace" in text and "Wrote Note G, the first program (for the engine)" in text
+    assert "**" not in text
+
+
+def test_long_sections_continue_on_a_new_page():
+    resume = dict(RESUME, experience=RESUME["experience"] * 20)
+
+    assert render_resume_pdf(resume).count(b"/Type /Page ") > 1
+
+
+def test_header_accepts_a_non_string_website():
+    block = layout_header(dict(RESUME, website=12345))
+
+    drawn = [run[0] for op in block.ops for run in op[3]]
+    assert "12345" in drawn
+
+
+def test_wrapped_lines_fit_the_width():
+    runs = [("word " * 60, False), ("bold words " * 10, True)]
+    width = CONTENT_WIDTH / 2
+
+    lines = wrap_runs(runs, width, first_width=width / 2)
+    assert len(lines) > 2
+    assert sum(text_width(text, bold) for text, bold in lines[0]) <= width / 2
+    for line in lines[1:]:
+        assert sum(text_width(text, bold) for text, bold in line) <= width
+        assert line[0][0] != " " and line[-1][0][-1] != " "
+    assert "".join(text for line in lines for text, _ in line).count("word") == 70
+
+
+def test_unencodable_characters_are_reported():
+    resume = dict(RESUME, name="Ada “Lovelace” 李", location="Łódź")
+
+    assert unencodable_characters(RESUME) == []
+    assert unencodable_characters(resume) == ["Ł", "ź", "李"]
+
+
+def test_compile_resume_pdf_returns_the_pdf_and_warnings(pdf_pool):
+    result = compile_resume_pdf(dict(RESUME, name="Ada 李"))
+
+    assert result["valid"]
+    pdf = base64.b64decode(result["pdf"])
+    assert pdf.startswith(b"%PDF-") and len(pdf) == result["bytes"]
+    assert "李 (U+674E)" in result["warnings"][0]
+    assert "Ada ?" in page_text(pdf)
+
+
+def test_compile_resume_pdf_rejects_invalid_resumes():
+    result = compile_resume_pdf({"name": "Ada"})
+
+    assert not result["valid"] and result["pdf"] is None
+    assert "resume validation" in result["message"]
@@ -0,0 +1,92 @@
+import copy
+
+import pytest
+
+from resume_sqlite import SQLiteResumeStore, search_key
+
+RESUME = {
+    "name": "Ada Lovelace",
+    "location": "London",
+    "phone": "555-0100",
+    "email": "ada@example.com",
+    "experience": [
+        {"title": "Senior **Analyst**", "company": "**Analytical** Engine Co", "location": "London",
+         "dateRange": "1842", "bullets": ["Wrote Note G", "Ran 100% of the tables"]},
+    ],
+    "projects": [{"name": "Bernoulli numbers", "dateRange": "1843", "bullets": ["Loop design"]}],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteResumeStore(str(tmp_path / "resumes.db"))
+    yield store
+    store.pool.close()
+
+
+def variant(company, bullet):
+    resume = copy.deepcopy(RESUME)
+    resume["experience"][0]["company"] = company
+    resume["experience"][0]["bullets"][0] = bullet
+    return resume
+
+
+def ids(matches):
+    return sorted(match["resume_id"] for match in matches)
+
+
+def test_search_key_ignores_case_markup_and_spacing():
+    assert search_key("  **Analytical**   Engine ") == "analytical engine"
+    assert search_key("****") is None and search_key(3) is None
+
+
+def test_search_by_company_title_and_bullet(store):
+    store.save("ada", RESUME)
+    store.save("bob", variant("Difference Engine Ltd", "Built gears"))
+
+    assert ids(store.search(company="analytical")) == ["ada"]
+    assert ids(store.search(company="ENGINE")) == []  # Prefix match only
+    assert ids(store.search(title="senior analyst")) == ["ada", "bob"]
+    assert ids(store.search(title="bernoulli")) == ["ada", "bob"]
+    assert ids(store.search(bullet="gears")) == ["bob"]
+    assert ids(store.search(bullet="100%")) == ["ada", "bob"]
+    assert ids(store.search(bullet="_")) == []  # LIKE wildcards are matched literally
+    assert ids(store.search(company="difference", bullet="note g")) == []
+    with pytest.raises(ValueError):
+        store.search()
+
+
+def test_search_matches_heads_unless_asked_for_all_versions(store):
+    store.save("ada", RESUME)
+    store.save("ada", variant("Babbage & Co", "Wrote Note G"))
+
+    assert store.search(company="analytical") == []
+    [match] = store.search(company="analytical", all_versions=True)
+    assert match["resume_id"] == "ada" and match["version"] == store.versions("ada")[0]["version"]
+
+
+def test_sections_and_bullets_are_shared_between_variants(store):
+    store.save("ada", RESUME)
+    store.save("ada-short", variant("**Analytical** Engine Co", "Wrote Note G, briefly"))
+
+    stats = store.stats()
+    assert (stats["resumes"], stats["documents"]) == (2, 2)
+    # The project is stored once; of the bullets only the edited one is new
+    assert stats["sections"] == 3
+    assert stats["bullets"] == 4
+
+
+def test_compile_cache_round_trips_and_evicts_least_recently_used(store):
+    cache = store.compile_cache(max_bytes=10)
+
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+    cache.put("c", "cccc")
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("aaaa", "cccc")
+    cache.put("big", "x" * 11)
+    assert cache.get("big") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 8, 1)
@@ -0,0 +1,164 @@
+import copy
+import json
+
+import pytest
+
+from resume_patch import apply_json_patch
+from resume_sqlite import SQLiteResumeStore
+from resume_store import ResumeStore
+
+RESUME = {
+    "name": "Ada **Lovelace**",
+    "location": "London",
+    "phone": "555-0100",
+    "email": "ada@example.com",
+    "technicalSkills": ["Languages: Python"],
+    "experience": [
+        {"title": "Analyst", "company": "**Engine**", "location": "London", "dateRange": "1842",
+         "bullets": ["Wrote Note G", "Translated the memoir"]},
+        {"title": "Author", "company": "Taylor", "location": "London", "dateRange": "1843",
+         "bullets": ["Published notes"]},
+    ],
+    "projects": [{"name": "Notes", "dateRange": "1843", "bullets": ["Subtitle", "Loop design"]}],
+}
+
+
+def open_store(backend, tmp_path):
+    if backend == "sqlite":
+        return SQLiteResumeStore(str(tmp_path / "resumes.db"))
+    return ResumeStore(str(tmp_path / "resumes"))
+
+
+@pytest.fixture(params=["files", "sqlite"])
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+def store(backend, tmp_path):
+    return open_store(backend, tmp_path)
+
+
+def edited_resume():
+    resume = copy.deepcopy(RESUME)
+    resume["experience"][0]["bullets"][1] = "Translated and annotated the memoir"
+    resume["projects"].append({"name": "Engine tables", "dateRange": "1844"})
+    return resume
+
+
+def test_save_and_load_round_trip(store):
+    saved = store.save("ada", RESUME, message="first")
+
+    assert saved["valid"] and saved["created"] and saved["versions"] == 1
+    resume_id, version, resume = store.load("ada")
+    assert (resume_id, version) == ("ada", saved["version"])
+    assert resume == RESUME
+    # Key order is kept, so the document renders the same
+    assert json.dumps(resume) == json.dumps(RESUME)
+    assert json.loads(store.load_text("ada")[2]) == RESUME
+
+
+def test_saving_the_head_again_adds_no_version(store):
+    first = store.save("ada", RESUME)
+    again = store.save("ada", json.dumps(RESUME, indent=2))
+
+    assert not again["created"]
+    assert again["version"] == first["version"]
+    assert again["versions"] == 1
+
+
+def test_versions_and_diff_round_trip(store):
+    v1 = store.save("ada", RESUME, message="first")["version"]
+    v2 = store.save("ada", edited_resume(), message="second")["version"]
+
+    assert [entry["version"] for entry in store.versions("ada")] == [v1, v2]
+    assert [entry["message"] for entry in store.versions("ada")] == ["first", "second"]
+    assert store.load("ada")[1] == v2
+    assert store.load(f"ada@{v1[:7]}")[2] == RESUME
+
+    diff = store.diff(f"ada@{v1}", "ada")
+    assert diff["from"] == f"ada@{v1}" and diff["to"] == f"ada@{v2}"
+    assert diff["changed"] == ["experience", "projects"]
+    assert apply_json_patch(RESUME, diff["patch"]) == edited_resume()
+    assert store.diff("ada", "ada")["patch"] == []
+
+
+def test_identical_documents_are_shared_across_resumes(store):
+    a = store.save("ada", RESUME)
+    b = store.save("ada-copy", RESUME)
+
+    assert a["version"] == b["version"]
+    total, resumes = store.list()
+    assert total == 2
+    assert {entry["resume_id"] for entry in resumes} == {"ada", "ada-copy"}
+    assert store.list(prefix="ada-")[0] == 1
+
+
+def test_store_persists_across_instances(backend, tmp_path):
+    version = open_store(backend, tmp_path).save("ada", RESUME)["version"]
+    reopened = open_store(backend, tmp_path)
+
+    assert reopened.load("ada")[1:] == (version, RESUME)
+    assert reopened.list()[0] == 1
+
+
+def test_invalid_resumes_and_references_are_rejected(store):
+    invalid = copy.deepcopy(RESUME)
+    del invalid["email"]
+
+    result = store.save("ada", invalid)
+    assert not result["valid"] and result["errors"]
+    assert not store.save("bad id!", RESUME)["valid"]
+    with pytest.raises(KeyError):
+        store.load("ada")
+    store.save("ada", RESUME)
+    with pytest.raises(KeyError):
+        store.load("ada@0000000")
+    with pytest.raises(ValueError):
+        store.load("ada@abc")
+
+
+def numbered_resume(number):
+    resume = copy.deepcopy(RESUME)
+    resume["phone"] = f"555-{number:04d}"
+    return resume
+
+
+def test_file_index_is_appended_and_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr("resume_store.STORE_LOG_COMPACT_ENTRIES", 5)
+    writer = ResumeStore(str(tmp_path))
+    reader = ResumeStore(str(tmp_path))
+
+    versions = [writer.save(f"r{i % 3}", numbered_resume(i))["version"] for i in range(12)]
+
+    # Two compactions (after 5 and 10 lines) leave two lines in the log
+    assert (tmp_path / "index.log").read_bytes().count(b"\n") == 2
+    for store in (reader, writer, ResumeStore(str(tmp_path))):
+        assert store.list()[0] == 3
+        assert [entry["version"] for entry in store.versions("r0")] == versions[0::3]
+        assert store.load("r2")[1] == versions[11]
+
+
+def test_file_index_reads_lines_appended_by_other_writers(tmp_path):
+    first = ResumeStore(str(tmp_path))
+    second = ResumeStore(str(tmp_path))
+
+    first.save("ada", numbered_resume(1))
+    assert second.versions("ada")[0]["version"] == first.load("ada")[1]
+    second.save("ada", numbered_resume(2))
+    first.save("ada", numbered_resume(3))
+
+    assert [entry["bytes"] > 0 for entry in second.versions("ada")] == [True] * 3
+    assert second.load("ada")[2] == numbered_resume(3)
+
+
+def test_file_index_ignores_a_partial_log_line(tmp_path):
+    store = ResumeStore(str(tmp_path))
+    store.save("ada", numbered_resume(1))
+    with open(tmp_path / "index.log", "ab") as f:
+        f.write(b'{"seq": 2, "resume_id": "ad')
+
+    reopened = ResumeStore(str(tmp_path))
+    assert reopened.list()[0] == 1
+    reopened.save("ada", numbered_resume(2))
+    assert len(ResumeStore(str(tmp_path)).versions("ada")) == 2
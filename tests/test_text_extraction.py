@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+import resume_text_extraction
+from resume_cache import DiskCache
+from resume_pdf import Block, PdfCanvas
+from resume_text_extraction import (
+    cached_extraction, extract_document, extract_text_from_file, iter_pdf_pages,
+)
+
+
+@pytest.fixture(autouse=True)
+def extraction_cache(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / "cache"), max_bytes=1_000_000)
+    monkeypatch.setattr(resume_text_extraction, "_extraction_cache", cache)
+    return cache
+
+
+def write_pdf(path, pages):
+    canvas = PdfCanvas()
+    for number, text in enumerate(pages):
+        if number:
+            canvas._new_page()
+        block = Block()
+        block.text([(text, False)], 0)
+        canvas.place(block)
+    path.write_bytes(canvas.to_pdf())
+    return str(path)
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    return write_pdf(tmp_path / "portfolio.pdf", [f"Page {n} text" for n in range(1, 6)])
+
+
+def test_pdf_pages_are_streamed_within_limits(pdf_path):
+    assert [number for number, _ in iter_pdf_pages(pdf_path)] == [1, 2, 3, 4, 5]
+    assert list(iter_pdf_pages(pdf_path, max_pages=2)) == [(1, "Page 1 text"), (2, "Page 2 text")]
+    # The last page is cut to fit the character budget
+    assert list(iter_pdf_pages(pdf_path, max_chars=15)) == [(1, "Page 1 text"), (2, "Page")]
+
+
+def test_the_page_stream_can_be_closed_early(pdf_path):
+    pages = iter_pdf_pages(pdf_path)
+    assert next(pages) == (1, "Page 1 text")
+
+    # Unmaps the file while the reader still holds it, which must not raise
+    pages.close()
+    assert list(pages) == []
+
+
+def test_cached_extraction_reuses_results_until_the_file_changes(pdf_path):
+    calls = []
+
+    def extract():
+        calls.append(1)
+        return {"calls": len(calls)}
+
+    assert cached_extraction("text", pdf_path, None, extract) == ({"calls": 1}, False)
+    assert cached_extraction("text", pdf_path, None, extract) == ({"calls": 1}, True)
+    # Different limits are a different entry
+    assert cached_extraction("text", pdf_path, (1, None), extract) == ({"calls": 2}, False)
+
+    st = os.stat(pdf_path)
+    os.utime(pdf_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert cached_extraction("text", pdf_path, None, extract) == ({"calls": 3}, False)
+
+
+def test_plain_text_files_are_not_cached(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("notes", encoding="utf-8")
+
+    assert cached_extraction("text", str(path), None, lambda: "notes") == ("notes", False)
+    assert cached_extraction("text", str(path), None, lambda: "notes") == ("notes", False)
+
+
+def test_extract_document_reports_cached_units(pdf_path):
+    first = extract_document(pdf_path)
+    second = extract_document(pdf_path)
+
+    assert first["valid"] and not first["cached"]
+    assert second["cached"] and second["units"] == first["units"]
+    assert first["units"][0] == {"kind": "page", "number": 1, "text": "Page 1 text"}
+    assert first["chars"] == 5 * len("Page 1 text")
+
+
+def test_large_pdfs_are_read_up_to_the_page_budget(pdf_path, monkeypatch):
+    monkeypatch.setattr(resume_text_extraction, "MAX_FILE_SIZE_BYTES", 100)
+    monkeypatch.setattr(resume_text_extraction, "LARGE_PDF_MAX_PAGES", 2)
+
+    assert extract_text_from_file(pdf_path) == "Page 1 text\nPage 2 text"
+    document = extract_document(pdf_path)
+    assert document["truncated"] and len(document["units"]) == 2